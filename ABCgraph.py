@@ -1,7 +1,19 @@
 from collections import Mapping, KeysView, ItemsView, MutableSet
-from networkx import NetworkXError
+from exception import NetworkXError
 import convert
+from attrindex import (make_index, parse_conditions, select, new_attrs,
+                       index_item, unindex_item, wrap_attr_dict, index_kind,
+                       build_indexes)
+from flyweight import AttrRecords, EdgeAttrs
+from schema import Schema
 from copy import deepcopy
+try:
+    from copyreg import __newobj__
+except ImportError:  # Python 2
+    from copy_reg import __newobj__
+import compact
+from chunks import ChunkedEdges, PartitionedAdjacency
+from linalg import LinearOperators
 
 # Notes to help me remember what the ABC classes provide:
 # classname | abstract methods -> concrete methods
@@ -44,6 +56,7 @@ class Nodes(ABCSetMap, MutableSet):
     def __init__(self, graph):
         self._graph = graph
         self._mapping = graph._nodes
+        self._nindex = graph._node_indexes
     def data(self, weight):
         return DataView(self._mapping, weight)
     def selfloops(self):
@@ -59,19 +72,31 @@ class Nodes(ABCSetMap, MutableSet):
                 msg = "The attr_dict argument must be a dictionary."
                 raise NetworkXError(msg)
         nodes = self._mapping
-        if n not in nodes:
-            self._graph._succ[n] = {} # FIXME factory
-            self._graph._pred[n] = {} # FIXME factory
-            nodes[n] = attr_dict
+        graph = self._graph
+        nindex = self._nindex
+        new = n not in nodes
+        factory = graph.node_attr_dict_factory
+        if new or (attr_dict and (nindex or factory is not dict)):
+            # schema records and indexes reject bad values here
+            newdict = new_attrs(factory, attr_dict, nindex)
+        if new:
+            graph._succ[n] = graph.adjlist_inner_dict_factory()
+            graph._pred[n] = graph.adjlist_inner_dict_factory()
+            if nindex:
+                newdict = wrap_attr_dict(n, nindex, newdict)
+                index_item(nindex, n, newdict)
+            nodes[n] = newdict
             return True # new node
         # update attr even if node already exists
         nodes[n].update(attr_dict)
         return False # not new node
     def discard(self, n):
         try:
-            del self._mapping[n]
+            nodedata = self._mapping.pop(n)
         except KeyError: # return False if node not present
             return False
+        if self._nindex:
+            unindex_item(self._nindex, n, nodedata)
         succ = self._graph._succ
         pred = self._graph._pred
         for u in succ[n]:
@@ -81,6 +106,48 @@ class Nodes(ABCSetMap, MutableSet):
         del succ[n]          # remove node from succ
         del pred[n]          # remove node from pred
         return True
+    def remove_many(self, nbunch):
+        # Batched discard: neighbor-dict deletions are grouped per
+        # surviving neighbor and the succ/pred dicts of removed nodes
+        # are dropped whole. Returns the number of edges removed.
+        nodes = self._mapping
+        succ = self._graph._succ
+        pred = self._graph._pred
+        doomed = set(n for n in nbunch if n in nodes)
+        if self._nindex:
+            for n in doomed:
+                unindex_item(self._nindex, n, nodes[n])
+        pred_drop = {}
+        succ_drop = {}
+        nedges = 0
+        for n in doomed:
+            nedges += len(succ[n])
+            for u in succ[n]:
+                if u not in doomed:
+                    pred_drop.setdefault(u, []).append(n)
+            for u in pred[n]:
+                if u not in doomed:
+                    succ_drop.setdefault(u, []).append(n)
+                    nedges += 1
+        for u, gone in pred_drop.items():
+            nbrs = pred[u]
+            for n in gone:
+                del nbrs[n]
+        for u, gone in succ_drop.items():
+            nbrs = succ[u]
+            for n in gone:
+                del nbrs[n]
+        for n in doomed:
+            del succ[n]
+            del pred[n]
+            del nodes[n]
+        return nedges
+    def __isub__(self, nbunch):
+        if nbunch is self:
+            self.clear()
+        else:
+            self.remove_many(nbunch)
+        return self
     def update(self, nodes, **attr):
         for n in nodes:
             try:
@@ -94,6 +161,33 @@ class Nodes(ABCSetMap, MutableSet):
         self._graph._succ.clear()
         self._graph._pred.clear()
         self._mapping.clear()
+        for idx in self._nindex.values():
+            idx.clear()
+    # Attribute indexes
+    def add_index(self, attr, kind='hash'):
+        """Maintain an index on node attribute `attr` for where() queries.
+
+        kind is 'hash' (equality) or 'sorted' (equality and ranges).
+        Node datadicts are wrapped so that direct writes like
+        G.n[n][attr] = value keep the index current.
+        """
+        idx = make_index(kind)
+        nodes = self._mapping
+        idx.build((n, dd[attr]) for n, dd in nodes.items() if attr in dd)
+        nindex = self._nindex
+        nindex[attr] = idx
+        for n, dd in list(nodes.items()):
+            nodes[n] = wrap_attr_dict(n, nindex, dd)
+    def drop_index(self, attr):
+        del self._nindex[attr]
+    def where(self, **conditions):
+        """Return a list of nodes whose data satisfies all conditions.
+
+        The result seeds subgraphs cheaply: G.s(G.n.where(region='eu')).
+        """
+        nodes = self._mapping
+        return list(select(self._nindex, parse_conditions(conditions),
+                           nodes.__getitem__, nodes.items))
 
 # Edges
 # =====
@@ -101,11 +195,17 @@ class Nodes(ABCSetMap, MutableSet):
 # ABCSetMap |-> init(_mapping), getitem, iter, len, contains, get, keys/values/items
 #               eq/ne/le/lt/gt/ge, and/or/sub/xor, isdisjoint, _from_iterable
 # MutableSet | add, discard -> remove, clear, pop, iand/ior/isub/ixor
-class Edges(ABCSetMap, MutableSet):
+class Edges(ChunkedEdges, ABCSetMap, MutableSet):
     def __init__(self, graph):
         self._graph = graph
         self._mapping = graph._succ
+        self._records = None  # AttrRecords while intern_attrs is on
     def __getitem__(self, ekeys):
+        datadict = self._attr_record(ekeys)
+        if self._records is not None:
+            return EdgeAttrs(self, ekeys)
+        return datadict
+    def _attr_record(self, ekeys):
         try:
             u,v = ekeys
         except TypeError:
@@ -128,42 +228,60 @@ class Edges(ABCSetMap, MutableSet):
         return DataView(self, weight)
     def selfloops(self):
         return ((n, n) for n, nbrs in self._graph._succ.items() if n in nbrs)
+    def _chunk_weights(self):
+        return map(len, self._mapping.values())
+    def _chunk(self, start, stop, order, data=False):
+        mapping = self._mapping
+        for n in order[start:stop]:
+            for nbr, ddict in mapping[n].items():
+                yield ((n, nbr), ddict) if data else (n, nbr)
 
     # Mutating Methods
     def _add_edge(self, u, v, attr_dict):
         if not isinstance(attr_dict, Mapping):  # Mapping includes dict
             raise NetworkXError( "The attr_dict argument must be a Mapping.")
+        graph = self._graph
         succ = self._mapping
-        pred = self._graph._pred
-        nodes = self._graph._nodes
+        pred = graph._pred
+        nodes = graph._nodes
+        nbrs_factory = graph.adjlist_inner_dict_factory
         # add nodes
         u_new = u not in succ
         v_new = v not in succ
         if u_new:
-            succ[u] = {} # fixme factory
-            pred[u] = {} # fixme factory
-            nodes[u] = {}
+            succ[u] = nbrs_factory()
+            pred[u] = nbrs_factory()
+            nodes[u] = wrap_attr_dict(u, graph._node_indexes,
+                                      graph.node_attr_dict_factory())
         if v_new:
-            succ[v] = {} # fixme factory
-            pred[v] = {} # fixme factory
-            nodes[v] = {}
+            succ[v] = nbrs_factory()
+            pred[v] = nbrs_factory()
+            nodes[v] = wrap_attr_dict(v, graph._node_indexes,
+                                      graph.node_attr_dict_factory())
         # find the edge
         if not (u_new or v_new):
             if v in succ[u]:
-                datadict = succ[u][v]
-                datadict.update(attr_dict)
+                self._update_data(u, v, attr_dict)
                 return False # not new edge
             # if not directed check other direction
             if (not self._graph._directed) and v in pred[u]:
-                datadict = pred[u][v]
-                datadict.update(attr_dict)
+                self._update_data(v, u, attr_dict)
                 return False # not new edge
             # else new edge-- drop out of if
         # add new edge
-        datadict = attr_dict
+        datadict = graph.edge_attr_dict_factory()
+        datadict.update(attr_dict)
+        if self._records is not None:
+            datadict = self._records.intern(datadict)
         succ[u][v] = datadict
         pred[v][u] = datadict
         return True # new edge
+    def _update_data(self, u, v, attr_dict):
+        # (u, v) is the stored orientation
+        if self._records is None:
+            self._mapping[u][v].update(attr_dict)
+        else:
+            self._rewrite_attrs((u, v), lambda dd: dd.update(attr_dict))
 
     def add(self, u, v, attr_dict=None, **attr):
         if attr_dict is None:
@@ -226,6 +344,41 @@ class Edges(ABCSetMap, MutableSet):
             succ[n].clear()
             pred[n].clear()
 
+    # Shared attribute records (see flyweight.py)
+    def intern_attrs(self, on=True):
+        """Share equal edge attribute dicts as read-only records.
+
+        While on, G.e[(u, v)] returns a writable proxy that gives the
+        edge a record of its own on write.
+        """
+        if on and self._records is None:
+            self._records = AttrRecords()
+        elif not on:
+            self._records = None
+        succ = self._graph._succ
+        pred = self._graph._pred
+        for u, nbrs in succ.items():
+            for v, dd in list(nbrs.items()):
+                if on:
+                    dd = self._records.intern(dd)
+                else:
+                    new = self._graph.edge_attr_dict_factory()
+                    new.update(dd)
+                    dd = new
+                nbrs[v] = dd
+                pred[v][u] = dd
+    def _rewrite_attrs(self, ekeys, change):
+        u, v = ekeys
+        succ = self._graph._succ
+        if v not in succ[u]:  # undirected edge stored as (v, u)
+            u, v = v, u
+        new = dict(succ[u][v])
+        change(new)
+        if self._records is not None:
+            new = self._records.intern(new)
+        succ[u][v] = new
+        self._graph._pred[v][u] = new
+
 # Adjacency
 # =========
 
@@ -246,7 +399,17 @@ class ABCAtlas(ItemsView):
     def _wrap_value(self, key):
         return ABCSetMap(self._mapping[key])
 
-class Adjacency(ABCAtlas):
+class Adjacency(PartitionedAdjacency, LinearOperators, ABCAtlas):
+    def _csr_source(self):
+        # undirected edges and the union view G.a sum succ and pred
+        mapping = self._mapping
+        if isinstance(mapping, AtlasUnion):
+            parts = [mapping._mapping, mapping._pnbrs]
+        else:
+            parts = [mapping]
+        nodes = list(parts[0])
+        index = dict(zip(nodes, range(len(nodes))))
+        return nodes, index, parts, False
     def list(self, nodelist=None):
         pass # fixme add list
     def matrix(self, nodelist=None, dtype=None, order=None,
@@ -292,11 +455,20 @@ class AtlasUnion(ABCSetMap):
 # =====
 
 class Graph(ABCSetMap):
+    # Storage factories; override in a subclass to use other mappings.
+    # Each is called with no arguments and returns a dict-like object.
+    node_dict_factory = dict           # node -> node attribute dict
+    node_attr_dict_factory = dict      # attribute dict of one node
+    adjlist_outer_dict_factory = dict  # node -> neighbor dict (succ/pred)
+    adjlist_inner_dict_factory = dict  # neighbor -> edge data
+    edge_attr_dict_factory = dict      # attribute dict of one edge
+
     def __init__(self, data=None, **attr):
-        self._nodes = nd = {}  # fixme factory
+        self._nodes = nd = self.node_dict_factory()
         self._mapping = nd
-        self._succ = succ = {}  # fixme factory
-        self._pred = pred = {}  # fixme factory
+        self._succ = succ = self.adjlist_outer_dict_factory()
+        self._pred = pred = self.adjlist_outer_dict_factory()
+        self._node_indexes = {}  # opt-in node attribute indexes
         self._directed = attr.pop("directed", False)
         # Interface
         self.n = Nodes(self)
@@ -314,11 +486,16 @@ class Graph(ABCSetMap):
         if data is None:
             return
         if hasattr(data, "_nodes"):
-            # new datadicts but with same info (containers in datadicts same)
+            # new datadicts but with same info (containers in datadicts
+            # same); arcs are kept as stored, also for directed=True
             self.data.update(data.data)
-            for n in data.n:
-                self.n.update(data.n.items())
+            self.n.update(data.n.items())
             self.e.update(data.e.items())
+        elif convert._graph_converter(data) is not None:
+            # graph.Graph, its subgraphs and snapshots (see convert.py)
+            d=self.data.copy()
+            convert.to_networkx_graph(data, create_using=self)
+            self.data.update(d)
         elif len(data) == 2:
             try:
                 V,E = data
@@ -349,6 +526,78 @@ class Graph(ABCSetMap):
     def directed(self):
         return self._directed
 
+    # Pickles and deep copies go through the compact form in compact.py,
+    # which holds each edge once instead of in both _succ and _pred.
+    _managed = ('_nodes', '_mapping', '_succ', '_pred', '_node_indexes',
+                '_directed', 'n', 'e', 'a', 'su', 'pr', 'data')
+
+    def __reduce_ex__(self, protocol):
+        return (__newobj__, (self.__class__,), self._compact_state(protocol))
+
+    def __getstate__(self):
+        return self._compact_state()
+
+    def _compact_state(self, protocol=0):
+        nodes = list(self._nodes)
+        sources, targets, _, datadicts = convert._edge_columns(self)
+        state = compact.table_state(nodes, compact.positions(nodes, sources),
+                                    compact.positions(nodes, targets),
+                                    list(self._nodes.values()), datadicts,
+                                    protocol)
+        state['directed'] = self._directed
+        state['interned'] = self.e._records is not None
+        state['node_indexes'] = [(attr, index_kind(idx))
+                                 for attr, idx in self._node_indexes.items()]
+        state['data'] = self.data
+        state['attrs'] = compact.extra_attrs(self, self._managed)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state['attrs'])
+        self.__init__(directed=state['directed'])
+        nodes, heads, tails, nodedicts, edgedicts = compact.load_table(
+            state, self.node_attr_dict_factory, self.edge_attr_dict_factory)
+        nodedata, succ, pred = self._nodes, self._succ, self._pred
+        nbrs_factory = self.adjlist_inner_dict_factory
+        for n, dd in zip(nodes, nodedicts):
+            nodedata[n] = dd
+            succ[n] = nbrs_factory()
+            pred[n] = nbrs_factory()
+        for u, v, dd in zip(map(nodes.__getitem__, heads),
+                            map(nodes.__getitem__, tails), edgedicts):
+            succ[u][v] = pred[v][u] = dd
+        if state['interned']:
+            self.e.intern_attrs()
+        for attr, kind in state['node_indexes']:
+            self.n.add_index(attr, kind)
+        self.data.update(state['data'])
+
+    def set_schema(self, edge=None, node=None, overflow=True):
+        """Store edge and/or node attributes as fixed-schema records
+        (see schema.py); existing attributes are converted."""
+        if edge is not None:
+            if self.e._records is not None:
+                raise NetworkXError(
+                    "Edge schemas cannot be combined with intern_attrs")
+            factory = Schema(edge, overflow)
+            records = [(u, v, factory(dd))
+                       for u, nbrs in self._succ.items()
+                       for v, dd in nbrs.items()]
+            self.edge_attr_dict_factory = factory
+            succ, pred = self._succ, self._pred
+            for u, v, new in records:
+                succ[u][v] = pred[v][u] = new
+        if node is not None:
+            factory = Schema(node, overflow)
+            nindex = self._node_indexes
+            records = [(n, factory(dd)) for n, dd in self._nodes.items()]
+            # the indexes hold the converted values
+            indexes = build_indexes(nindex, records)
+            self.node_attr_dict_factory = factory
+            nindex.update(indexes)
+            self._nodes.update((n, wrap_attr_dict(n, nindex, dd))
+                               for n, dd in records)
+
     def size(self, weight=None):
         if weight is None:
             return len(self.e)
@@ -361,7 +610,11 @@ class Graph(ABCSetMap):
 class SubDict(Mapping):
     def __init__(self, subkey, mapping):
         self._mapping = mapping
-        self._subkey = set(subkey) & set(mapping)
+        # iterate the smaller side; subkey is a set
+        if len(subkey) <= len(mapping):
+            self._subkey = set(k for k in subkey if k in mapping)
+        else:
+            self._subkey = set(k for k in mapping if k in subkey)
     def __getitem__(self, key):
         if key in self._subkey:
             return self._mapping[key]
@@ -381,10 +634,11 @@ class SubDictOfDict(SubDict):
 
 class Subgraph(Graph):
     def __init__(self, graph, subnodes):
-        self._subnodes = nodes = set(subnodes) & set(graph)
+        self._subnodes = nodes = set(n for n in subnodes if n in graph._nodes)
         self._mapping = self._nodes = SubDict(nodes, graph._nodes)
         self._succ = SubDictOfDict(nodes, graph._succ)
         self._pred = SubDictOfDict(nodes, graph._pred)
+        self._node_indexes = {}  # where() scans the subgraph
         self._directed = graph._directed
         self.data = graph.data
         # Interface
@@ -398,6 +652,12 @@ class Subgraph(Graph):
             self.su = self.a
             self.pr = self.a
 
+    _managed = Graph._managed + ('_subnodes',)
+
+    def __reduce_ex__(self, protocol):
+        # a pickled or copied view is a standalone graph of its nodes
+        return (Graph.__new__, (Graph,), self._compact_state(protocol))
+
 
 # Degree
 # ======
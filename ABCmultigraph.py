@@ -1,6 +1,8 @@
 from collections import Mapping, KeysView, ItemsView, MutableSet
-from networkx import NetworkXError
+from exception import NetworkXError
 import convert
+from chunks import ChunkedEdges, PartitionedAdjacency
+from linalg import LinearOperators
 from copy import deepcopy
 
 # Notes to help me remember what the ABC classes provide:
@@ -67,9 +69,11 @@ class Nodes(ABCSetMap, MutableSet):
                 raise NetworkXError(msg)
         nodes = self._mapping
         if n not in nodes:
-            self._graph._succ[n] = {} # FIXME factory
-            self._graph._pred[n] = {} # FIXME factory
-            nodes[n] = attr_dict
+            graph = self._graph
+            graph._succ[n] = graph.adjlist_inner_dict_factory()
+            graph._pred[n] = graph.adjlist_inner_dict_factory()
+            nodes[n] = newdict = graph.node_attr_dict_factory()
+            newdict.update(attr_dict)
             return True # new node
         # update attr even if node already exists
         nodes[n].update(attr_dict)
@@ -88,6 +92,49 @@ class Nodes(ABCSetMap, MutableSet):
         del succ[n]          # remove node from succ
         del pred[n]          # remove node from pred
         return True
+    def remove_many(self, nbunch):
+        # Batched discard: neighbor-dict deletions are grouped per
+        # surviving neighbor and the succ/pred dicts of removed nodes
+        # are dropped whole. Returns the number of edges removed.
+        nodes = self._mapping
+        succ = self._graph._succ
+        pred = self._graph._pred
+        doomed = set(n for n in nbunch if n in nodes)
+        if self._graph._multigraph:
+            count = len
+        else:
+            count = lambda keydict: 1
+        pred_drop = {}
+        succ_drop = {}
+        nedges = 0
+        for n in doomed:
+            for u, kd in succ[n].items():
+                nedges += count(kd)
+                if u not in doomed:
+                    pred_drop.setdefault(u, []).append(n)
+            for u, kd in pred[n].items():
+                if u not in doomed:
+                    succ_drop.setdefault(u, []).append(n)
+                    nedges += count(kd)
+        for u, gone in pred_drop.items():
+            nbrs = pred[u]
+            for n in gone:
+                del nbrs[n]
+        for u, gone in succ_drop.items():
+            nbrs = succ[u]
+            for n in gone:
+                del nbrs[n]
+        for n in doomed:
+            del succ[n]
+            del pred[n]
+            del nodes[n]
+        return nedges
+    def __isub__(self, nbunch):
+        if nbunch is self:
+            self.clear()
+        else:
+            self.remove_many(nbunch)
+        return self
     def update(self, nodes, **attr):
         for n in nodes:
             try:
@@ -108,7 +155,7 @@ class Nodes(ABCSetMap, MutableSet):
 # ABCSetMap |-> init(_mapping), getitem, iter, len, contains, get, keys/values/items
 #               eq/ne/le/lt/gt/ge, and/or/sub/xor, isdisjoint, _from_iterable
 # MutableSet | add, discard -> remove, clear, pop, iand/ior/isub/ixor
-class Edges(ABCSetMap, MutableSet):
+class Edges(ChunkedEdges, ABCSetMap, MutableSet):
     def __init__(self, graph):
         self._graph = graph
         self._mapping = graph._succ
@@ -135,25 +182,34 @@ class Edges(ABCSetMap, MutableSet):
         return DataView(self, weight)
     def selfloops(self):
         return ((n, n) for n, nbrs in self._graph._succ.items() if n in nbrs)
+    def _chunk_weights(self):
+        return map(len, self._mapping.values())
+    def _chunk(self, start, stop, order, data=False):
+        mapping = self._mapping
+        for n in order[start:stop]:
+            for nbr, ddict in mapping[n].items():
+                yield ((n, nbr), ddict) if data else (n, nbr)
 
     # Mutating Methods
     def _add_edge(self, u, v, attr_dict):
         if not isinstance(attr_dict, Mapping):  # Mapping includes dict
             raise NetworkXError( "The attr_dict argument must be a Mapping.")
+        graph = self._graph
         succ = self._mapping
-        pred = self._graph._pred
-        nodes = self._graph._nodes
+        pred = graph._pred
+        nodes = graph._nodes
+        nbrs_factory = graph.adjlist_inner_dict_factory
         # add nodes
         u_new = u not in succ
         v_new = v not in succ
         if u_new:
-            succ[u] = {} # fixme factory
-            pred[u] = {} # fixme factory
-            nodes[u] = {}
+            succ[u] = nbrs_factory()
+            pred[u] = nbrs_factory()
+            nodes[u] = graph.node_attr_dict_factory()
         if v_new:
-            succ[v] = {} # fixme factory
-            pred[v] = {} # fixme factory
-            nodes[v] = {}
+            succ[v] = nbrs_factory()
+            pred[v] = nbrs_factory()
+            nodes[v] = graph.node_attr_dict_factory()
         # find the edge
         if not (u_new or v_new):
             if v in succ[u]:
@@ -167,7 +223,8 @@ class Edges(ABCSetMap, MutableSet):
                 return False # not new edge
             # else new edge-- drop out of if
         # add new edge
-        datadict = attr_dict
+        datadict = graph.edge_attr_dict_factory()
+        datadict.update(attr_dict)
         succ[u][v] = datadict
         pred[v][u] = datadict
         return True # new edge
@@ -267,6 +324,14 @@ class MultiEdges(Edges):
         """size of graph"""
         mi = self._mapping.items()
         return sum(len(kd) for n, nbrs in mi for nbr,kd in nbrs.items())
+    def _chunk_weights(self):
+        return (sum(map(len, nbrs.values())) for nbrs in self._mapping.values())
+    def _chunk(self, start, stop, order, data=False):
+        mapping = self._mapping
+        for n in order[start:stop]:
+            for nbr, keydict in mapping[n].items():
+                for k, ddict in keydict.items():
+                    yield ((n, nbr, k), ddict) if data else (n, nbr, k)
     def data(self, weight):
         return DataView(self, weight)
     def selfloops(self):
@@ -278,20 +343,22 @@ class MultiEdges(Edges):
     def _add_edge(self, u, v, k, attr_dict):
         if not isinstance(attr_dict, Mapping):  # Mapping includes dict
             raise NetworkXError( "The attr_dict argument must be a Mapping.")
+        graph = self._graph
         succ = self._mapping
-        pred = self._graph._pred
-        nodes = self._graph._nodes
+        pred = graph._pred
+        nodes = graph._nodes
+        nbrs_factory = graph.adjlist_inner_dict_factory
         # add nodes
         u_new = u not in succ
         v_new = v not in succ
         if u_new:
-            succ[u] = {}  # fixme factory
-            pred[u] = {}  # fixme factory
-            nodes[u] = {}
+            succ[u] = nbrs_factory()
+            pred[u] = nbrs_factory()
+            nodes[u] = graph.node_attr_dict_factory()
         if v_new:
-            succ[v] = {}  # fixme factory
-            pred[v] = {}  # fixme factory
-            nodes[v] = {}
+            succ[v] = nbrs_factory()
+            pred[v] = nbrs_factory()
+            nodes[v] = graph.node_attr_dict_factory()
         # find the edge
         if not (u_new or v_new):
             new_succ = new_pred = False
@@ -306,7 +373,8 @@ class MultiEdges(Edges):
                     k = len(skeydict)
                     while k in skeydict:
                         k += 1
-                datadict = attr_dict
+                datadict = graph.edge_attr_dict_factory()
+                datadict.update(attr_dict)
                 skeydict[k] = datadict
                 return True  # New edge
             # if not directed check other direction
@@ -321,14 +389,17 @@ class MultiEdges(Edges):
                     k = len(pkeydict)
                     while k in pkeydict:
                         k += 1
-                datadict = attr_dict
+                datadict = graph.edge_attr_dict_factory()
+                datadict.update(attr_dict)
                 pkeydict[k] = datadict
                 return True  # New edge
             # else new edge-- drop out of if
         # add new edge
         k = 0 if k is None else k
-        datadict = attr_dict
-        keydict = {k: datadict}  # fixme factory
+        datadict = graph.edge_attr_dict_factory()
+        datadict.update(attr_dict)
+        keydict = graph.edge_key_dict_factory()
+        keydict[k] = datadict
         succ[u][v] = keydict
         pred[v][u] = keydict
         return True # new edge
@@ -459,7 +530,17 @@ class ABCMultiAtlas(ABCAtlas):
     def _wrap_value(self, key):
         return ABCAtlas(self._mapping[key])
 
-class Adjacency(ABCAtlas):
+class Adjacency(PartitionedAdjacency, LinearOperators, ABCAtlas):
+    def _csr_source(self):
+        # undirected edges and the union view G.a sum succ and pred
+        mapping = self._mapping
+        if isinstance(mapping, AtlasUnion):
+            parts = [mapping._mapping, mapping._pnbrs]
+        else:
+            parts = [mapping]
+        nodes = list(parts[0])
+        index = dict(zip(nodes, range(len(nodes))))
+        return nodes, index, parts, isinstance(self, MultiAdjacency)
     def list(self, nodelist=None):
         pass # fixme add list
     def matrix(self, nodelist=None, dtype=None, order=None,
@@ -527,11 +608,20 @@ class MultiAtlasUnion(AtlasUnion):
 #    Edges = MultiEdges
 #    Adjacency = MultiAdjacency
 class Graph(ABCSetMap):
+    # Storage factories; override in a subclass to use other mappings.
+    # Each is called with no arguments and returns a dict-like object.
+    node_dict_factory = dict           # node -> node attribute dict
+    node_attr_dict_factory = dict      # attribute dict of one node
+    adjlist_outer_dict_factory = dict  # node -> neighbor dict (succ/pred)
+    adjlist_inner_dict_factory = dict  # neighbor -> edge data (or keydict)
+    edge_key_dict_factory = dict       # edge key -> attribute dict
+    edge_attr_dict_factory = dict      # attribute dict of one edge
+
     def __init__(self, data=None, **attr):
-        self._nodes = nd = {}  # fixme factory
+        self._nodes = nd = self.node_dict_factory()
         self._mapping = nd
-        self._succ = succ = {}  # fixme factory
-        self._pred = pred = {}  # fixme factory
+        self._succ = succ = self.adjlist_outer_dict_factory()
+        self._pred = pred = self.adjlist_outer_dict_factory()
         self._directed = attr.pop("directed", False)
         self._multigraph = attr.pop("multigraph", False)
         if self._multigraph:
@@ -558,11 +648,16 @@ class Graph(ABCSetMap):
         if data is None:
             return
         if hasattr(data, "_nodes"):
-            # new datadicts but with same info (containers in datadicts same)
+            # new datadicts but with same info (containers in datadicts
+            # same); arcs are kept as stored, also for directed=True
             self.data.update(data.data)
-            for n in data.n:
-                self.n.update(data.n.items())
+            self.n.update(data.n.items())
             self.e.update(data.e.items())
+        elif convert._graph_converter(data) is not None:
+            # graph.Graph, its subgraphs and snapshots (see convert.py)
+            d=self.data.copy()
+            convert.to_networkx_graph(data, create_using=self)
+            self.data.update(d)
         elif len(data) == 2:
             try:
                 V,E = data
@@ -9,8 +9,7 @@
 from __future__ import division
 from copy import deepcopy
 
-import networkx as nx
-from networkx.exception import NetworkXError
+from exception import NetworkXError
 
 from ABCgraph import Graph, degree
 
@@ -225,15 +224,21 @@ class nxGraph(Graph):
             # create new graph and copy subgraph into it
             H = self.__class__()
             # copy node and attribute dictionaries
+            Hsucc = H._succ
+            Hpred = H._pred
             for n in s.n:
                 H._nodes[n] = self._nodes[n]
-                H._succ[n] = {}
-                H._pred[n] = {}
-            # add nodes and edges (undirected method)
+                Hsucc[n] = H.adjlist_inner_dict_factory()
+                Hpred[n] = H.adjlist_inner_dict_factory()
+            # add edges sharing their datadicts (undirected method)
+            undirected = not H._directed
             for n,snbrs in s.a:
                 for nbr, d in snbrs.items():
                     if nbr in H.n:
-                        H.e._add_edge(n, nbr, d)
+                        if nbr in Hsucc[n] or (undirected and nbr in Hpred[n]):
+                            continue
+                        Hsucc[n][nbr] = d
+                        Hpred[nbr][n] = d
             H.graph = self.data
         else:
             H = s
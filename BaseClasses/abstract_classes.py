@@ -159,7 +159,7 @@ class ABCGraphData(object):
     #        predecessors_iter, neighbors_iter, successors_data,
     #        predecessors_data, neighbors_data,
     #        out_degree, in_degree, degree, order
-    #        ->   size, clear, clear_edges
+    #        ->   size, remove_nodes, clear, clear_edges
     __metaclass__ = ABCMeta
 
     @abstractmethod
@@ -226,6 +226,13 @@ class ABCGraphData(object):
     def size(self):
         deg = self.out_degree
         return sum(deg(n) for n in self.nodes_iter())
+    def remove_nodes(self, nodes):
+        # generic fallback; backends should batch the neighbor cleanup
+        before = self.size()
+        present = set(self.nodes_iter())
+        for n in set(nodes) & present:
+            self.remove_node(n)
+        return before - self.size()
     def clear():
         for n in list(self.nodes_iter()):
             self.remove_node(n)
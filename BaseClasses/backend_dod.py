@@ -1,4 +1,6 @@
 from __future__ import division
+from bisect import bisect_left
+from itertools import islice
 from abstract_classes import ABCGraphData
 
 #ABCGraphData | add_node, remove_node, add_edge, remove_edge
@@ -8,6 +10,9 @@ from abstract_classes import ABCGraphData
 # in_degree, out_degree, degree, order
 #  -> size, clear, clear_edges
 class DodGraphData(ABCGraphData):
+    # attribute dict factories, see set_attr_factories
+    node_attr_dict_factory = dict
+    edge_attr_dict_factory = dict
     def __init__(self, directed, multigraph):
         self._nodes = {}
         self._succ = {}
@@ -18,8 +23,7 @@ class DodGraphData(ABCGraphData):
         if node in self._nodes:
             self._nodes[node].update(dd)
             return False
-        self._nodes[node] = nn = {}
-        nn.update(dd)
+        self._nodes[node] = self.node_attr_dict_factory(dd)
         self._succ[node] = {}
         self._pred[node] = {}
         return True
@@ -31,6 +35,37 @@ class DodGraphData(ABCGraphData):
             del self._succ[nbr][node]
         del self._succ[node]
         del self._pred[node]
+    def remove_nodes(self, nodes):
+        # batched remove_node: group neighbor-dict deletions per
+        # surviving neighbor and drop whole dicts of removed nodes
+        succ = self._succ
+        pred = self._pred
+        doomed = set(n for n in nodes if n in self._nodes)
+        pred_drop = {}
+        succ_drop = {}
+        nedges = 0
+        for n in doomed:
+            nedges += len(succ[n])
+            for nbr in succ[n]:
+                if nbr not in doomed:
+                    pred_drop.setdefault(nbr, []).append(n)
+            for nbr in pred[n]:
+                if nbr not in doomed:
+                    succ_drop.setdefault(nbr, []).append(n)
+                    nedges += 1
+        for nbr, gone in pred_drop.items():
+            nbrdict = pred[nbr]
+            for n in gone:
+                del nbrdict[n]
+        for nbr, gone in succ_drop.items():
+            nbrdict = succ[nbr]
+            for n in gone:
+                del nbrdict[n]
+        for n in doomed:
+            del self._nodes[n]
+            del succ[n]
+            del pred[n]
+        return nedges
     def add_edge(self, ekeys, dd):
         u,v = ekeys
         succ = self._succ
@@ -40,11 +75,11 @@ class DodGraphData(ABCGraphData):
         u_new = u not in self._succ
         v_new = v not in self._succ
         if u_new:
-            nodes[u] = {}
+            nodes[u] = self.node_attr_dict_factory()
             succ[u] = {}
             pred[u] = {}
         if v_new:
-            nodes[v] = {}
+            nodes[v] = self.node_attr_dict_factory()
             succ[v] = {}
             pred[v] = {}
         # find edge
@@ -56,9 +91,26 @@ class DodGraphData(ABCGraphData):
                 pred[u][v].update(dd)
                 return False
         # new edge
+        if self.edge_attr_dict_factory is not dict:
+            dd = self.edge_attr_dict_factory(dd)
         succ[u][v] = dd
         pred[v][u] = dd
         return True
+    def set_attr_factories(self, edge=None, node=None):
+        """Build new edge/node attribute dicts with these factories and
+        convert the existing ones. A factory is called with the source
+        mapping, e.g. a schema.Schema for fixed-slot records."""
+        if edge is not None:
+            self.edge_attr_dict_factory = edge
+            pred = self._pred
+            for u, nbrs in self._succ.items():
+                for v, dd in list(nbrs.items()):
+                    nbrs[v] = pred[v][u] = edge(dd)
+        if node is not None:
+            self.node_attr_dict_factory = node
+            nodes = self._nodes
+            for n, dd in list(nodes.items()):
+                nodes[n] = node(dd)
     def remove_edge(self, ekeys):
         u,v = ekeys
         try:
@@ -68,10 +120,27 @@ class DodGraphData(ABCGraphData):
         except KeyError:
             return False
     # Reporting methods
-    def edges_iter(self):
-        for n,nbrs in self._succ.items():
+    def edges_iter(self, start=0, stop=None):
+        # the edges of the nodes at positions start to stop
+        for n,nbrs in islice(self._succ.items(), start, stop):
             for nbr in nbrs:
                 yield n,nbr
+    def edge_ranges(self, k):
+        """Return at most k (start, stop) ranges of node positions that
+        split the edges for edges_iter into parts of about equal size."""
+        totals = []
+        total = 0
+        for nbrs in self._succ.values():
+            total += len(nbrs)
+            totals.append(total)
+        bounds = [0]
+        for i in range(1, k):
+            stop = bisect_left(totals, -(-total * i // k)) + 1
+            if bounds[-1] < stop < len(totals):
+                bounds.append(stop)
+        bounds.append(len(totals))
+        return [(start, stop) for start, stop in zip(bounds, bounds[1:])
+                if start < stop]
     def edges_data(self, weight_func=None):
         if weight_func is None:
             weight_func = lambda x:x
@@ -161,6 +161,16 @@ class Nodes(ABCMutableSetMap):
 # Edges
 # =====
 
+class EdgeChunk(object):
+    """The edges of the nodes at positions start to stop of a backend;
+    see Edges.chunks."""
+    def __init__(self, graph, start, stop):
+        self._graph = graph
+        self.start = start
+        self.stop = stop
+    def __iter__(self):
+        return self._graph.edges_iter(self.start, self.stop)
+
 # MutableSetMap | getitem, data, add, discard -> init(_mapping), iter, len, contains
 #               eq/ne/le/lt/gt/ge, and/or/sub/xor, isdisjoint, _from_iterable
 class Edges(ABCMutableSetMap):
@@ -184,6 +194,11 @@ class Edges(ABCMutableSetMap):
         return self._graph.edges_iter()
     def __len__(self):
         return self._graph.size()
+    def chunks(self, k):
+        """Return at most k EdgeChunks that together yield each edge once,
+        for backends with edge_ranges (DodGraphData)."""
+        return [EdgeChunk(self._graph, start, stop)
+                for start, stop in self._graph.edge_ranges(k)]
     def data(self, weight=None):
         if weight is None:
             return ItemsView(self)
@@ -312,6 +327,8 @@ class Graph(ABCGraph):
         if with_data:
             return deepcopy(self)
         return self.__class__(self)
+    def set_attr_factories(self, edge=None, node=None):
+        self._graph.set_attr_factories(edge, node)
     @property
     def directed(self):
         return self._directed
@@ -58,6 +58,8 @@ if __name__ == "__main__":
     assert(list(DG.adjacency[4].data()) == [(6, {}), (7, {'weight': 2})])
     #print("Predecessors of 2:", list(DG.pred[2]))
     assert(list(DG.pred[2]) == [])
+    assert(sorted(e for c in DG.edges.chunks(2) for e in c) == sorted(DG.edges))
+    assert(sum(len(list(c)) for c in DG.edges.chunks(5)) == len(DG.edges))
     #print("Predecessors of 3:", list(DG.pred[3]))
     assert(list(DG.pred[3]) == [])
     #print("Predecessors of 1:", list(DG.pred[1]))
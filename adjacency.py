@@ -1,4 +1,7 @@
 from collections import MappingView
+from exception import NetworkXError
+from chunks import PartitionedAdjacency
+from linalg import LinearOperators
 
 class NbrDict(MappingView):
     __slots__ = ["_mapping"]
@@ -26,47 +29,82 @@ class NbrDict(MappingView):
         return not self.__eq__(other)
 
 
-class Adjacency(NbrDict):
+class GraphNbrDict(NbrDict):
+    # The neighbors of node _node in a graph's adjacency _adj: the
+    # datadicts it returns may be written into, so they are owned first
+    # (see versions.py).
+    __slots__ = ["_adj", "_node", "_versions"]
+    def __init__(self, mapping, adj, node, versions):
+        self._mapping = mapping
+        self._adj = adj
+        self._node = node
+        self._versions = versions
+    def __getitem__(self, n):
+        if n not in self._mapping:
+            raise KeyError(n)
+        return self._versions.own_edge_attrs(self._adj, self._node, n)
+
+
+class Adjacency(PartitionedAdjacency, LinearOperators, NbrDict):
     # __slots__= ["_mapping","_cache"]
-    def __init__(self, mapping):
+    def __init__(self, mapping, graph=None):
         self._mapping = mapping
         self._cache = {}
-    def __iter__(self):
-        for n in self._mapping:
-            if n in self._cache:
-                yield (n, self._cache[n])
+        # the graph's node index numbers rows/columns when no nodelist
+        # is given, so exports skip rebuilding it and line up
+        if graph is None:
+            self._index = self._versions = self._memo = None
+        else:
+            self._index = graph._node_ordinals
+            self._versions = graph._versions
+            self._memo = graph._memo  # keeps the csr() export
+    def _nbrdict(self, n, nbrs):
+        # NbrDicts are read-only so use wrapper for mapping[n]. Writers
+        # may replace mapping[n] by a copy (see versions.py), so a cached
+        # wrapper is only reused while it wraps the current dict.
+        nbrdict = self._cache.get(n)
+        if nbrdict is None or nbrdict._mapping is not nbrs:
+            if self._versions is None:
+                nbrdict = NbrDict(nbrs)
             else:
-                # NbrDicts are read-only so use wrapper for mapping[n]
-                self._cache[n] = nbrdict = NbrDict(self._mapping[n])
-                yield n,nbrdict
+                nbrdict = GraphNbrDict(nbrs, self._mapping, n, self._versions)
+            self._cache[n] = nbrdict
+        return nbrdict
+    def __iter__(self):
+        for n, nbrs in self._mapping.items():
+            yield n, self._nbrdict(n, nbrs)
     def __getitem__(self, n):
-        if n in self._cache:
-            return self._cache[n]
         if n in self._mapping:
-            # NbrDicts are read-only so use wrapper for mapping[n]
-            self._cache[n] = nbrdict = NbrDict(self._mapping[n])
-            return nbrdict
+            return self._nbrdict(n, self._mapping[n])
         raise KeyError
+    def _chunk(self, start, stop, order):
+        mapping = self._mapping
+        for n in order[start:stop]:
+            yield n, self._nbrdict(n, mapping[n])
     def data(self):
-        # In Python3 we can remove the "set" 
-        for n in set(self._mapping.keys()) - set(self._cache.keys()):
-            # NbrDicts are read-only so use wrapper for mapping[n]
-            self.cache[n] = NbrDict(self.mapping[n])
-        return self._cache.values()
+        return [nbrdict for n, nbrdict in self]
     def items(self):
-        for n in set(self._mapping.keys()) - set(self._cache.keys()):
-            self.cache[n] = NbrDict(self.mapping[n])
-        return self._cache.items() # Not readonly datadict
+        return list(self)
 
-    def list(self, nodelist=None):
+    def _nodelist_index(self, nodelist):
         if nodelist is None:
-            nodelist = list(n for n,nbrs in self)
+            if self._index is not None:
+                with self._versions.lock:
+                    self._index.compact(self._versions.save)
+                return self._index.nodes, self._index
+            nodelist = list(self._mapping)
         nodeset = set(nodelist)
         if len(nodelist) != len(nodeset):
             msg = "Ambiguous ordering: `nodelist` contained duplicates."
-            raise nx.NetworkXError(msg)
-        nlen = len(nodelist)
-        index = dict(zip(nodelist,range(nlen)))
+            raise NetworkXError(msg)
+        return nodelist, dict(zip(nodelist, range(len(nodelist))))
+
+    def _csr_source(self):
+        nodelist, index = self._nodelist_index(None)
+        return list(nodelist), index, [self._mapping], False
+
+    def list(self, nodelist=None):
+        nodelist, index = self._nodelist_index(nodelist)
         l = []
         for n in nodelist:
               l.append([index[nbr] for nbr in self[n]])
@@ -75,14 +113,8 @@ class Adjacency(NbrDict):
     def matrix(self, nodelist=None, dtype=None, order=None,
                     multigraph_weight=sum, weight='weight', nonedge=0.0):
         import numpy as np
-        if nodelist is None:
-            nodelist = list(n for n,nbrs in self)
-        nodeset = set(nodelist)
-        if len(nodelist) != len(nodeset):
-            msg = "Ambiguous ordering: `nodelist` contained duplicates."
-            raise nx.NetworkXError(msg)
+        nodelist, index = self._nodelist_index(nodelist)
         nlen=len(nodelist)
-        index=dict(zip(nodelist,range(nlen)))
         M = np.zeros((nlen,nlen), dtype=dtype, order=order) + np.nan
         for u,nbrdict in self:
             for v,d in nbrdict.items():
@@ -0,0 +1,111 @@
+"""Read and write edge tables as Apache Arrow data and Parquet files.
+
+An edge table has one row per edge: a source column, a target column,
+an edge key column for multigraphs, and one column per edge attribute.
+Null cells mean the edge lacks that attribute.
+
+Reads go a record batch at a time. read_parquet only loads the columns
+that are asked for, so unused attributes are never decoded. Writes
+build each Arrow column straight from the graph's adjacency (see
+convert.to_pandas_edgelist). Isolated nodes are not part of an edge
+table.
+
+Requires pyarrow, which is imported when these functions are called.
+"""
+from itertools import chain, repeat
+from operator import methodcaller
+
+from convert import _prep_create_using, _is, _edge_columns
+
+__all__ = ['from_arrow', 'to_arrow', 'read_parquet', 'write_parquet']
+
+
+def _attr_columns(names, source, target, edge_attr, edge_key):
+    if edge_attr is True:
+        return [c for c in names if c not in (source, target, edge_key)]
+    if edge_attr is None:
+        return []
+    if isinstance(edge_attr, (list, tuple)):
+        return list(edge_attr)
+    return [edge_attr]
+
+def _add_batch(G, batch, source, target, attrs, edge_key):
+    sources = batch.column(source).to_pylist()
+    targets = batch.column(target).to_pylist()
+    if attrs:
+        datadicts = batch.select(attrs).to_pylist()
+        if any(batch.column(a).null_count for a in attrs):
+            datadicts = [dict((k, v) for k, v in dd.items() if v is not None)
+                         for dd in datadicts]
+    else:
+        datadicts = repeat({})
+    if edge_key is not None and _is(G, 'multigraph'):
+        keys = batch.column(edge_key).to_pylist()
+        G.e.update(zip(sources, targets, keys, datadicts))
+    else:
+        G.e.update(zip(sources, targets, datadicts))
+
+def from_arrow(data, source='source', target='target', edge_attr=None,
+               create_using=None, edge_key=None):
+    """Return a graph from an Arrow Table, a RecordBatch or an iterable
+    of RecordBatches, one edge per row.
+
+    edge_attr names the attribute columns to keep (a label, a list, or
+    True for all others). The graph is filled a batch at a time through
+    G.e.update, by default into a new graph.Graph.
+    """
+    if create_using is None:
+        from graph import Graph
+        create_using = Graph()
+    G=_prep_create_using(create_using)
+    import pyarrow as pa
+    if isinstance(data, pa.Table):
+        batches = data.to_batches()
+    elif isinstance(data, pa.RecordBatch):
+        batches = [data]
+    else:
+        batches = data
+    attrs = None
+    for batch in batches:
+        if attrs is None:
+            attrs = _attr_columns(batch.schema.names, source, target,
+                                  edge_attr, edge_key)
+        _add_batch(G, batch, source, target, attrs, edge_key)
+    return G
+
+def read_parquet(path, source='source', target='target', edge_attr=None,
+                 create_using=None, edge_key=None, batch_size=65536):
+    """Return a graph from the edge table in Parquet file `path`.
+
+    Only the endpoint, key and edge_attr columns are read, and the file
+    is streamed in batches of at most `batch_size` rows.
+    """
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path)
+    attrs = _attr_columns(pf.schema_arrow.names, source, target,
+                          edge_attr, edge_key)
+    columns = [source, target] + attrs
+    if edge_key is not None:
+        columns.append(edge_key)
+    batches = pf.iter_batches(batch_size=batch_size, columns=columns)
+    return from_arrow(batches, source, target, attrs, create_using, edge_key)
+
+def to_arrow(G, source='source', target='target', edge_key='key'):
+    """Return the edges of G as an Arrow Table, one row per edge."""
+    import pyarrow as pa
+    sources, targets, keys, datadicts = _edge_columns(G)
+    columns = {source: pa.array(sources), target: pa.array(targets)}
+    if keys is not None:
+        columns[edge_key] = pa.array(keys)
+    for attr in dict.fromkeys(chain.from_iterable(datadicts)):
+        columns[attr] = pa.array(list(map(methodcaller('get', attr),
+                                          datadicts)))
+    return pa.table(columns)
+
+def write_parquet(G, path, source='source', target='target', edge_key='key',
+                  row_group_size=None, **kwds):
+    """Write the edges of G to Parquet file `path`; extra keywords go to
+    pyarrow.parquet.write_table (compression, ...)."""
+    import pyarrow.parquet as pq
+    pq.write_table(to_arrow(G, source, target, edge_key), path,
+                   row_group_size=row_group_size, **kwds)
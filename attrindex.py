@@ -0,0 +1,392 @@
+"""Secondary indexes on node/edge attribute values.
+
+An index maps attribute values to the keys (nodes or edge tuples) whose
+datadict holds that value. ``HashIndex`` answers equality lookups,
+``SortedIndex`` also answers range lookups (values must be hashable
+and mutually comparable). Indexes are opt-in and are maintained by the
+Nodes/Edges mutating methods; they are queried with
+``where(**conditions)``.
+
+Conditions are ``attr=value`` for equality or ``attr__op=value`` with op
+one of lt, le, gt, ge, ne.
+
+Values are checked (``check_item``) before a datadict is stored, so a
+value an index cannot hold raises NetworkXError and leaves the graph
+unchanged.
+"""
+from bisect import bisect_left, bisect_right
+import operator
+
+from exception import NetworkXError
+from schema import Record
+
+_ops = {'eq': operator.eq, 'ne': operator.ne,
+        'lt': operator.lt, 'le': operator.le,
+        'gt': operator.gt, 'ge': operator.ge}
+
+
+class HashIndex(object):
+    __slots__ = ('_map',)
+    def __init__(self):
+        self._map = {}
+    def __repr__(self):
+        return '{0.__class__.__name__}({0._map})'.format(self)
+    def check(self, value):
+        try:
+            hash(value)
+        except TypeError:
+            raise NetworkXError("Cannot index unhashable value %r" % (value,))
+    def add(self, key, value):
+        try:
+            self._map[value].add(key)
+        except KeyError:
+            self._map[value] = {key}
+    def build(self, items):
+        for key, value in items:
+            self.check(value)
+            self.add(key, value)
+    def discard(self, key, value):
+        try:
+            keys = self._map[value]
+            keys.remove(key)
+        except KeyError:
+            return False
+        if not keys:
+            del self._map[value]
+        return True
+    def clear(self):
+        self._map.clear()
+    def count(self, op, value):
+        # cheap upper bound on the number of matches, None if unsupported
+        if op == 'eq':
+            return len(self._map.get(value, ()))
+        return None
+    def lookup(self, op, value):
+        return iter(self._map.get(value, ()))
+
+
+class SortedIndex(object):
+    # Keys are held per value as in HashIndex, next to a sorted list of
+    # the distinct values, so values must be hashable as well. Values new
+    # to the index are buffered in _pending and merged in before the next
+    # lookup: bulk inserts sort once, and an update (discard then add)
+    # never rebuilds the list.
+    __slots__ = ('_map', '_values', '_pending')
+    def __init__(self):
+        self._map = {}         # value -> set of keys
+        self._values = []      # sorted distinct values
+        self._pending = set()  # distinct values not merged in yet
+    def __repr__(self):
+        self._merge()
+        return '{0.__class__.__name__}({1})'.format(self,
+                [(v, k) for v in self._values for k in self._map[v]])
+    def _merge(self):
+        pending = self._pending
+        if not pending:
+            return
+        values = self._values
+        if len(pending) * 32 < len(values):
+            for value in pending:
+                values.insert(bisect_left(values, value), value)
+        else:
+            values.extend(pending)
+            values.sort()
+        pending.clear()
+    def check(self, value):
+        try:
+            hash(value)
+        except TypeError:
+            raise NetworkXError("Cannot index unhashable value %r" % (value,))
+        # compare with one held value: mixed types fail here, not later
+        if self._values:
+            first = self._values[0]
+        elif self._pending:
+            first = next(iter(self._pending))
+        else:
+            return
+        try:
+            value < first
+        except TypeError:
+            raise NetworkXError("Cannot order value %r with the indexed "
+                                "values in a sorted index" % (value,))
+    def add(self, key, value):
+        try:
+            self._map[value].add(key)
+        except KeyError:
+            self._map[value] = {key}
+            self._pending.add(value)
+    def build(self, items):
+        index = {}
+        for key, value in items:
+            self.check(value)
+            try:
+                index[value].add(key)
+            except KeyError:
+                index[value] = {key}
+        try:
+            values = sorted(index)
+        except TypeError:
+            raise NetworkXError("Cannot build a sorted index over values "
+                                "that do not compare with each other")
+        if self._map:
+            for value, keys in index.items():
+                for key in keys:
+                    self.add(key, value)
+            self._merge()
+        else:
+            self._map = index
+            self._values = values
+    def discard(self, key, value):
+        try:
+            keys = self._map[value]
+            keys.remove(key)
+        except KeyError:
+            return False
+        if not keys:
+            del self._map[value]
+            if value in self._pending:
+                self._pending.discard(value)
+            else:
+                values = self._values
+                del values[bisect_left(values, value)]
+        return True
+    def clear(self):
+        self._map.clear()
+        del self._values[:]
+        self._pending.clear()
+    def _bounds(self, op, value):
+        self._merge()
+        vals = self._values
+        if op == 'eq':
+            return bisect_left(vals, value), bisect_right(vals, value)
+        if op == 'lt':
+            return 0, bisect_left(vals, value)
+        if op == 'le':
+            return 0, bisect_right(vals, value)
+        if op == 'gt':
+            return bisect_right(vals, value), len(vals)
+        if op == 'ge':
+            return bisect_left(vals, value), len(vals)
+        return None
+    def count(self, op, value):
+        bounds = self._bounds(op, value)
+        if bounds is None:
+            return None
+        lo, hi = bounds
+        return sum(map(len, map(self._map.__getitem__, self._values[lo:hi])))
+    def lookup(self, op, value):
+        lo, hi = self._bounds(op, value)
+        index = self._map
+        return iter([key for v in self._values[lo:hi] for key in index[v]])
+
+
+index_kinds = {'hash': HashIndex, 'sorted': SortedIndex}
+
+def make_index(kind):
+    try:
+        return index_kinds[kind]()
+    except KeyError:
+        raise NetworkXError("Unknown index kind %r; use one of %s" %
+                            (kind, sorted(index_kinds)))
+
+def index_kind(index):
+    """Return the kind that make_index takes to build an index like this."""
+    for kind, cls in index_kinds.items():
+        if type(index) is cls:
+            return kind
+    raise NetworkXError("Unknown index type %r" % (type(index),))
+
+
+def parse_conditions(conditions):
+    """Return a list of (attr, op, value) from where() keyword arguments."""
+    parsed = []
+    for name, value in conditions.items():
+        attr, sep, op = name.rpartition('__')
+        if not sep or op not in _ops:
+            attr, op = name, 'eq'
+        parsed.append((attr, op, value))
+    return parsed
+
+def matches(datadict, parsed):
+    for attr, op, value in parsed:
+        try:
+            if not _ops[op](datadict[attr], value):
+                return False
+        except (KeyError, TypeError):
+            return False
+    return True
+
+def select(indexes, parsed, getdata, scan):
+    """Yield keys whose data satisfies all parsed conditions.
+
+    The most selective indexed condition seeds the candidates, which are
+    then checked against the remaining conditions with ``getdata(key)``.
+    Without a usable index all ``(key, datadict)`` pairs from ``scan()``
+    are checked.
+    """
+    best = None
+    for attr, op, value in parsed:
+        idx = indexes.get(attr)
+        if idx is None:
+            continue
+        n = idx.count(op, value)
+        if n is not None and (best is None or n < best[0]):
+            best = (n, idx, op, value)
+    if best is None:
+        for key, dd in scan():
+            if matches(dd, parsed):
+                yield key
+        return
+    n, idx, op, value = best
+    for key in idx.lookup(op, value):
+        if matches(getdata(key), parsed):
+            yield key
+
+
+def check_item(indexes, datadict):
+    """Raise NetworkXError if an index cannot hold a value of datadict."""
+    for attr, idx in indexes.items():
+        if attr in datadict:
+            idx.check(datadict[attr])
+
+def new_attrs(factory, attr_dict, indexes):
+    """Return factory() filled from attr_dict, checked against indexes.
+
+    A schema record converts the values or rejects them here, so callers
+    get NetworkXError before storing anything.
+    """
+    datadict = factory()
+    datadict.update(attr_dict)
+    check_item(indexes, datadict)
+    return datadict
+
+def build_indexes(indexes, items):
+    """Return new indexes of the kinds in `indexes` over (key, datadict)
+    items, e.g. after set_schema converted the values."""
+    items = list(items)
+    new = {}
+    for attr, idx in indexes.items():
+        new[attr] = make_index(index_kind(idx))
+        new[attr].build((key, dd[attr]) for key, dd in items if attr in dd)
+    return new
+
+def index_item(indexes, key, datadict):
+    for attr, idx in indexes.items():
+        if attr in datadict:
+            idx.add(key, datadict[attr])
+
+def unindex_item(indexes, key, datadict, altkey=None):
+    # undirected edges may be indexed under either orientation
+    for attr, idx in indexes.items():
+        if attr in datadict:
+            value = datadict[attr]
+            if not idx.discard(key, value) and altkey is not None:
+                idx.discard(altkey, value)
+
+
+class IndexedAttrs(object):
+    """Mixin for attribute dicts that keeps attribute indexes current.
+
+    Node datadicts are wrapped while the graph has node indexes, so that
+    ``G.n[n][attr] = value`` updates them as well. The base class stores
+    the value first, so a schema record converts or rejects it, and the
+    converted value is what gets indexed.
+    """
+    __slots__ = ()
+    def __setitem__(self, attr, value):
+        idx = self._indexes.get(attr)
+        if idx is None:
+            return super(IndexedAttrs, self).__setitem__(attr, value)
+        had = attr in self
+        if had:
+            old = self[attr]
+        super(IndexedAttrs, self).__setitem__(attr, value)
+        new = self[attr]
+        try:
+            idx.check(new)
+        except NetworkXError:
+            if had:
+                super(IndexedAttrs, self).__setitem__(attr, old)
+            else:
+                super(IndexedAttrs, self).__delitem__(attr)
+            raise
+        if had:
+            idx.discard(self._key, old)
+        idx.add(self._key, new)
+    def __delitem__(self, attr):
+        idx = self._indexes.get(attr)
+        if idx is not None and attr in self:
+            idx.discard(self._key, self[attr])
+        super(IndexedAttrs, self).__delitem__(attr)
+
+
+class IndexedAttrDict(IndexedAttrs, dict):
+    """Plain attribute dict with index hooks (see IndexedAttrs)."""
+    __slots__ = ('_key', '_indexes')
+    def __init__(self, key, indexes, *args, **kwds):
+        dict.__init__(self, *args, **kwds)
+        self._key = key
+        self._indexes = indexes
+    def __reduce__(self):
+        return (self.__class__, (self._key, self._indexes, dict(self)))
+    def copy(self):
+        return self.__class__(self._key, self._indexes, self)
+    # dict's own update, pop, ... bypass __setitem__ and __delitem__
+    def update(self, *args, **kwds):
+        new = dict(*args, **kwds)
+        check_item(self._indexes, new)
+        for attr, value in new.items():
+            self[attr] = value
+    def setdefault(self, attr, default=None):
+        if attr not in self:
+            self[attr] = default
+        return dict.__getitem__(self, attr)
+    def pop(self, attr, *default):
+        if attr in self:
+            value = dict.__getitem__(self, attr)
+            del self[attr]
+            return value
+        return dict.pop(self, attr, *default)
+    def popitem(self):
+        attr, value = dict.popitem(self)
+        idx = self._indexes.get(attr)
+        if idx is not None:
+            idx.discard(self._key, value)
+        return attr, value
+    def clear(self):
+        for attr in list(self):
+            del self[attr]
+
+
+_indexed_records = {}  # schema record type -> its IndexedAttrs subclass
+
+def _indexed_record(key, indexes, record):
+    # a schema record with index hooks: the fields, conversion and
+    # overflow rules of the record are kept. Pickles as a plain record.
+    base = record._schema.record
+    cls = _indexed_records.get(base)
+    if cls is None:
+        def copy(self):
+            return _indexed_record(self._key, self._indexes, base.copy(self))
+        cls = _indexed_records[base] = type('IndexedRecord', (IndexedAttrs, base),
+                                            {'__slots__': ('_key', '_indexes'),
+                                             'copy': copy})
+    new = cls()
+    for slot in base._slots.values():
+        if hasattr(record, slot):
+            setattr(new, slot, getattr(record, slot))
+    if record._extra:
+        new._extra = dict(record._extra)
+    new._key = key
+    new._indexes = indexes
+    return new
+
+def wrap_attr_dict(key, indexes, datadict):
+    """Return datadict wrapped for indexes, or unchanged if none exist."""
+    if not indexes:
+        return datadict
+    if isinstance(datadict, IndexedAttrs) and datadict._indexes is indexes:
+        return datadict
+    if isinstance(datadict, Record):
+        return _indexed_record(key, indexes, datadict)
+    return IndexedAttrDict(key, indexes, datadict)
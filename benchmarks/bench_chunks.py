@@ -0,0 +1,63 @@
+"""Parallel edge scans over G.e.chunks(k).
+
+Sums an edge attribute over all edges sequentially, then with a process
+pool that scans one chunk per task: the chunks of a shared graph (sent
+as the block name and a range) and the chunks of a plain graph (sent as
+their edges). Reports the time and the bytes pickled per chunk.
+
+    python benchmarks/bench_chunks.py [nodes] [edges] [workers]
+"""
+from __future__ import print_function
+from multiprocessing import Pool
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+import sharedgraph
+
+
+def build(n, m, seed=42):
+    rng = random.Random(seed)
+    edges = [(rng.randrange(n), rng.randrange(n), {'weight': rng.random()})
+             for _ in range(m)]
+    return Graph((range(n), edges))
+
+def scan(chunk):
+    return sum(dd.get('weight', 0) for e, dd in chunk)
+
+def scan_shared(chunk):
+    try:
+        return scan(chunk)
+    finally:
+        chunk._view._graph.close()  # the worker's attachment
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+def main(n=100000, m=500000, workers=os.cpu_count()):
+    G = build(n, m)
+    total, took = timed(scan, G.e.items())
+    print("sequential         {:>6.2f} s".format(took))
+    with Pool(workers) as pool:
+        chunks = G.e.chunks(workers, data=True)
+        size = len(pickle.dumps(chunks[0], -1))
+        results, took = timed(pool.map, scan, chunks)
+        print("{} workers, plain  {:>6.2f} s  {:>10d} bytes per chunk".format(
+            workers, took, size))
+        with sharedgraph.publish(G) as S:
+            chunks = S.e.chunks(workers, data=True)
+            size = len(pickle.dumps(chunks[0], -1))
+            shared, took = timed(pool.map, scan_shared, chunks)
+            print("{} workers, shared {:>6.2f} s  {:>10d} bytes per chunk".format(
+                workers, took, size))
+    assert abs(sum(results) - total) < 1e-6 * m
+    assert abs(sum(shared) - total) < 1e-6 * m
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
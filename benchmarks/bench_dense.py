@@ -0,0 +1,66 @@
+"""Plain vs dense (list-backed) storage for a graph on nodes range(n).
+
+Times building the graph, iterating its edges and a breadth-first
+traversal over G.a, and reports the memory held by the graph.
+
+    python benchmarks/bench_dense.py [nodes] [edges]
+"""
+from __future__ import print_function
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+
+
+def adjlist(n, m, seed=42):
+    rng = random.Random(seed)
+    nbrs = [[] for _ in range(n)]
+    for _ in range(m):
+        nbrs[rng.randrange(n)].append(rng.randrange(n))
+    return nbrs
+
+def bfs(adj, source):
+    seen = {source}
+    nextlevel = [source]
+    while nextlevel:
+        thislevel = nextlevel
+        nextlevel = []
+        for u in thislevel:
+            for v in adj[u]:
+                if v not in seen:
+                    seen.add(v)
+                    nextlevel.append(v)
+    return len(seen)
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+def measure(label, nbrs, dense):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    G = Graph.from_adjacency_list(nbrs, dense=dense)
+    build = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    edges = timed(lambda: sum(1 for e in G.e))
+    search = timed(bfs, G.a, 0)
+    raw = timed(bfs, G._adjacency, 0)
+    print("{:<6} build {:>6.2f} s  edges {:>6.2f} s  bfs G.a {:>6.2f} s  "
+          "bfs adj {:>6.2f} s  {:>7.1f} MiB".format(
+              label, build, edges, search, raw, current / 2.**20))
+
+def main(n=200000, m=1000000):
+    nbrs = adjlist(n, m)
+    measure("plain", nbrs, False)
+    measure("dense", nbrs, True)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,48 @@
+"""Memory of edge attributes, with and without G.e.intern_attrs().
+
+Every edge gets one of a few small attribute records, as in typed or
+unit-weight graphs, built as a fresh dict per edge.
+
+    python benchmarks/bench_edge_attrs.py [nodes] [avg_degree]
+"""
+from __future__ import print_function
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+
+KINDS = ['follows', 'likes', 'blocks', 'mentions']
+
+
+def edges(n, degree, seed=42):
+    rng = random.Random(seed)
+    for _ in range(n * degree // 2):
+        yield (rng.randrange(n), rng.randrange(n),
+               {'type': rng.choice(KINDS), 'weight': 1})
+
+def measure(label, n, degree, intern):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    G = Graph()
+    if intern:
+        G.e.intern_attrs()
+    G.e.update(edges(n, degree))
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<10} {:>9} nodes {:>9} edges {:>8.2f} s  {:>9.1f} MiB  "
+          "{:>6.0f} B/edge".format(label, len(G.n), len(G.e), elapsed,
+                                   current / 2.**20, current / len(G.e)))
+
+def main(n=100000, degree=8):
+    measure("plain", n, degree, False)
+    measure("interned", n, degree, True)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
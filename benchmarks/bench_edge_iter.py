@@ -0,0 +1,46 @@
+"""Peak memory and throughput of undirected edge iteration.
+
+Compares ``for e in G.e`` using node ordinals against the old
+``seen``-set iteration (an Edges view built without a graph).
+
+    python benchmarks/bench_edge_iter.py [nodes] [edges]
+"""
+from __future__ import print_function
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+from edges import Edges
+
+
+def build(n, m, seed=42):
+    rng = random.Random(seed)
+    G = Graph()
+    G.n.update(range(n))
+    G.e.update((rng.randrange(n), rng.randrange(n)) for _ in range(m))
+    return G
+
+def measure(label, edges):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    count = 0
+    for e in edges:
+        count += 1
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<10} {:>10} edges {:>8.3f} s {:>10.0f} edges/s  peak {:>8.1f} KiB"
+          .format(label, count, elapsed, count / elapsed, peak / 1024.))
+
+def main(n=200000, m=1000000):
+    G = build(n, m)
+    print("graph: {} nodes, {} edges".format(len(G.n), len(G.e)))
+    measure("ordinals", G.e)
+    measure("seen-set", Edges(G._nodedata, G._adjacency))
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,64 @@
+"""Import time of the graph classes, checked against a budget.
+
+Runs ``python -X importtime -c 'import <modules>'`` in a fresh
+interpreter, prints the slowest imports and exits with status 1 if the
+total exceeds the budget or a heavy optional package was imported.
+
+    python benchmarks/bench_import.py [budget_ms] [module ...]
+"""
+from __future__ import print_function
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MODULES = ['graph', 'nxgraph', 'ABCgraph', 'ABCmultigraph', 'ABCnxgraph',
+           'convert']
+HEAVY = ['networkx', 'numpy', 'scipy', 'pandas']
+
+
+def importtime(modules):
+    """Return {module: (self_us, cumulative_us)} for one cold import and
+    the total time of the imports made by `modules`."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [p for p in [env.get('PYTHONPATH')] if p])
+    code = 'import ' + ', '.join(modules)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          env=env, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    times = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+        # children are listed before their parent; top-level imports
+        # after `site` are the ones made by the -c code
+        if name.strip() == 'site':
+            total = 0
+        elif name.startswith(' ') and not name.startswith('  '):
+            total += int(cumulative)
+    return times, total
+
+def main(budget_ms=100.0, *modules):
+    modules = list(modules) or MODULES
+    times, total = importtime(modules)
+    total /= 1000.
+    print("{:>10} {:>10}  module".format("self ms", "cumul ms"))
+    for name, (own, cumulative) in sorted(times.items(),
+                                          key=lambda t: -t[1][1])[:15]:
+        print("{:>10.1f} {:>10.1f}  {}".format(own / 1000., cumulative / 1000.,
+                                               name))
+    heavy = [m for m in HEAVY if m in times]
+    print("total {:.1f} ms, budget {:.1f} ms".format(total, budget_ms))
+    if heavy:
+        print("heavy packages imported: " + ', '.join(heavy))
+    if heavy or total > budget_ms:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*([float(sys.argv[1])] + sys.argv[2:] if len(sys.argv) > 1 else []))
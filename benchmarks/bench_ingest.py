@@ -0,0 +1,74 @@
+"""Feeding an edge event stream into a graph: per-event adds vs ingest.
+
+The per-event writer is a thread that takes events off a queue.Queue
+and calls G.e.add for each one, taking the writer lock every time. The
+ingest pipeline reads the same events from an async generator and
+applies them in batches (see ingest.py). Reports events per second and
+the largest lag of a batch.
+
+    python benchmarks/bench_ingest.py [events] [batch_size]
+"""
+from __future__ import print_function
+import asyncio
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+from ingest import ingest
+
+
+def make_events(m, seed=42):
+    rng = random.Random(seed)
+    n = m // 5
+    return [('add_edge', (rng.randrange(n), rng.randrange(n)),
+             {'weight': rng.random()}) for _ in range(m)]
+
+def per_event(events):
+    G = Graph()
+    q = queue.Queue(10000)
+    def write():
+        add = G.e.add
+        while True:
+            event = q.get()
+            if event is None:
+                return
+            _, (u, v), attrs = event
+            add(u, v, attrs)
+    writer = threading.Thread(target=write)
+    t0 = time.perf_counter()
+    writer.start()
+    for event in events:
+        q.put(event)
+    q.put(None)
+    writer.join()
+    return G, time.perf_counter() - t0
+
+async def stream(events, chunk=1000):
+    for i, event in enumerate(events):
+        if not i % chunk:
+            await asyncio.sleep(0)  # let other tasks run, as a socket would
+        yield event
+
+def batched(events, batch_size):
+    G = Graph()
+    t0 = time.perf_counter()
+    stats = asyncio.run(ingest(G, stream(events), batch_size=batch_size))
+    return G, time.perf_counter() - t0, stats
+
+def main(m=200000, batch_size=1000):
+    events = make_events(m)
+    G, took = per_event(events)
+    print("per-event add  {:>6.2f} s  {:>9.0f} events/s".format(took, m / took))
+    H, took, stats = batched(events, batch_size)
+    print("ingest         {:>6.2f} s  {:>9.0f} events/s  {} batches  "
+          "max lag {:.3f} s".format(took, m / took, stats.batches,
+                                    stats.max_lag))
+    assert len(G.e) == len(H.e)
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
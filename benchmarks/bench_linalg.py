@@ -0,0 +1,48 @@
+"""Spectral work on a graph: dense Adjacency.matrix() vs LinearOperators.
+
+Times the dense export and the CSR export (G.a.csr), then the three
+smallest normalized Laplacian eigenvalues with eigsh over the operator.
+The dense export is skipped above 5000 nodes.
+
+    python benchmarks/bench_linalg.py [nodes] [edges]
+"""
+from __future__ import print_function
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+
+
+def build(n, m, seed=42):
+    rng = random.Random(seed)
+    edges = [(rng.randrange(n), rng.randrange(n), {'weight': rng.random()})
+             for _ in range(m)]
+    return Graph((range(n), edges))
+
+def timed(fn, *args, **kwds):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwds)
+    return result, time.perf_counter() - t0
+
+def main(n=200000, m=1000000):
+    from scipy.sparse.linalg import eigsh
+    G = build(n, m)
+    if n <= 5000:
+        M, took = timed(G.a.matrix)
+        print("dense matrix  {:>7.2f} s  {:>8.1f} MiB".format(
+            took, M.nbytes / 2.**20))
+    csr, took = timed(G.a.csr)
+    A = csr.matrix
+    size = A.data.nbytes + A.indices.nbytes + A.indptr.nbytes
+    print("csr export    {:>7.2f} s  {:>8.1f} MiB".format(took, size / 2.**20))
+    _, took = timed(G.a.csr)
+    print("cached export {:>7.4f} s".format(took))
+    op = G.a.normalized_laplacian_operator()
+    vals, took = timed(eigsh, op, k=3, which='LA', return_eigenvectors=False)
+    print("eigsh k=3     {:>7.2f} s  largest {}".format(took, sorted(vals)))
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""Memory of a graph with long string node ids, with and without
+G.intern_keys().
+
+Edges are built from text lines, as when reading an edge list, so every
+occurrence of a node id is a separate string object.
+
+    python benchmarks/bench_node_keys.py [nodes] [avg_degree]
+
+The default is 200k nodes; pass 10000000 for the 10M-node case (needs
+tens of GB of RAM).
+"""
+from __future__ import print_function
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+
+
+def lines(n, degree, seed=42):
+    rng = random.Random(seed)
+    name = "urn:example:device:{:012d}".format
+    for _ in range(n * degree // 2):
+        yield "{} {}".format(name(rng.randrange(n)), name(rng.randrange(n)))
+
+def measure(label, n, degree, intern):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    G = Graph()
+    if intern:
+        G.intern_keys()
+    G.e.update(line.split() for line in lines(n, degree))
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<10} {:>9} nodes {:>9} edges {:>8.2f} s  {:>9.1f} MiB  "
+          "{:>6.0f} B/node".format(label, len(G.n), len(G.e), elapsed,
+                                   current / 2.**20, current / len(G.n)))
+
+def main(n=200000, degree=8):
+    measure("plain", n, degree, False)
+    measure("interned", n, degree, True)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
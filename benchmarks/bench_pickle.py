@@ -0,0 +1,53 @@
+"""Pickle size and time of a graph: compact form vs its raw dicts.
+
+The raw dicts (node data and adjacency) are what pickling the graph
+stored before Graph.__reduce_ex__; the views came on top of them.
+Also times a protocol 5 dump with out-of-band buffers.
+
+    python benchmarks/bench_pickle.py [nodes] [edges]
+"""
+from __future__ import print_function
+import gc
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+
+
+def build(n, m, seed=42):
+    rng = random.Random(seed)
+    edges = [(rng.randrange(n), rng.randrange(n), {'weight': rng.random()})
+             for _ in range(m)]
+    return Graph((range(n), edges))
+
+def measure(label, dump, load):
+    # start each timing without garbage left by the previous one
+    gc.collect()
+    t0 = time.perf_counter()
+    data = dump()
+    dumped = time.perf_counter() - t0
+    gc.collect()
+    t0 = time.perf_counter()
+    load(data)
+    loaded = time.perf_counter() - t0
+    size = len(data[0]) if isinstance(data, tuple) else len(data)
+    print("{:<12} dump {:>6.2f} s  load {:>6.2f} s  {:>7.1f} MiB".format(
+        label, dumped, loaded, size / 2.**20))
+
+def main(n=100000, m=500000):
+    G = build(n, m)
+    raw = (G._nodedata, G._adjacency)
+    measure('raw dicts', lambda: pickle.dumps(raw, 5), pickle.loads)
+    measure('compact', lambda: pickle.dumps(G, 5), pickle.loads)
+    def dump_oob():
+        buffers = []
+        return pickle.dumps(G, 5, buffer_callback=buffers.append), buffers
+    measure('out of band', dump_oob,
+            lambda data: pickle.loads(data[0], buffers=data[1]))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,57 @@
+"""Handing a graph to pool workers: a pickled copy each vs shared memory.
+
+Times what each worker pays to get the graph (unpickling its copy vs
+attaching to the published block) and a neighbor scan over G.a from
+the worker's side, and reports the bytes per worker.
+
+    python benchmarks/bench_shared.py [nodes] [edges]
+"""
+from __future__ import print_function
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from graph import Graph
+import sharedgraph
+
+
+def build(n, m, seed=42):
+    rng = random.Random(seed)
+    edges = [(rng.randrange(n), rng.randrange(n), {'weight': rng.random()})
+             for _ in range(m)]
+    return Graph((range(n), edges))
+
+def scan(G, nodes):
+    return sum(len(G.a[n]) for n in nodes)
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+def main(n=100000, m=500000):
+    G = build(n, m)
+    sample = random.Random(1).sample(range(n), 10000)
+    data, dump = timed(pickle.dumps, G, 5)
+    W, load = timed(pickle.loads, data)
+    _, walk = timed(scan, W, sample)
+    print("pickled copy  publish {:>6.2f} s  per worker {:>6.3f} s  "
+          "scan {:>6.3f} s  {:>6.1f} MiB each".format(
+              dump, load, walk, len(data) / 2.**20))
+    S, publish = timed(sharedgraph.publish, G)
+    try:
+        A, attach = timed(sharedgraph.attach, S.name)
+        _, walk = timed(scan, A, sample)
+        print("shared memory publish {:>6.2f} s  per worker {:>6.3f} s  "
+              "scan {:>6.3f} s  {:>6.1f} MiB once".format(
+                  publish, attach, walk, S._shm.size / 2.**20))
+        A.close()
+    finally:
+        S.close()
+        S.unlink()
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
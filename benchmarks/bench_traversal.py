@@ -0,0 +1,102 @@
+"""Traversals through the adjacency views vs traversal.py.
+
+Runs a full BFS, a full DFS preorder and a 4-hop neighborhood from node
+0 the naive way (G.a[n], G.su[n] for each visited node) and with
+bfs_layers / dfs_preorder / k_hop, on a graph.Graph, a directed
+ABCgraph.Graph and a subgraph view holding half the nodes of each.
+Each naive run gets fresh views, whose neighbor view caches start
+empty.
+
+    python benchmarks/bench_traversal.py [nodes] [edges]
+"""
+from __future__ import print_function
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import ABCgraph
+from graph import Graph
+from traversal import bfs_layers, dfs_preorder, k_hop
+
+
+def edge_list(n, m, seed=42):
+    rng = random.Random(seed)
+    return [(rng.randrange(n), rng.randrange(n)) for _ in range(m)]
+
+def naive_bfs(adj, source, depth=None):
+    seen = {source}
+    layer = [source]
+    hops = 0
+    while layer and (depth is None or hops < depth):
+        hops += 1
+        found = []
+        for n in layer:
+            for nbr in adj[n]:
+                if nbr not in seen:
+                    seen.add(nbr)
+                    found.append(nbr)
+        layer = found
+    return seen
+
+def naive_dfs(adj, source):
+    seen = {source}
+    order = [source]
+    stack = [iter(adj[source])]
+    while stack:
+        for nbr in stack[-1]:
+            if nbr not in seen:
+                seen.add(nbr)
+                order.append(nbr)
+                stack.append(iter(adj[nbr]))
+                break
+        else:
+            stack.pop()
+    return order
+
+def timed(fn, *args):
+    gc.collect()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+def compare(label, make, view):
+    # make() returns a graph or view and its adjacency view to walk
+    G, adj = make()
+    runs = [('bfs', naive_bfs, lambda: [n for l in bfs_layers(G, 0, view)
+                                        for n in l]),
+            ('dfs', naive_dfs, lambda: [n for b in dfs_preorder(G, 0, view)
+                                        for n in b]),
+            ('4-hop', lambda adj, source: naive_bfs(adj, source, 4),
+             lambda: k_hop(G, 0, 4, view))]
+    for name, naive, native in runs:
+        a, slow = timed(naive, make()[1], 0)
+        b, fast = timed(native)
+        assert len(a) == len(b)
+        print("{:<11} {:<6} views {:>7.3f} s  native {:>7.3f} s  {:>5.1f}x".format(
+            label, name, slow, fast, slow / fast))
+
+def main(n=200000, m=1000000):
+    edges = edge_list(n, m)
+    half = range(0, n, 2)
+    G = Graph((range(n), edges))
+    compare('Graph', lambda: (G, G.a), 'a')
+    def sub():
+        S = G.s(half)
+        return S, S.a
+    compare('Graph sub', sub, 'a')
+    D = ABCgraph.Graph((range(n), edges), directed=True)
+    def fresh():
+        # the ABC views cache neighbor views too
+        D.su = ABCgraph.Adjacency(D._succ)
+        return D, D.su
+    compare('ABC su', fresh, 'su')
+    def abcsub():
+        S = D.s(half)
+        return S, S.su
+    compare('ABC sub su', abcsub, 'su')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
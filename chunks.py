@@ -0,0 +1,126 @@
+"""Balanced chunks of a graph's edges and adjacency, for parallel scans.
+
+G.e.chunks(k) splits the edges into at most k disjoint EdgeChunks, and
+G.a.partition(k) splits G.a into at most k AdjacencyChunks. Both cut
+the node order into contiguous ranges, weighting each node by its
+degree so that the pieces hold about the same number of edges. An
+undirected edge is reported from only one of its endpoints, so there
+the balance is an estimate. Shared graphs split their edge table
+itself (see sharedgraph.py).
+
+A chunk holds its view, a (start, stop) range and the node order taken
+once at the split, which it shares with the other chunks. Iterating it
+slices that range out of the order, so chunks can be scanned from
+several threads at once and k chunks cost one pass over the nodes.
+Chunks of a shared graph pickle as the name of its block and the range,
+so each pool worker attaches and scans its own piece. Other chunks
+pickle as a chunk of the same range over the items they yield.
+
+Ranges are positions in the node order at the time of the split, so
+split a graph that is not being changed, e.g. a snapshot.
+"""
+from bisect import bisect_left
+from itertools import accumulate
+
+from exception import NetworkXError
+
+__all__ = ['balanced_ranges', 'EdgeChunk', 'AdjacencyChunk',
+           'ChunkedEdges', 'PartitionedAdjacency']
+
+
+def balanced_ranges(weights, k):
+    """Return at most k nonempty (start, stop) ranges that cover the
+    positions of `weights` in order, each with about 1/k of the total
+    weight."""
+    if k < 1:
+        raise NetworkXError("The number of chunks must be positive")
+    totals = list(accumulate(weights))
+    size = len(totals)
+    if not size:
+        return []
+    total = totals[-1]
+    bounds = [0]
+    for i in range(1, k):
+        # cut after the position where the running total reaches i/k
+        stop = bisect_left(totals, -(-total * i // k)) + 1
+        if bounds[-1] < stop < size:
+            bounds.append(stop)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+class EdgeChunk(object):
+    """The edges of a view reported from the nodes at positions
+    start to stop; see G.e.chunks."""
+    __slots__ = ('_view', 'start', 'stop', 'data', '_order')
+    def __init__(self, view, start, stop, data=False, order=None):
+        self._view = view
+        self.start = start
+        self.stop = stop
+        self.data = data
+        self._order = order  # view._chunk_order() at the split
+    def __repr__(self):
+        return '{0.__class__.__name__}({0.start}, {0.stop})'.format(self)
+    def __iter__(self):
+        return self._view._chunk(self.start, self.stop, self._order,
+                                 self.data)
+    def __reduce__(self):
+        if self._view._by_name:
+            return (self.__class__,
+                    (self._view, self.start, self.stop, self.data))
+        return (self.__class__, (_ChunkItems(list(self)),
+                                 self.start, self.stop, self.data))
+
+
+class AdjacencyChunk(EdgeChunk):
+    """The (node, neighbors) pairs of a view for the nodes at positions
+    start to stop; see G.a.partition."""
+    __slots__ = ()
+    def __iter__(self):
+        return self._view._chunk(self.start, self.stop, self._order)
+
+
+class _ChunkItems(object):
+    # stands in for the view of an unpickled chunk: what it yielded
+    __slots__ = ('_items',)
+    _by_name = False
+    def __init__(self, items):
+        self._items = items
+    def _chunk(self, start, stop, order=None, data=False):
+        return iter(self._items)
+
+
+class ChunkedEdges(object):
+    # Mixin for edge views. Subclasses give _chunk_weights(), an edge
+    # count per node in node order, and _chunk(start, stop, order, data).
+    __slots__ = ()
+    _by_name = False  # whether the view pickles as a shared block name
+    def chunks(self, k, data=False):
+        """Return at most k EdgeChunks that together yield every edge
+        once, as (u, v) or with data=True as ((u, v), datadict)."""
+        ranges = balanced_ranges(self._chunk_weights(), k)
+        order = self._chunk_order() if ranges else None
+        return [EdgeChunk(self, start, stop, data, order)
+                for start, stop in ranges]
+    def _chunk_order(self):
+        return list(self._mapping)
+
+
+class PartitionedAdjacency(object):
+    # Mixin for adjacency views over a node -> neighbors mapping.
+    __slots__ = ()
+    _by_name = False
+    def partition(self, k):
+        """Return at most k AdjacencyChunks that together yield every
+        (node, neighbors) pair once, balanced by degree."""
+        ranges = balanced_ranges(self._chunk_weights(), k)
+        order = self._chunk_order() if ranges else None
+        return [AdjacencyChunk(self, start, stop, False, order)
+                for start, stop in ranges]
+    def _chunk_weights(self):
+        return map(len, self._mapping.values())
+    def _chunk_order(self):
+        return list(self._mapping)
+    def _chunk(self, start, stop, order):
+        for n in order[start:stop]:
+            yield n, self[n]
@@ -0,0 +1,142 @@
+"""Compact array form of a graph, used when pickling graphs.
+
+Pickling a graph's objects as they are walks every view (G.n, G.e,
+G.a and their caches) and stores each undirected edge, or succ and
+pred entry, twice. The graph classes instead reduce to a flat table:
+
+- ``nodes``: the node table, one entry per node in graph order
+- ``heads``, ``tails``: each edge once, as positions in the node table
+  (graph.Graph uses its node ids instead, see Graph.node_index)
+- ``node_attrs``, ``edge_attrs``: the attribute dicts as columns,
+  ``[(attr, rows, values)]`` where rows lists the positions that hold
+  attr, or is None when they all do
+
+Loading rebuilds the adjacency from the table and then the views.
+
+All-int and all-float columns, including int node tables and the edge
+arrays, are stored as arrays of the narrowest int type or of doubles.
+Under pickle protocol 5 they are handed to the pickler as PickleBuffers,
+which a pickler with a buffer_callback passes out of band without
+copying them. Buffers are in native byte order.
+"""
+from array import array
+from collections import deque
+from itertools import chain, compress, repeat
+from operator import contains, itemgetter, setitem
+try:
+    from pickle import PickleBuffer
+except ImportError:  # Python < 3.8, no out-of-band buffers
+    PickleBuffer = None
+
+__all__ = ['pack_column', 'unpack_column', 'attr_columns', 'attr_dicts',
+           'positions', 'table_state', 'load_table', 'extra_attrs']
+
+
+# signed int typecodes from the narrowest, with their value bounds
+_INT_TYPECODES = [(code, 2 ** (8 * array(code).itemsize - 1))
+                  for code in 'bhiq']
+
+def _int_typecode(values):
+    lo, hi = min(values), max(values)
+    for typecode, bound in _INT_TYPECODES:
+        if -bound <= lo and hi < bound:
+            return typecode
+    return None
+
+def pack_column(values, protocol=0):
+    """Return the list `values` as (typecode, buffer) if its items are
+    all ints or all floats, else the list itself. Ints get the
+    narrowest typecode that holds them."""
+    kinds = set(map(type, values))
+    if kinds == {float}:
+        typecode = 'd'
+    elif kinds == {int}:
+        typecode = _int_typecode(values)
+        if typecode is None:
+            return values
+    else:
+        return values
+    buf = array(typecode, values)
+    if protocol >= 5 and PickleBuffer is not None:
+        buf = PickleBuffer(buf)
+    return typecode, buf
+
+def unpack_column(packed):
+    """Return the list stored by pack_column."""
+    if isinstance(packed, list):
+        return packed
+    typecode, buf = packed
+    values = array(typecode)
+    values.frombytes(memoryview(buf).cast('B'))
+    return values.tolist()
+
+def attr_columns(datadicts, protocol=0):
+    """Return the attributes of a list of mappings as (attr, rows, values)
+    columns, rows None when every mapping holds attr."""
+    # Usually every mapping holds exactly the attributes of the first
+    # one; their lengths confirm that without a pass over all the keys.
+    attrs = list(datadicts[0]) if datadicts else []
+    if sum(map(len, datadicts)) == len(attrs) * len(datadicts):
+        try:
+            return [(attr, None, pack_column(
+                        list(map(itemgetter(attr), datadicts)), protocol))
+                    for attr in attrs]
+        except KeyError:
+            pass
+    columns = []
+    for attr in dict.fromkeys(chain.from_iterable(datadicts)):
+        try:
+            rows = None
+            values = list(map(itemgetter(attr), datadicts))
+        except KeyError:
+            present = list(map(contains, datadicts, repeat(attr)))
+            rows = pack_column(list(compress(range(len(present)), present)),
+                               protocol)
+            values = list(map(itemgetter(attr), compress(datadicts, present)))
+        columns.append((attr, rows, pack_column(values, protocol)))
+    return columns
+
+def attr_dicts(size, columns, factory=dict):
+    """Return `size` new mappings from factory() filled from columns."""
+    datadicts = [factory() for _ in range(size)]
+    for attr, rows, values in columns:
+        if rows is None:
+            targets = datadicts
+        else:
+            targets = map(datadicts.__getitem__, unpack_column(rows))
+        deque(map(setitem, targets, repeat(attr), unpack_column(values)),
+              maxlen=0)
+    return datadicts
+
+def positions(nodes, endpoints):
+    """Return the position in the list `nodes` of each endpoint."""
+    position = dict(zip(nodes, range(len(nodes))))
+    return list(map(position.__getitem__, endpoints))
+
+def table_state(nodes, heads, tails, nodedicts, edgedicts, protocol=0):
+    """Return the compact state of a graph. Edge i joins the nodes at
+    positions heads[i] and tails[i] and has attributes edgedicts[i]."""
+    return {'nodes': pack_column(nodes, protocol),
+            'heads': pack_column(heads, protocol),
+            'tails': pack_column(tails, protocol),
+            'node_attrs': attr_columns(nodedicts, protocol),
+            'edge_attrs': attr_columns(edgedicts, protocol)}
+
+def load_table(state, node_factory=dict, edge_factory=dict):
+    """Return nodes, heads, tails, nodedicts, edgedicts from a state made
+    by table_state; the mappings are made with the factories."""
+    nodes = unpack_column(state['nodes'])
+    heads = unpack_column(state['heads'])
+    tails = unpack_column(state['tails'])
+    nodedicts = attr_dicts(len(nodes), state['node_attrs'], node_factory)
+    edgedicts = attr_dicts(len(heads), state['edge_attrs'], edge_factory)
+    return nodes, heads, tails, nodedicts, edgedicts
+
+def extra_attrs(obj, managed):
+    """Return the instance attributes of obj that are neither named in
+    `managed` nor aliases of those (e.g. nxGraph.node)."""
+    attrs = vars(obj)
+    known = [attrs[name] for name in managed if name in attrs]
+    return dict((name, value) for name, value in attrs.items()
+                if name not in managed
+                and not any(value is other for other in known))
@@ -0,0 +1,126 @@
+"""Incrementally maintained connected components.
+
+G.track_components() attaches a ComponentIndex that the Nodes/Edges
+mutators keep current. Edge insertion merges the two components, moving
+the smaller member set into the larger one (weighted union-find with
+eager relabeling), so G.component_of(n) and G.same_component(u, v) are
+dictionary lookups.
+
+A deletion may split a component. That component is only marked dirty;
+the next query touching it re-traverses just its own nodes.
+"""
+from exception import NetworkXError
+
+__all__ = ['ComponentIndex', 'reachable']
+
+
+def reachable(adj, source):
+    """Return the set of nodes reachable from source in adjacency adj."""
+    seen = {source}
+    nextlevel = [source]
+    while nextlevel:
+        thislevel = nextlevel
+        nextlevel = []
+        for n in thislevel:
+            for nbr in adj[n]:
+                if nbr not in seen:
+                    seen.add(nbr)
+                    nextlevel.append(nbr)
+    return seen
+
+
+class ComponentIndex(object):
+    __slots__ = ('_adj', '_label', '_members', '_dirty', '_next')
+    def __init__(self, adj):
+        self._adj = adj
+        self._label = {}    # node -> component id
+        self._members = {}  # component id -> set of nodes
+        self._dirty = set() # ids of components that may have split
+        self._next = 0
+        for n in adj:
+            if n not in self._label:
+                self._relabel(reachable(adj, n))
+
+    def __repr__(self):
+        return '{0.__class__.__name__}(components={1}, dirty={2})'.format(
+            self, len(self._members), len(self._dirty))
+    def __len__(self):
+        """Number of components"""
+        self._refresh_all()
+        return len(self._members)
+
+    def _relabel(self, nodes):
+        cid = self._next
+        self._next += 1
+        label = self._label
+        for n in nodes:
+            label[n] = cid
+        self._members[cid] = nodes
+        return cid
+    def _refresh(self, cid):
+        # re-traverse a component that lost edges or nodes
+        self._dirty.discard(cid)
+        nodes = self._members.pop(cid)
+        while nodes:
+            part = reachable(self._adj, next(iter(nodes)))
+            nodes -= part
+            self._relabel(part)
+    def _refresh_all(self):
+        for cid in list(self._dirty):
+            self._refresh(cid)
+
+    # queries
+    def find(self, n):
+        try:
+            cid = self._label[n]
+        except KeyError:
+            raise NetworkXError("The node %s is not in the graph." % (n,))
+        if cid in self._dirty:
+            self._refresh(cid)
+            cid = self._label[n]
+        return cid
+    def component(self, n):
+        return set(self._members[self.find(n)])
+    def same(self, u, v):
+        return self.find(u) == self.find(v)
+
+    # maintenance, called by the Nodes/Edges mutators
+    def add_node(self, n):
+        if n not in self._label:
+            self._relabel({n})
+    def union(self, u, v):
+        label = self._label
+        self.add_node(u)
+        self.add_node(v)
+        cu, cv = label[u], label[v]
+        if cu == cv:
+            return
+        members = self._members
+        if len(members[cu]) < len(members[cv]):
+            cu, cv = cv, cu
+        moved = members.pop(cv)
+        for n in moved:
+            label[n] = cu
+        members[cu] |= moved
+        if cv in self._dirty:
+            self._dirty.discard(cv)
+            self._dirty.add(cu)
+    def split(self, u, v):
+        if u != v:
+            self._dirty.add(self._label[u])
+    def remove_node(self, n, had_nbrs):
+        cid = self._label.pop(n)
+        nodes = self._members[cid]
+        nodes.discard(n)
+        if not nodes:
+            del self._members[cid]
+            self._dirty.discard(cid)
+        elif had_nbrs:
+            self._dirty.add(cid)
+    def reset(self):
+        """Rebuild as singletons (after all edges are cleared)."""
+        self._label.clear()
+        self._members.clear()
+        self._dirty.clear()
+        for n in self._adj:
+            self._relabel({n})
@@ -21,15 +21,20 @@ nx_agraph, nx_pydot
 #    Pieter Swart <swart@lanl.gov>
 #    All rights reserved.
 #    BSD license.
-import warnings
-import networkx as nx
+from collections import Mapping, Iterable, Iterator
+from itertools import chain, compress, repeat
+from operator import le, methodcaller
+import sys
+
+from exception import NetworkXError
 __author__ = """\n""".join(['Aric Hagberg <aric.hagberg@gmail.com>',
                            'Pieter Swart (swart@lanl.gov)',
                            'Dan Schult(dschult@colgate.edu)'])
-__all__ = ['to_networkx_graph',
+__all__ = ['to_networkx_graph', 'register_converter',
            'from_dict_of_dicts', 'to_dict_of_dicts',
            'from_dict_of_lists', 'to_dict_of_lists',
-           'from_edgelist', 'to_edgelist']
+           'from_edgelist', 'to_edgelist',
+           'from_pandas_edgelist', 'to_pandas_edgelist']
 
 def _prep_create_using(create_using):
     """Return a graph object ready to be populated.
@@ -40,6 +45,7 @@ def _prep_create_using(create_using):
 
     """
     if create_using is None:
+        import networkx as nx
         return nx.Graph()
     try:
         create_using.clear()
@@ -47,6 +53,59 @@ def _prep_create_using(create_using):
         raise TypeError("Input graph is not a networkx graph type")
     return create_using
 
+# Converters keyed by input type. Each is called as
+# converter(data, create_using, multigraph_input). Types of optional
+# packages are registered by name and resolved once the package has been
+# imported by someone else: data of such a type cannot exist before that,
+# so dispatch never imports pandas, numpy or scipy itself.
+_converters = {}
+_lazy_converters = []  # (module name, class name, converter)
+
+def register_converter(cls, converter):
+    """Use converter(data, create_using, multigraph_input) for inputs of
+    type cls (or a subclass).
+
+    cls may be a class, an abstract base class, or a 'module.Class'
+    string that is resolved after the module has been imported.
+    """
+    if isinstance(cls, str):
+        modname, _, name = cls.rpartition('.')
+        _lazy_converters.append((modname, name, converter))
+    else:
+        _converters[cls] = converter
+
+def _find_converter(data):
+    if _lazy_converters:
+        for entry in list(_lazy_converters):
+            modname, name, converter = entry
+            module = sys.modules.get(modname)
+            if module is not None:
+                _lazy_converters.remove(entry)
+                cls = getattr(module, name, None)
+                if cls is not None:
+                    _converters.setdefault(cls, converter)
+    for cls in type(data).__mro__:
+        converter = _converters.get(cls)
+        if converter is not None:
+            return converter
+    for cls, converter in _converters.items():  # ABCs such as Iterator
+        if isinstance(data, cls):
+            return converter
+    # other views over a graph's storage, e.g. subclasses' own views
+    if hasattr(data, '_adjacency') and hasattr(data, '_nodedata'):
+        return _from_graph
+    if hasattr(data, '_succ') and hasattr(data, '_nodes'):
+        return _from_abcgraph
+    return None
+
+def _graph_converter(data):
+    # the converter of a graph, subgraph or snapshot of this package,
+    # None for other data; the graph constructors copy graphs with it
+    converter = _find_converter(data)
+    if converter is _from_graph or converter is _from_abcgraph:
+        return converter
+    return None
+
 def to_networkx_graph(data,create_using=None,multigraph_input=False):
     """Make a NetworkX graph from a known data structure.
 
@@ -72,6 +131,9 @@ def to_networkx_graph(data,create_using=None,multigraph_input=False):
          numpy ndarray
          scipy sparse matrix
          pygraphviz agraph
+         pandas DataFrame
+
+       More types can be added with register_converter.
 
     create_using : NetworkX graph
        Use specified graph for result.  Otherwise a new graph is created.
@@ -83,116 +145,138 @@ def to_networkx_graph(data,create_using=None,multigraph_input=False):
       a multigraph from a multigraph.
 
     """
-    # NX graph
-    # if hasattr(data,"adj"):
-    #     try:
-    #         result= from_dict_of_dicts(data.adj,\
-    #                 create_using=create_using,\
-    #                 multigraph_input=data.is_multigraph())
-    #         if hasattr(data,'graph'): # data.graph should be dict-like
-    #             result.graph.update(data.graph)
-    #         if hasattr(data,'node'): # data.node should be dict-like
-    #             result.node.update( (n,dd.copy()) for n,dd in data.node.items() )
-    #         return result
-    #     except:
-    #         raise nx.NetworkXError("Input is not a correct NetworkX graph.")
-
-    if hasattr(data,"_adjacency"):
-#        try:
-        result= from_dict_of_dicts(data._adjacency,\
-                create_using=create_using,\
-                multigraph_input=data.is_multigraph())
-        if hasattr(data,'data'): # data.graph should be dict-like
-            result.data.update(data.data)
-        if hasattr(data,'_nodedata'): # data.node should be dict-like
-            result._nodedata.update( (n,dd.copy()) for n,dd in data._nodedata.items() )
-        return result
-#    except:
-#        raise nx.NetworkXError("Input is not a correct NetworkX graph.")
-
-    if hasattr(data, "_nodes"):
-        result= from_dict_of_dicts(data.a,\
-                create_using=create_using,\
-                multigraph_input=data.is_multigraph())
-        if hasattr(data,'data'): # data.graph should be dict-like
-            result.data.update(data.data)
-        if hasattr(data,'_nodes'): # data.node should be dict-of-dict-like
-            result._nodes.update( (n,dd.copy()) for n,dd in data.n.items() )
-        return result
-
-    # pygraphviz  agraph
-    if hasattr(data,"is_strict"):
-        try:
-            return nx.nx_agraph.from_agraph(data,create_using=create_using)
-        except:
-            raise nx.NetworkXError("Input is not a correct pygraphviz graph.")
-
-    # dict of dicts/lists
-    if isinstance(data,dict):
-        try:
-            return from_dict_of_dicts(data,create_using=create_using,\
-                    multigraph_input=multigraph_input)
-        except:
-            try:
-                return from_dict_of_lists(data,create_using=create_using)
-            except:
-                raise TypeError("Input is not known type.")
-
-    # list or generator of edges
-    if (isinstance(data,list)
-        or isinstance(data,tuple)
-        or hasattr(data,'next')
-        or hasattr(data, '__next__')):
-        try:
-            return from_edgelist(data,create_using=create_using)
-        except:
-            raise nx.NetworkXError("Input is not a valid edge list")
-
-    # Pandas DataFrame
-    try:
-        import pandas as pd
-        if isinstance(data, pd.DataFrame):
-            try:
-                return nx.from_pandas_dataframe(data, create_using=create_using)
-            except:
-                msg = "Input is not a correct Pandas DataFrame."
-                raise nx.NetworkXError(msg)
-    except ImportError:
-        msg = 'pandas not found, skipping conversion test.'
-        warnings.warn(msg, ImportWarning)
-
-    # numpy matrix or ndarray
+    converter = _find_converter(data)
+    if converter is None:
+        raise NetworkXError(
+            "Input is not a known data type for conversion.")
+    return converter(data, create_using, multigraph_input)
+
+
+def _is(G, flag):
+    # graph.Graph answers is_directed(), the ABC graphs .directed
+    method = getattr(G, 'is_' + flag, None)
+    if method is not None:
+        return method()
+    return bool(getattr(G, flag, False))
+
+def _copy_graph(data, nodes, edges, directed, create_using):
+    """Fill create_using from (n, datadict) and (u, v, key, datadict)
+    iterables of a graph; key is None for graphs without edge keys."""
+    G=_prep_create_using(create_using)
+    if _is(G, 'directed') and not directed:
+        edges = _both_ways(edges)
+    if _is(G, 'multigraph'):
+        edges = ((u, v, k, dd) for u, v, k, dd in edges)
+    else:
+        edges = ((u, v, dd) for u, v, k, dd in edges)
+    if hasattr(G, 'n'):
+        for n, dd in nodes:
+            G.n.add(n, dd)
+        G.e.update(edges)
+        G.data.update(data.data)
+    else:  # a networkx graph, e.g. the default nx.Graph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from(edges)
+        G.graph.update(data.data)
+    return G
+
+def _both_ways(edges):
+    # an undirected edge becomes a pair of arcs
+    for u, v, k, dd in edges:
+        yield u, v, k, dd
+        if u != v:
+            yield v, u, k, dd
+
+def _from_graph(data, create_using, multigraph_input):
+    # graph.Graph, its subgraphs and snapshots: undirected, G.e reports
+    # each edge once
+    edges = ((u, v, None, dd) for (u, v), dd in data.e.items())
+    return _copy_graph(data, data._nodedata.items(), edges, False,
+                       create_using)
+
+def _from_abcgraph(data, create_using, multigraph_input):
+    # ABCgraph.Graph and ABCmultigraph.Graph store each edge once in _succ
+    succ = data._succ.items()
+    if getattr(data, '_multigraph', False):
+        edges = ((u, v, k, dd) for u, nbrs in succ
+                 for v, keydict in nbrs.items() for k, dd in keydict.items())
+    else:
+        edges = ((u, v, None, dd) for u, nbrs in succ for v, dd in nbrs.items())
+    return _copy_graph(data, data._nodes.items(), edges, data._directed,
+                       create_using)
+
+def _from_agraph(data, create_using, multigraph_input):
     try:
-        import numpy
-        if isinstance(data,numpy.matrix) or \
-               isinstance(data,numpy.ndarray):
-            try:
-                return nx.from_numpy_matrix(data,create_using=create_using)
-            except:
-                raise nx.NetworkXError(\
-                  "Input is not a correct numpy matrix or array.")
-    except ImportError:
-        warnings.warn('numpy not found, skipping conversion test.',
-                      ImportWarning)
-
-    # scipy sparse matrix - any format
+        import networkx as nx
+        return nx.nx_agraph.from_agraph(data,create_using=create_using)
+    except Exception:
+        raise NetworkXError("Input is not a correct pygraphviz graph.")
+
+def _from_dict(data, create_using, multigraph_input):
+    # decide from the values up front instead of trying dict-of-dicts
+    # and starting over as dict-of-lists when it fails partway
+    values = list(data.values())
+    if all(isinstance(nbrs, Mapping) for nbrs in values):
+        return from_dict_of_dicts(data,create_using=create_using,
+                                  multigraph_input=multigraph_input)
+    if all(isinstance(nbrs, Iterable) for nbrs in values):
+        return from_dict_of_lists(data,create_using=create_using)
+    raise TypeError("Input is not known type.")
+
+def _from_edges(data, create_using, multigraph_input):
     try:
-        import scipy
-        if hasattr(data,"format"):
-            try:
-                return nx.from_scipy_sparse_matrix(data,create_using=create_using)
-            except:
-                raise nx.NetworkXError(\
-                      "Input is not a correct scipy sparse matrix type.")
-    except ImportError:
-        warnings.warn('scipy not found, skipping conversion test.',
-                      ImportWarning)
+        return from_edgelist(data,create_using=create_using)
+    except Exception:
+        raise NetworkXError("Input is not a valid edge list")
 
+def _from_pandas(data, create_using, multigraph_input):
+    try:
+        return from_pandas_edgelist(data, edge_attr=True,
+                                    create_using=create_using)
+    except KeyError:
+        raise NetworkXError("Input is not a correct Pandas DataFrame; "
+                            "it needs 'source' and 'target' columns.")
+
+def _from_arrow(data, create_using, multigraph_input):
+    from arrowio import from_arrow
+    try:
+        return from_arrow(data, edge_attr=True, create_using=create_using)
+    except KeyError:
+        raise NetworkXError("Input is not a correct Arrow edge table; "
+                            "it needs 'source' and 'target' columns.")
 
-    raise nx.NetworkXError(\
-          "Input is not a known data type for conversion.")
+def _from_numpy(data, create_using, multigraph_input):
+    try:
+        import networkx as nx
+        return nx.from_numpy_matrix(data,create_using=create_using)
+    except Exception:
+        raise NetworkXError(
+            "Input is not a correct numpy matrix or array.")
 
-    return
+def _from_scipy(data, create_using, multigraph_input):
+    try:
+        import networkx as nx
+        return nx.from_scipy_sparse_matrix(data,create_using=create_using)
+    except Exception:
+        raise NetworkXError(
+            "Input is not a correct scipy sparse matrix type.")
+
+register_converter('graph.Graph', _from_graph)
+register_converter('subgraph.Subgraph', _from_graph)
+register_converter('snapshot.GraphSnapshot', _from_graph)
+register_converter('ABCgraph.Graph', _from_abcgraph)
+register_converter('ABCmultigraph.Graph', _from_abcgraph)
+register_converter('pygraphviz.AGraph', _from_agraph)
+register_converter(dict, _from_dict)
+register_converter(list, _from_edges)
+register_converter(tuple, _from_edges)
+register_converter(Iterator, _from_edges)
+register_converter('pandas.DataFrame', _from_pandas)
+register_converter('pyarrow.Table', _from_arrow)
+register_converter('pyarrow.RecordBatch', _from_arrow)
+register_converter('numpy.ndarray', _from_numpy)
+register_converter('scipy.sparse.spmatrix', _from_scipy)
+register_converter('scipy.sparse.sparray', _from_scipy)
 
 
 def convert_to_undirected(G):
@@ -307,6 +391,20 @@ def to_dict_of_dicts(G,nodelist=None,edge_data=None):
                     dod[u][v]=edge_data
     return dod
 
+def _undirected_once(d):
+    """Yield (u, v, data) from a dict-of-dicts, one direction per edge.
+
+    An edge u-v listed under both endpoints is taken from the one that
+    comes first in `d`, comparing enumeration ranks instead of keeping a
+    set of seen pairs. Edges listed under one endpoint are always taken.
+    """
+    rank = dict((u, i) for i, u in enumerate(d))
+    for u,nbrs in d.items():
+        ru = rank[u]
+        for v,data in nbrs.items():
+            if rank.get(v, ru) >= ru or u not in d[v]:
+                yield u,v,data
+
 def from_dict_of_dicts(d,create_using=None,multigraph_input=False):
     """Return a graph from a dictionary of dictionaries.
 
@@ -352,35 +450,24 @@ def from_dict_of_dicts(d,create_using=None,multigraph_input=False):
                                   for key,data in datadict.items()
                                 )
         else: # Undirected
+            # don't add both directions of undirected graph
             if G.is_multigraph():
-                seen=set()   # don't add both directions of undirected graph
-                for u,nbrs in d.items():
-                    for v,datadict in nbrs.items():
-                        if (u,v) not in seen:
-                            G.e.update( (u,v,key,data)
-                                               for key,data in datadict.items()
-                                              )
-                            seen.add((v,u))
+                for u,v,datadict in _undirected_once(d):
+                    G.e.update( (u,v,key,data)
+                                       for key,data in datadict.items()
+                                      )
             else:
-                seen=set()   # don't add both directions of undirected graph
-                for u,nbrs in d.items():
-                    for v,datadict in nbrs.items():
-                        if (u,v) not in seen:
-                            G.e.update( (u,v,data)
-                                        for key,data in datadict.items() )
-                            seen.add((v,u))
+                for u,v,datadict in _undirected_once(d):
+                    G.e.update( (u,v,data)
+                                for key,data in datadict.items() )
 
     else: # not a multigraph to multigraph transfer
         if G.is_multigraph() and not G.is_directed():
             # d can have both representations u-v, v-u in dict.  Only add one.
             # We don't need this check for digraphs since we add both directions,
             # or for Graph() since it is done implicitly (parallel edges not allowed)
-            seen=set()
-            for u,nbrs in d.items():
-                for v,data in nbrs.items():
-                    if (u,v) not in seen:
-                        G.e.add(u,v,attr_dict=data)
-                    seen.add((v,u))
+            for u,v,data in _undirected_once(d):
+                G.e.add(u,v,attr_dict=data)
         else:
             G.e.update( ( (u,v,data)
                                 for u,nbrs in d.items()
@@ -427,3 +514,106 @@ def from_edgelist(edgelist,create_using=None):
     G=_prep_create_using(create_using)
     G.e.update(edgelist)
     return G
+
+
+def from_pandas_edgelist(df, source='source', target='target', edge_attr=None,
+                         create_using=None, edge_key=None):
+    """Return a graph from a pandas DataFrame with one edge per row.
+
+    Parameters
+    ----------
+    df : pandas DataFrame
+       An edge list with a column for each endpoint.
+
+    source, target : column labels
+       Columns holding the source and target node of each edge.
+
+    edge_attr : column label, list of labels or True, optional
+       Columns to store as edge data; True takes every other column.
+
+    create_using : graph, optional
+       Graph to fill; a new graph.Graph by default.
+
+    edge_key : column label, optional
+       Column holding edge keys, used if create_using is a multigraph.
+
+    Columns are converted whole (Series.tolist, DataFrame.to_dict) and
+    handed to G.e.update, so attribute indexes, journals and component
+    tracking see the new edges as usual.
+    """
+    if create_using is None:
+        from graph import Graph
+        create_using = Graph()
+    G=_prep_create_using(create_using)
+    sources = df[source].tolist()
+    targets = df[target].tolist()
+    if edge_attr is True:
+        edge_attr = [c for c in df.columns if c not in (source, target, edge_key)]
+    elif edge_attr is not None and not isinstance(edge_attr, (list, tuple)):
+        edge_attr = [edge_attr]
+    if edge_attr:
+        datadicts = df[list(edge_attr)].to_dict('records')
+    else:
+        datadicts = repeat({})
+    if edge_key is not None and _is(G, 'multigraph'):
+        G.e.update(zip(sources, targets, df[edge_key].tolist(), datadicts))
+    else:
+        G.e.update(zip(sources, targets, datadicts))
+    return G
+
+def _edge_columns(G):
+    # source, target, key (None without edge keys) and datadict lists for
+    # graph.Graph, ABCgraph.Graph and ABCmultigraph.Graph, built a node
+    # at a time from the adjacency
+    sources, targets, datadicts = [], [], []
+    keys = None
+    succ = getattr(G, '_succ', None)
+    if succ is None:
+        # graph.Graph stores undirected edges under both endpoints; keep
+        # the entry under the endpoint with the smaller ordinal
+        rank = G._node_ordinals
+        if len(rank) < len(G._adjacency):
+            # nodes written straight into nxGraph's G.node and G.adj have
+            # no ordinal; number the nodes in adjacency order instead
+            rank = dict(zip(G._adjacency, range(len(G._adjacency))))
+        source_rank = []
+        for u, nbrs in G._adjacency.items():
+            sources.extend(repeat(u, len(nbrs)))
+            source_rank.extend(repeat(rank[u], len(nbrs)))
+            targets.extend(nbrs)
+            datadicts.extend(nbrs.values())
+        keep = list(map(le, source_rank, map(rank.__getitem__, targets)))
+        sources = list(compress(sources, keep))
+        targets = list(compress(targets, keep))
+        datadicts = list(compress(datadicts, keep))
+    elif getattr(G, '_multigraph', False):
+        keys = []
+        for u, nbrs in succ.items():
+            for v, keydict in nbrs.items():
+                sources.extend(repeat(u, len(keydict)))
+                targets.extend(repeat(v, len(keydict)))
+                keys.extend(keydict)
+                datadicts.extend(keydict.values())
+    else:
+        for u, nbrs in succ.items():
+            sources.extend(repeat(u, len(nbrs)))
+            targets.extend(nbrs)
+            datadicts.extend(nbrs.values())
+    return sources, targets, keys, datadicts
+
+def to_pandas_edgelist(G, source='source', target='target', edge_key='key'):
+    """Return the edges of G as a pandas DataFrame, one row per edge.
+
+    The source and target columns come first, then the edge key column
+    for multigraphs, then one column per edge attribute (NaN where an
+    edge lacks it).
+    """
+    import pandas as pd
+    sources, targets, keys, datadicts = _edge_columns(G)
+    columns = {source: sources, target: targets}
+    if keys is not None:
+        columns[edge_key] = keys
+    nan = float('nan')
+    for attr in dict.fromkeys(chain.from_iterable(datadicts)):
+        columns[attr] = list(map(methodcaller('get', attr, nan), datadicts))
+    return pd.DataFrame(columns, columns=list(columns))
@@ -0,0 +1,122 @@
+"""List-backed storage for graphs whose nodes are the ints 0..n-1.
+
+Graph(dense=True), and Graph.from_adjacency_matrix and
+Graph.from_adjacency_list called with dense=True, keep node data and the
+outer adjacency in a DenseDict: a mapping whose values sit in a list
+slot indexed by the node. The outer containers shrink from a hash table
+to one pointer per node, and edges are iterated by walking the list in
+node order, which makes the node itself the rank used to report
+undirected edges once; dense graphs keep no node ordinals.
+
+Nodes must be non-negative ints; the list grows to the largest node, so
+sparse ids such as 10**9 are better kept in a plain graph.
+"""
+from collections import MutableMapping, KeysView, ItemsView, ValuesView
+from operator import index
+
+from exception import NetworkXError
+
+__all__ = ['DenseDict']
+
+
+_FREE = object()  # marks an empty slot
+
+
+class DenseKeys(KeysView):
+    __slots__ = ()
+    def __iter__(self):
+        return iter(self._mapping)
+
+class DenseItems(ItemsView):
+    __slots__ = ()
+    def __iter__(self):
+        for i, value in enumerate(self._mapping._slots):
+            if value is not _FREE:
+                yield i, value
+
+class DenseValues(ValuesView):
+    __slots__ = ()
+    def __iter__(self):
+        for value in self._mapping._slots:
+            if value is not _FREE:
+                yield value
+
+
+class DenseDict(MutableMapping):
+    """Mapping from non-negative ints to values, stored in a list."""
+    __slots__ = ('_slots', '_len')
+    def __init__(self, *args, **kwds):
+        self._slots = []
+        self._len = 0
+        if args or kwds:
+            self.update(*args, **kwds)
+    def __repr__(self):
+        return '{0.__class__.__name__}({1})'.format(self, dict(self.items()))
+    def __reduce__(self):
+        return (self.__class__, (dict(self.items()),))
+
+    def __getitem__(self, key):
+        try:
+            if key >= 0:
+                value = self._slots[key]
+                if value is not _FREE:
+                    return value
+        except (TypeError, IndexError):
+            pass
+        raise KeyError(key)
+    def __contains__(self, key):
+        try:
+            return key >= 0 and self._slots[key] is not _FREE
+        except (TypeError, IndexError):
+            return False
+    def get(self, key, default=None):
+        try:
+            if key >= 0:
+                value = self._slots[key]
+                if value is not _FREE:
+                    return value
+        except (TypeError, IndexError):
+            pass
+        return default
+    def __setitem__(self, key, value):
+        try:
+            i = index(key)
+        except TypeError:
+            i = -1
+        if i < 0:
+            raise NetworkXError(
+                "Dense graphs only hold integer nodes >= 0, not %r" % (key,))
+        slots = self._slots
+        if i >= len(slots):
+            slots.extend([_FREE] * (i + 1 - len(slots)))
+        if slots[i] is _FREE:
+            self._len += 1
+        slots[i] = value
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        slots = self._slots
+        slots[key] = _FREE
+        self._len -= 1
+        while slots and slots[-1] is _FREE:
+            slots.pop()
+    def __iter__(self):
+        for i, value in enumerate(self._slots):
+            if value is not _FREE:
+                yield i
+    def __len__(self):
+        return self._len
+    def keys(self):
+        return DenseKeys(self)
+    def items(self):
+        return DenseItems(self)
+    def values(self):
+        return DenseValues(self)
+    def clear(self):
+        del self._slots[:]
+        self._len = 0
+    def copy(self):
+        new = self.__class__()
+        new._slots = list(self._slots)
+        new._len = self._len
+        return new
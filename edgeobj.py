@@ -1,4 +1,5 @@
 from collections import MutableMapping, Mapping, MutableSet, Set, KeysView, ItemsView
+from copy import deepcopy
 #from networkx import NetworkXError
 NetworkXError = Exception
 from ABCgraph import Adjacency, AtlasUnion
@@ -257,15 +258,16 @@ class Edges(MutableSet):
         succ = self._graph._succ
         pred = self._graph._pred
         nodes = self._graph.nodes
+        nbrs_factory = self._graph.adjlist_inner_dict_factory
         u_new = u not in self._succ
         v_new = v not in self._succ
         if u_new:
-            succ[u] = {} # fixme factory
-            pred[u] = {} # fixme factory
+            succ[u] = nbrs_factory()
+            pred[u] = nbrs_factory()
             nodes.add(u)
         if v_new:
-            succ[v] = {} # fixme factory
-            pred[v] = {} # fixme factory
+            succ[v] = nbrs_factory()
+            pred[v] = nbrs_factory()
             nodes.add(v)
         # find the edge
         if not (u_new or v_new):
@@ -345,11 +347,19 @@ class Edges(MutableSet):
 
 
 
+def _rebuild_graph(cls, nodes, edges, graph):
+    return cls(nodes, edges, **graph)
+
 class Graph(object):
+    # Storage factories for the adjacency dicts (edge data lives in the
+    # Edge objects); override in a subclass to use other mappings.
+    adjlist_outer_dict_factory = dict  # node -> neighbor dict
+    adjlist_inner_dict_factory = dict  # neighbor -> Edge
+
     def __init__(self, nodes=None, edges=None, **kwds):
         # adjacency dicts
-        self._succ = {}
-        self._pred = {}
+        self._succ = self.adjlist_outer_dict_factory()
+        self._pred = self.adjlist_outer_dict_factory()
         # properties
         self._directed = kwds.get("directed", False)
         self._multigraph = kwds.get("multigraph", False)
@@ -398,6 +408,11 @@ class Graph(object):
 
     def __repr__(self):
         return 'Graph(nodes={}, edges={})'.format(self.nodes, self.edges)
+    def __reduce__(self):
+        # Node and Edge objects carry their data; each edge is pickled
+        # once and the adjacency and views are rebuilt by __init__
+        return (_rebuild_graph, (self.__class__, list(self.nodes),
+                                 list(self.edges), self.graph))
     def clear(self):
         self.graph.clear()
         self.nodes.clear()
@@ -420,7 +435,7 @@ class Graph(object):
 if __name__ == "__main__":
     # edge
     e = Edge(1,2)
-    print e
+    print(e)
     u,v = e
     assert u==1 and v==2
     assert asEdge(e) is e
@@ -431,7 +446,7 @@ if __name__ == "__main__":
     assert e.data.get('color',1) == 1
     # node
     n = Node(1)
-    print n
+    print(n)
     assert n.node0 == 1
     n = Node(1, color=2)
     assert n.data['color'] == 2
@@ -1,5 +1,12 @@
 from collections import MappingView, Set
-from networkx.exception import NetworkXError
+from exception import NetworkXError
+
+from attrindex import (make_index, parse_conditions, select, check_item,
+                       new_attrs, index_item, unindex_item, wrap_attr_dict)
+from versions import Versions, writer
+from flyweight import AttrRecords, EdgeAttrs
+from dense import DenseDict
+from chunks import ChunkedEdges
 
 
 class BaseEdgeView(Set):
@@ -43,19 +50,59 @@ class EdgeItems(BaseEdgeView):
         return v in adj[u] and adj[u][v] == d
 
 
-class UndirectedEdges(object):
+class UndirectedEdges(ChunkedEdges):
     def __len__(self):
-        return sum(len(nbrs) for n, nbrs in self._adj.items()) // 2
+        # self-loops are stored once, other edges under both endpoints
+        nodes_nbrs = self._adj.items()
+        return sum(len(nbrs) + (n in nbrs) for n, nbrs in nodes_nbrs) // 2
+    # Each undirected edge is stored under both endpoints. It is reported
+    # from the endpoint with the smaller node ordinal, so no `seen` set
+    # is needed. Views without ordinals (bare dicts, or nodes written
+    # straight into nxGraph's G.node and G.adj) fall back to one.
+    # Dense graphs (see dense.py) use the int nodes as their own ranks.
+    def _rank(self):
+        rank = self._ordinals
+        if rank is not None and len(rank) < len(self._adj):
+            return None
+        return rank
     def __iter__(self):
-        seen = set()
+        if isinstance(self._adj, DenseDict):
+            for n, nbrs in self._adj.items():
+                for nbr in nbrs:
+                    if nbr >= n:
+                        yield (n, nbr)
+            return
+        rank = self._rank()
+        if rank is None:
+            for e, ddict in self._seen_items():
+                yield e
+            return
         nodes_nbrs = self._adj.items()
         for n, nbrs in nodes_nbrs:
+            r = rank[n]
             for nbr in nbrs:
-                if nbr not in seen:
+                if rank[nbr] >= r:
                     yield (n, nbr)
-            seen.add(n)
-        del seen
     def _items(self):
+        if isinstance(self._adj, DenseDict):
+            return self._dense_items()
+        rank = self._rank()
+        if rank is None:
+            return self._seen_items()
+        return self._ranked_items(rank)
+    def _dense_items(self):
+        for n, nbrs in self._adj.items():
+            for nbr, ddict in nbrs.items():
+                if nbr >= n:
+                    yield (n,nbr),ddict
+    def _ranked_items(self, rank):
+        nodes_nbrs = self._adj.items()
+        for n, nbrs in nodes_nbrs:
+            r = rank[n]
+            for nbr, ddict in nbrs.items():
+                if rank[nbr] >= r:
+                    yield (n,nbr),ddict
+    def _seen_items(self):
         seen = set()
         nodes_nbrs = self._adj.items()
         for n, nbrs in nodes_nbrs:
@@ -64,16 +111,49 @@ class UndirectedEdges(object):
                     yield (n,nbr),ddict
             seen.add(n)
         del seen
+    # Chunks (see chunks.py) apply the same rule to a range of nodes.
+    def _chunk_weights(self):
+        return map(len, self._adj.values())
+    def _chunk_order(self):
+        # the nodes and their ranks, taken once for all chunks of a split
+        adj = self._adj
+        items = list(adj.items())
+        if isinstance(adj, DenseDict):
+            return items, range(len(adj._slots))
+        rank = self._rank()
+        if rank is None:
+            rank = {n: i for i, (n, nbrs) in enumerate(items)}
+        return items, rank
+    def _chunk(self, start, stop, order, data=False):
+        items, rank = order
+        for n, nbrs in items[start:stop]:
+            r = rank[n]
+            for nbr, ddict in nbrs.items():
+                if rank[nbr] >= r:
+                    yield ((n,nbr),ddict) if data else (n,nbr)
     def __contains__(self, key):
         u,v = key
         return v in self._adj[u]
     def __getitem__(self, key):
         try:
             u,v = key
-            return self._adj[u][v]
+            datadict = self._adj[u][v]
         except TypeError:
             raise NetworkXError('bad edge key: use edge key = (u,v)')
+        if self._records is not None:
+            return EdgeAttrs(self, (u, v))
+        return self._versions.own_edge_attrs(self._adj, u, v)
     # Mutating Methods
+    # Neighbor dicts and datadicts may be shared with snapshots, so they
+    # are changed through self._versions.own*, which copies them first.
+    # Top-level entries are saved for snapshots before they change.
+    def _save_node(self, n):
+        save = self._versions.save
+        save(self._adj, n)
+        save(self._node, n)
+        if self._ordinals is not None:
+            save(self._ordinals, n)
+    @writer
     def add(self, u, v, attr_dict=None, **attr):
         if attr_dict is None:
             attr_dict = attr
@@ -81,20 +161,64 @@ class UndirectedEdges(object):
             try:
                 attr_dict.update(attr)
             except AttributeError:
+                self._versions.noop = True
                 raise NetworkXError(
                     "The attr_dict argument must be a dictionary.")
+        if attr_dict and (self._eindex or self._edge_factory is not dict):
+            try:
+                # checked as stored: an edge schema may convert values or
+                # reject them, so existing edges are never half updated
+                new_attrs(self._edge_factory, attr_dict, self._eindex)
+            except NetworkXError:
+                self._versions.noop = True
+                raise
+        if not attr_dict and u in self._adj and v in self._adj[u]:
+            self._versions.noop = True  # existing edge, no attributes
+            return
+        ordinals = self._ordinals
+        if ordinals is not None and ordinals.interning:
+            u = ordinals.intern(u)
+            v = ordinals.intern(v)
         # add nodes
         if u not in self._node:
-            self._adj[u] = {} # fixme factory
-            self._node[u] = {}
+            self._save_node(u)
+            self._adj[u] = self._nbrs_factory()
+            self._node[u] = wrap_attr_dict(u, self._nindex,
+                                           self._attr_factory())
+            if self._ordinals is not None:
+                self._ordinals.assign(u)
         if v not in self._node:
-            self._adj[v] = {} # fixme factory
-            self._node[v] = {}
+            self._save_node(v)
+            self._adj[v] = self._nbrs_factory()
+            self._node[v] = wrap_attr_dict(v, self._nindex,
+                                           self._attr_factory())
+            if self._ordinals is not None:
+                self._ordinals.assign(v)
         # add the edge
-        datadict = self._adj[u].get(v, {}) # fixme factory
+        adj = self._adj
+        versions = self._versions
+        records = self._records
+        if v not in adj[u]:
+            datadict = self._edge_factory()
+        elif records is None:
+            datadict = versions.own_edge(adj, u, v)
+        else:  # shared records are immutable
+            datadict = dict(adj[u][v])
+        eindex = self._eindex
+        if eindex:
+            unindex_item(eindex, (u, v), datadict, (v, u))
         datadict.update(attr_dict)
-        self._adj[u][v] = datadict
-        self._adj[v][u] = datadict
+        if records is not None:
+            datadict = records.intern(datadict)
+        versions.own(adj, u)[v] = datadict
+        versions.own(adj, v)[u] = datadict
+        if eindex:
+            index_item(eindex, (u, v), datadict)
+        if versions.components is not None:
+            versions.components.union(u, v)
+        if versions.journal is not None:
+            versions.journal.record('add_edge', (u, v), attr_dict)
+    @writer
     def update(self, ebunch, attr_dict=None, **attr):
         # set up attribute dict
         if attr_dict is None:
@@ -103,9 +227,31 @@ class UndirectedEdges(object):
             try:
                 attr_dict.update(attr)
             except AttributeError:
+                self._versions.noop = True
                 raise NetworkXError(
                     "The attr_dict argument must be a dictionary.")
         # process ebunch
+        eindex = self._eindex
+        check = eindex or self._edge_factory is not dict
+        if check and attr_dict:
+            try:
+                new_attrs(self._edge_factory, attr_dict, eindex)
+            except NetworkXError:
+                self._versions.noop = True
+                raise
+        adj = self._adj
+        own = self._versions.own
+        own_edge = self._versions.own_edge
+        ordinals = self._ordinals
+        nbrs_factory = self._nbrs_factory
+        attr_factory = self._attr_factory
+        edge_factory = self._edge_factory
+        records = self._records
+        journal = self._versions.journal
+        components = self._versions.components
+        interning = ordinals is not None and ordinals.interning
+        save_node = self._save_node
+        ne = None  # stays None for an empty ebunch
         for e in ebunch:
             ne = len(e)
             if ne == 3:
@@ -116,33 +262,185 @@ class UndirectedEdges(object):
             else:
                 raise NetworkXError(
                     "Edge tuple %s must be a 2-tuple or 3-tuple." % (e,))
+            if check and dd:
+                new_attrs(edge_factory, dd, eindex)
+            if interning:
+                u = ordinals.intern(u)
+                v = ordinals.intern(v)
             if u not in self._node:
-                self._adj[u] = {}
-                self._node[u] = {}
+                save_node(u)
+                self._adj[u] = nbrs_factory()
+                self._node[u] = wrap_attr_dict(u, self._nindex, attr_factory())
+                if ordinals is not None:
+                    ordinals.assign(u)
             if v not in self._node:
-                self._adj[v] = {}
-                self._node[v] = {}
-            datadict = self._adj[u].get(v, {})
+                save_node(v)
+                self._adj[v] = nbrs_factory()
+                self._node[v] = wrap_attr_dict(v, self._nindex, attr_factory())
+                if ordinals is not None:
+                    ordinals.assign(v)
+            if v not in adj[u]:
+                datadict = edge_factory()
+            elif records is None:
+                datadict = own_edge(adj, u, v)
+            else:
+                datadict = dict(adj[u][v])
+            if eindex:
+                unindex_item(eindex, (u, v), datadict, (v, u))
             datadict.update(attr_dict)
             datadict.update(dd)
-            self._adj[u][v] = datadict
-            self._adj[v][u] = datadict
+            if records is not None:
+                datadict = records.intern(datadict)
+            own(adj, u)[v] = datadict
+            own(adj, v)[u] = datadict
+            if eindex:
+                index_item(eindex, (u, v), datadict)
+            if components is not None:
+                components.union(u, v)
+            if journal is not None:
+                delta = dict(attr_dict)
+                delta.update(dd)
+                journal.record('add_edge', (u, v), delta)
+        if ne is None:
+            self._versions.noop = True
+    @writer
     def remove(self, u, v):
+        adj = self._adj
+        own = self._versions.own
         try:
-            del self._adj[u][v]
+            if self._eindex:
+                unindex_item(self._eindex, (u, v), adj[u][v], (v, u))
+            del own(adj, u)[v]
             if u != v:  # self-loop needs only one entry removed
-                del self._adj[v][u]
+                del own(adj, v)[u]
         except KeyError:
+            self._versions.noop = True
             raise NetworkXError("The edge %s-%s is not in the graph" % (u, v))
+        if self._versions.components is not None:
+            self._versions.components.split(u, v)
+        if self._versions.journal is not None:
+            self._versions.journal.record('remove_edge', (u, v))
+    @writer
     def clear(self):
-        for n in self._adj:
-            self._adj[n].clear()
+        adj = self._adj
+        if not any(adj.values()):
+            self._versions.noop = True
+            return
+        if self._versions.snapshots:
+            self._versions.save_all(adj)
+            for n in adj:
+                adj[n] = self._nbrs_factory()
+        else:
+            for n in adj:
+                adj[n].clear()
+        if self._versions.components is not None:
+            self._versions.components.reset()
+        if self._versions.journal is not None:
+            self._versions.journal.record('clear_edges')
+        for idx in self._eindex.values():
+            idx.clear()
+    # Shared attribute records
+    @writer
+    def intern_attrs(self, on=True):
+        """Share equal edge attribute dicts as read-only records.
+
+        Reduces memory when many edges carry the same small attribute
+        dict. While on, G.e[(u, v)] returns a writable proxy that gives
+        the edge a record of its own on write (see flyweight.py); the
+        dicts reached through G.a or G.e.items() are read-only.
+        """
+        if on:
+            if self._records is None:
+                self._records = AttrRecords()
+            store = self._records.intern
+        else:
+            self._records = None
+            store = self._edge_factory
+        adj = self._adj
+        own = self._versions.own
+        for (u, v), dd in list(self._items()):
+            if on:
+                dd = store(dd)
+            else:
+                new = store()
+                new.update(dd)
+                dd = new
+            own(adj, u)[v] = dd
+            own(adj, v)[u] = dd
+    def _attr_record(self, key):
+        u, v = key
+        return self._adj[u][v]
+    @writer
+    def _rewrite_attrs(self, key, change):
+        # clone the record of edge u-v, change it, and store it interned
+        u, v = key
+        adj = self._adj
+        old = adj[u][v]
+        new = dict(old)
+        change(new)
+        eindex = self._eindex
+        if eindex:
+            check_item(eindex, new)
+            unindex_item(eindex, (u, v), old, (v, u))
+        if self._records is not None:
+            new = self._records.intern(new)
+        own = self._versions.own
+        own(adj, u)[v] = new
+        own(adj, v)[u] = new
+        if eindex:
+            index_item(eindex, (u, v), new)
+        if self._versions.journal is not None:
+            # the change may delete attributes, so record the whole dict
+            self._versions.journal.record('replace_edge', (u, v), new)
+
+    # Attribute indexes
+    @writer
+    def add_index(self, attr, kind='hash'):
+        """Maintain an index on edge attribute `attr` for where() queries.
+
+        kind is 'hash' (equality) or 'sorted' (equality and ranges).
+        Only changes made through the Nodes/Edges methods are tracked;
+        reindex with add_index after writing datadicts directly.
+        """
+        # indexes change no node or edge, so the version stays
+        self._versions.noop = True
+        idx = make_index(kind)
+        idx.build((e, dd[attr]) for e, dd in self._items() if attr in dd)
+        self._eindex[attr] = idx
+    def drop_index(self, attr):
+        del self._eindex[attr]
+    def where(self, **conditions):
+        """Return a list of edges whose data satisfies all conditions.
+
+        G.e.where(type='transfer', weight__gt=3) uses an index on `type`
+        or `weight` if there is one, otherwise scans all edges.
+        """
+        adj = self._adj
+        return list(select(self._eindex, parse_conditions(conditions),
+                           lambda e: adj[e[0]][e[1]], self._items))
 
 class Edges(UndirectedEdges, Set):
-    __slots__ = ('_adj','_node')
-    def __init__(self, node, adj):
+    __slots__ = ('_adj','_node','_eindex','_nindex','_ordinals','_versions',
+                 '_nbrs_factory','_attr_factory','_edge_factory','_records')
+    def __init__(self, node, adj, graph=None):
         self._adj = adj
         self._node = node
+        self._records = None  # AttrRecords while intern_attrs is on
+        # indexes, ordinals and versions are shared with the graph's Nodes
+        if graph is None:
+            self._eindex, self._nindex = {}, {}
+            self._ordinals = None
+            self._versions = Versions()
+            self._nbrs_factory = self._attr_factory = dict
+            self._edge_factory = dict
+        else:
+            self._eindex = graph._edge_indexes
+            self._nindex = graph._node_indexes
+            self._ordinals = graph._node_ordinals
+            self._versions = graph._versions
+            self._nbrs_factory = graph.adjlist_inner_dict_factory
+            self._attr_factory = graph.node_attr_dict_factory
+            self._edge_factory = graph.edge_attr_dict_factory
     def __repr__(self):
         return '{0.__class__.__name__}({1})'.format(self,list(self))
     def keys(self):
@@ -0,0 +1,14 @@
+"""Exceptions raised by the graph classes.
+
+Defined here rather than imported from networkx, so that importing the
+graph classes does not import networkx. The names follow networkx.
+"""
+
+__all__ = ['NetworkXException', 'NetworkXError']
+
+
+class NetworkXException(Exception):
+    """Base class for exceptions raised by the graph classes."""
+
+class NetworkXError(NetworkXException):
+    """Exception for a serious error, e.g. a missing node or edge."""
@@ -0,0 +1,96 @@
+"""Shared, immutable edge attribute records.
+
+Many edges carry equal small attribute dicts ({'weight': 1},
+{'type': 'follows'}). With G.e.intern_attrs() each distinct record is
+stored once as a ``SharedAttrDict`` and referenced by every edge that
+carries it.
+
+Shared records are read-only. G.e[(u, v)] returns an ``EdgeAttrs``
+proxy: a write through it is applied to a private clone of the record,
+and the clone is then interned and stored for that edge alone. Records
+with unhashable values are kept as plain private dicts.
+"""
+from collections import MutableMapping
+import weakref
+
+from exception import NetworkXError
+
+__all__ = ['SharedAttrDict', 'AttrRecords', 'EdgeAttrs']
+
+
+class SharedAttrDict(dict):
+    """A read-only edge attribute dict that may be shared by many edges."""
+    __slots__ = ('__weakref__',)
+    def _read_only(self, *args, **kwds):
+        raise NetworkXError("Shared edge attributes are read-only; "
+                            "write through G.e[(u, v)] instead")
+    __setitem__ = __delitem__ = update = setdefault = _read_only
+    pop = popitem = clear = _read_only
+    def copy(self):
+        return dict(self)
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class AttrRecords(object):
+    """Intern table of shared records; unused records are dropped."""
+    __slots__ = ('_table',)
+    def __init__(self):
+        self._table = weakref.WeakValueDictionary()
+    def __len__(self):
+        return len(self._table)
+    def __reduce__(self):
+        return (self.__class__, ())
+    def intern(self, datadict):
+        try:
+            # value types are part of the key: 1, 1.0 and True are equal
+            key = frozenset((k, type(v), v) for k, v in datadict.items())
+        except TypeError:  # unhashable value, keep a private dict
+            return datadict
+        record = self._table.get(key)
+        if record is None:
+            record = self._table[key] = SharedAttrDict(datadict)
+        return record
+
+
+class EdgeAttrs(MutableMapping):
+    """Writable view of the attributes of edge (u, v).
+
+    Reads go to ``edges._attr_record(key)``, the edge's current record.
+    Writes replace the record via ``edges._rewrite_attrs(key, change)``.
+    """
+    __slots__ = ('_edges', '_key')
+    def __init__(self, edges, key):
+        self._edges = edges
+        self._key = key
+    def _record(self):
+        return self._edges._attr_record(self._key)
+    def __repr__(self):
+        return repr(self._record())
+    def __getitem__(self, attr):
+        return self._record()[attr]
+    def __iter__(self):
+        return iter(self._record())
+    def __len__(self):
+        return len(self._record())
+    def __contains__(self, attr):
+        return attr in self._record()
+    def __eq__(self, other):
+        return self._record() == other
+    def __ne__(self, other):
+        return not self == other
+    def copy(self):
+        return dict(self._record())
+    def __setitem__(self, attr, value):
+        def change(dd):
+            dd[attr] = value
+        self._edges._rewrite_attrs(self._key, change)
+    def __delitem__(self, attr):
+        def change(dd):
+            del dd[attr]
+        self._edges._rewrite_attrs(self._key, change)
+    def update(self, *args, **kwds):
+        new = dict(*args, **kwds)
+        self._edges._rewrite_attrs(self._key, lambda dd: dd.update(new))
+    def clear(self):
+        self._edges._rewrite_attrs(self._key, lambda dd: dd.clear())
@@ -1,14 +1,36 @@
 from __future__ import division
 from copy import deepcopy
-import networkx as nx
+try:
+    from copyreg import __newobj__
+except ImportError:  # Python 2
+    from copy_reg import __newobj__
+from exception import NetworkXError
 
-from nodes import Nodes
+from nodes import Nodes, NodeOrdinals
 from edges import Edges
 from adjacency import Adjacency
 from subgraph import Subgraph
+from snapshot import GraphSnapshot
+from versions import Versions
+from journal import MutationJournal
+from memo import EpochCache
+from components import ComponentIndex, reachable
+from schema import Schema
+from dense import DenseDict
+from attrindex import wrap_attr_dict, index_kind, build_indexes
+import compact
 import convert
 
 class Graph(object):
+    # Storage factories; override in a subclass to use other mappings
+    # (ordered, compact, instrumented...). Each is called with no
+    # arguments and must return a dict-like object with a copy() method.
+    node_dict_factory = dict           # node -> node attribute dict
+    node_attr_dict_factory = dict      # attribute dict of one node
+    adjlist_outer_dict_factory = dict  # node -> neighbor dict
+    adjlist_inner_dict_factory = dict  # neighbor -> edge attribute dict
+    edge_attr_dict_factory = dict      # attribute dict of one edge
+
     def __init__(self, data=None, **attr):
         # the init could be
         # graph = Graph(g) where g is a Graph
@@ -19,15 +41,30 @@ class Graph(object):
         # Graph.from_adjacency_list(l)
         #
         # should abstract the data here
-        self._nodedata = {}  # empty node attribute dict
-        self._adjacency = {}  # empty adjacency dict
+        if attr.pop('dense', False):  # integer nodes 0..n-1, see dense.py
+            self.node_dict_factory = DenseDict
+            self.adjlist_outer_dict_factory = DenseDict
+        self._nodedata = self.node_dict_factory()  # empty node attribute dict
+        self._adjacency = self.adjlist_outer_dict_factory()  # empty adjacency dict
+        self._edge_indexes = {}  # opt-in edge attribute indexes
+        self._node_indexes = {}  # opt-in node attribute indexes
+        self._node_ordinals = NodeOrdinals()  # node <-> int, see node_index
+        self._versions = Versions()  # writer lock, copy-on-write state
+        self._memo = EpochCache(self._versions)  # see cached()
         # the interface is n,e,a,data
-        self.n = Nodes(self._nodedata, self._adjacency) # rename to self.nodes
-        self.e = Edges(self._nodedata, self._adjacency) # rename to self.edges
-        self.a = Adjacency(self._adjacency) # rename to self.adjacency
+        self.n = Nodes(self._nodedata, self._adjacency, self) # rename to self.nodes
+        self.e = Edges(self._nodedata, self._adjacency, self) # rename to self.edges
+        self.a = Adjacency(self._adjacency, self) # rename to self.adjacency
         self.data = {}   # dictionary for graph attributes
+        if self.dense:
+            # the int nodes are their own ranks and ids; keep no ordinals
+            self.n._ordinals = self.e._ordinals = self.a._index = None
         # load with data
-        if hasattr(data,'n') and not hasattr(data,'name'): # it is a new graph
+        if convert._graph_converter(data) is not None:
+            # graphs, subgraphs and snapshots of any class in this package
+            convert.to_networkx_graph(data, create_using=self)
+            data = None
+        elif hasattr(data,'n') and not hasattr(data,'name'): # it is a new graph
             self.n.update(data.n)
             self.e.update(data.e)
             self.data.update(data.data)
@@ -47,6 +84,160 @@ class Graph(object):
         H = Subgraph(self, nbunch)
         return H
 
+    def intern_keys(self):
+        """Store each node key object once.
+
+        Keys read from files or the network arrive as distinct but equal
+        objects (e.g. long string ids), and every neighbor dict would
+        keep its own copy. From now on edges reuse the key object held
+        for the node in the node index; existing neighbor dicts are
+        rebuilt once with those objects.
+        """
+        with self._versions.lock:
+            ordinals = self._node_ordinals
+            ordinals.interning = True
+            intern = ordinals.intern
+            adj = self._adjacency
+            self._versions.save_all(adj)
+            for n, nbrs in adj.items():
+                adj[n] = newnbrs = self.adjlist_inner_dict_factory()
+                newnbrs.update((intern(nbr), dd) for nbr, dd in nbrs.items())
+
+    def set_schema(self, edge=None, node=None, overflow=True):
+        """Store edge and/or node attributes as fixed-schema records.
+
+        edge and node map attribute names to types, e.g.
+        G.set_schema(edge={'weight': float, 'ts': int, 'kind': str}).
+        Existing attributes are converted. Keys outside the schema are
+        kept in a per-record overflow dict, or rejected with
+        NetworkXError if overflow is False (see schema.py).
+        """
+        with self._versions.lock:
+            own = self._versions.own
+            if edge is not None:
+                if self.e._records is not None:
+                    raise NetworkXError(
+                        "Edge schemas cannot be combined with intern_attrs")
+                factory = Schema(edge, overflow)
+                # convert everything first so a rejected key changes nothing
+                records = [(e, factory(dd)) for e, dd in self.e._items()]
+                self.edge_attr_dict_factory = self.e._edge_factory = factory
+                adj = self._adjacency
+                for (u, v), new in records:
+                    own(adj, u)[v] = new
+                    own(adj, v)[u] = new
+            if node is not None:
+                factory = Schema(node, overflow)
+                nindex = self._node_indexes
+                records = [(n, factory(dd)) for n, dd in self._nodedata.items()]
+                # the indexes hold the converted values
+                indexes = build_indexes(nindex, records)
+                self.node_attr_dict_factory = factory
+                self.n._attr_factory = self.e._attr_factory = factory
+                nindex.update(indexes)
+                self._versions.save_all(self._nodedata)
+                self._nodedata.update((n, wrap_attr_dict(n, nindex, dd))
+                                      for n, dd in records)
+            # conversion changes values, so replicas must convert too
+            journal = self._versions.journal
+            if journal is not None:
+                journal.record('set_schema', None, {'edge': edge, 'node': node,
+                                                    'overflow': overflow})
+
+    def node_index(self):
+        """Return the graph's node-to-int mapping with ids range(len(G)).
+
+        index[n] is the id of node n and index.nodes[i] the node with id
+        i. Ids are assigned when nodes are added and reused after
+        removals; a call after removals may renumber some nodes to close
+        the gaps. Treat the result as read-only.
+
+        Dense graphs keep no ids; each call numbers the nodes in order.
+        """
+        if self.dense:
+            index = NodeOrdinals()
+            with self._versions.lock:
+                nodes = list(self._nodedata)
+            index.restore(nodes, range(len(nodes)))
+            return index
+        with self._versions.lock:
+            self._node_ordinals.compact(self._versions.save)
+        return self._node_ordinals
+
+    def snapshot(self):
+        """Return a read-only view of the graph as it is now.
+
+        Taking a snapshot copies nothing; later writes save the entries
+        and copy the inner dicts they change, so the snapshot can be
+        iterated from another thread while the graph keeps changing.
+        The snapshot's first iteration copies the top-level dicts
+        itself, without holding the writer lock.
+        """
+        return GraphSnapshot(self)
+
+    def start_journal(self, maxlen=None):
+        """Start recording changes made through G.n and G.e.
+
+        Returns the MutationJournal; at most `maxlen` undrained entries
+        are kept. Apply drained entries elsewhere with journal.replay.
+        """
+        with self._versions.lock:
+            journal = self._versions.journal = MutationJournal(maxlen)
+        return journal
+
+    def stop_journal(self):
+        """Stop recording changes and return the journal."""
+        with self._versions.lock:
+            journal, self._versions.journal = self._versions.journal, None
+        return journal
+
+    @property
+    def epoch(self):
+        """Counter bumped by every change made through G.n and G.e."""
+        return self._versions.version
+
+    def cached(self, fn, *args, **kwds):
+        """Return fn(G, *args, **kwds), reusing the previous result for
+        the same arguments while the graph is unchanged (see memo.py)."""
+        return self._memo.get(self, fn, args, kwds)
+
+    def cache_info(self):
+        """Return hits, misses, stale recomputations, maxsize, currsize."""
+        return self._memo.info()
+
+    def cache_clear(self, maxsize=None):
+        """Drop all cached results; optionally set a new size cap."""
+        if maxsize is not None:
+            self._memo.maxsize = maxsize
+        self._memo.clear()
+
+    def track_components(self, on=True):
+        """Maintain connected components incrementally (see components.py)
+        so component_of and same_component become lookups."""
+        with self._versions.lock:
+            if not on:
+                self._versions.components = None
+            elif self._versions.components is None:
+                self._versions.components = ComponentIndex(self._adjacency)
+
+    def component_of(self, n):
+        """Return the set of nodes in the connected component of n."""
+        components = self._versions.components
+        if components is not None:
+            with self._versions.lock:
+                return components.component(n)
+        if n not in self._adjacency:
+            raise NetworkXError("The node %s is not in the graph." % (n,))
+        return reachable(self._adjacency, n)
+
+    def same_component(self, u, v):
+        """Return True if u and v are connected by a path."""
+        components = self._versions.components
+        if components is not None:
+            with self._versions.lock:
+                return components.same(u, v)
+        return v in self.component_of(u)
+
     # crazy use of call - get subgraph?
     def __call__(self, nbunch):
         return self.s(nbunch)
@@ -67,11 +258,111 @@ class Graph(object):
     def copy(self, with_data=True):
         if with_data:
             return deepcopy(self)
-        G = self.__class__()
+        G = self.__class__(dense=self.dense)
         G.n.update(self.n)
         G.e.update(self.e)
         return G
 
+    # Pickles and deep copies go through the compact form in compact.py.
+    # Versions, the journal and cached results are not carried over.
+    _managed = ('_nodedata', '_adjacency', '_edge_indexes', '_node_indexes',
+                '_node_ordinals', '_versions', '_memo', 'n', 'e', 'a', 'data')
+
+    def __reduce_ex__(self, protocol):
+        return (__newobj__, (self.__class__,), self._compact_state(protocol))
+
+    def __getstate__(self):
+        return self._compact_state()
+
+    def _compact_state(self, protocol=0):
+        with self._versions.lock:
+            nodes = list(self._nodedata)
+            ordinals = self._node_ordinals
+            if len(ordinals) == len(nodes):
+                rank = ordinals
+                ids = list(map(rank.__getitem__, nodes))
+                free = list(ordinals._free)
+                if ids == list(range(len(ids))):
+                    ids = None
+            else:
+                # nodes written straight into the dicts (nxGraph's G.node
+                # and G.adj are the same dicts) were never given an id
+                rank = dict(zip(nodes, range(len(nodes))))
+                ids = None
+                free = []
+            # each undirected edge once, from the endpoint with smaller id,
+            # in one pass over the neighbors
+            heads, tails, datadicts = [], [], []
+            add_head, add_tail = heads.append, tails.append
+            add_data = datadicts.append
+            if ids is None and nodes == list(range(len(nodes))) and \
+                    set(map(type, nodes)) <= {int}:
+                # int nodes 0..n-1 are their own ids: no lookups
+                for u, nbrs in self._adjacency.items():
+                    for nbr, dd in nbrs.items():
+                        if nbr >= u:
+                            add_head(u)
+                            add_tail(nbr)
+                            add_data(dd)
+            else:
+                for u, nbrs in self._adjacency.items():
+                    r = rank[u]
+                    for nbr, dd in nbrs.items():
+                        s = rank[nbr]
+                        if s >= r:
+                            add_head(r)
+                            add_tail(s)
+                            add_data(dd)
+            state = compact.table_state(nodes, heads, tails,
+                                        list(self._nodedata.values()),
+                                        datadicts, protocol)
+            state['ids'] = ids if ids is None else \
+                compact.pack_column(ids, protocol)
+            state['free'] = free
+            state['interning'] = ordinals.interning
+            state['interned'] = self.e._records is not None
+            state['node_indexes'] = [(attr, index_kind(idx))
+                                     for attr, idx in self._node_indexes.items()]
+            state['edge_indexes'] = [(attr, index_kind(idx))
+                                     for attr, idx in self._edge_indexes.items()]
+            state['cache_size'] = self._memo.maxsize
+            state['data'] = self.data
+            state['attrs'] = compact.extra_attrs(self, self._managed)
+        return state
+
+    def __setstate__(self, state):
+        # instance factories (dense, set_schema) are in attrs
+        self.__dict__.update(state['attrs'])
+        self.__init__()
+        nodes, heads, tails, nodedicts, edgedicts = compact.load_table(
+            state, self.node_attr_dict_factory, self.edge_attr_dict_factory)
+        ids = state['ids']
+        ids = range(len(nodes)) if ids is None else compact.unpack_column(ids)
+        ordinals = self._node_ordinals
+        if not self.dense:
+            ordinals.restore(nodes, ids, state['free'])
+        ordinals.interning = state['interning']
+        nodedata = self._nodedata
+        adj = self._adjacency
+        nbrs_factory = self.adjlist_inner_dict_factory
+        for n, dd in zip(nodes, nodedicts):
+            nodedata[n] = dd
+            adj[n] = nbrs_factory()
+        byid = nodes if self.dense else ordinals.nodes
+        for u, v, dd in zip(map(byid.__getitem__, heads),
+                            map(byid.__getitem__, tails), edgedicts):
+            adj[u][v] = dd
+            adj[v][u] = dd
+        if state['interned']:
+            self.e.intern_attrs()
+        for attr, kind in state['node_indexes']:
+            self.n.add_index(attr, kind)
+        for attr, kind in state['edge_indexes']:
+            self.e.add_index(attr, kind)
+        self.data.update(state['data'])
+        self._memo.maxsize = state['cache_size']
+        self._versions.version = 0
+
     def is_multigraph(self):
         """Return True if graph is a multigraph, False otherwise."""
         return False
@@ -91,8 +382,13 @@ class Graph(object):
         # guaranteed to be an integer, so we perform "real" division.
         return s // 2 if weight is None else s / 2
 
+    @property
+    def dense(self):
+        """True if nodes are stored in list slots (see dense.py)."""
+        return isinstance(self._adjacency, DenseDict)
+
     @classmethod
-    def from_adjacency_matrix(self, matrix):
+    def from_adjacency_matrix(self, matrix, dense=False):
         import numpy as np
         kind_to_python_type={'f':float,
                              'i':int,
@@ -108,7 +404,7 @@ class Graph(object):
             kind_to_python_type['U']=unicode
         n,m=matrix.shape
         if n!=m:
-            raise nx.NetworkXError("Adjacency matrix is not square.",
+            raise NetworkXError("Adjacency matrix is not square.",
                                "nx,ny=%s"%(matrix.shape,))
         dt=matrix.dtype
         try:
@@ -132,14 +428,14 @@ class Graph(object):
         else:  # basic data type
             triples = ((u, v, dict(weight=python_type(matrix[u, v])))
                        for u, v in edges)
-        graph = self((nodes, triples))
+        graph = self((nodes, triples), dense=dense)
         return graph
 
     @classmethod
-    def from_adjacency_list(self, adjlist):
+    def from_adjacency_list(self, adjlist, dense=False):
         nodes = range(len(adjlist))
         edges = [(node,n) for node,nbrlist in enumerate(adjlist) for n in nbrlist]
-        return self((nodes,edges))
+        return self((nodes,edges), dense=dense)
 
 
 if __name__ == '__main__':
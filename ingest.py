@@ -0,0 +1,250 @@
+"""Streaming ingest of node and edge events with asyncio.
+
+    stats = await ingest(G, events, batch_size=1000, max_delay=0.05)
+
+`events` is an async iterable of (op, key, attrs) tuples in the journal
+vocabulary (see journal.py): 'add_node', 'remove_node', 'add_edge' and
+'remove_edge', with key a node or a (u, v) pair and attrs a dict or
+None. Journal entries drained from another graph can be fed as
+entry[1:].
+
+Events are coalesced into batches of at most batch_size, and a partial
+batch is flushed once its first event has waited max_delay seconds.
+Each batch is applied through the bulk G.n.update / G.e.update calls,
+with runs of the same operation grouped, while holding the graph's
+writer lock; snapshots and other writers see either none or all of a
+batch. Batches are applied in a worker thread so the event loop keeps
+reading.
+
+A batch is checked before any of it is applied: an unknown operation,
+an edge key that is not a pair, attrs that are not a dict, or the
+removal of an edge that is not there at that point of the batch
+rejects the whole batch. Removing a missing node is not an error.
+Values that only the graph rejects while storing them (one an index or
+a schema cannot hold) still stop the batch at that event.
+
+At most max_pending batches wait for the writer. When they are all
+taken the reader stops pulling from `events`, which pushes the
+backpressure up to the producer.
+"""
+import asyncio
+from collections import namedtuple
+from itertools import groupby
+from operator import itemgetter
+import threading
+import time
+
+from exception import NetworkXError
+
+__all__ = ['IngestStats', 'Ingest', 'ingest']
+
+IngestStats = namedtuple('IngestStats', ['events', 'batches', 'rate', 'lag',
+                                         'max_lag', 'pending'])
+
+_OPS = frozenset(['add_edge', 'add_node', 'remove_edge', 'remove_node'])
+
+
+class Ingest(object):
+    """Batching writer that feeds an async event stream into a graph.
+
+    stats() returns an IngestStats of the events and batches applied so
+    far, the rate in events per second since run() started, the lag in
+    seconds between the arrival of the oldest event of the last batch
+    and the end of its application, the largest such lag, and the
+    number of batches waiting for the writer.
+    """
+    def __init__(self, graph, batch_size=1000, max_delay=0.05, max_pending=4,
+                 executor=None):
+        if batch_size < 1 or max_pending < 1:
+            raise NetworkXError("batch_size and max_pending must be positive")
+        self.graph = graph
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.executor = executor
+        versions = getattr(graph, '_versions', None)
+        self._lock = versions.lock if versions is not None else threading.RLock()
+        self._queue = None
+        self._start = None
+        self.events = 0
+        self.batches = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def __repr__(self):
+        return '{0.__class__.__name__}({1})'.format(
+            self, ', '.join('%s=%r' % kv for kv in self.stats()._asdict().items()))
+
+    def stats(self):
+        if self._start is None:
+            rate = 0.0
+        else:
+            elapsed = time.monotonic() - self._start
+            rate = self.events / elapsed if elapsed > 0 else 0.0
+        pending = self._queue.qsize() if self._queue is not None else 0
+        return IngestStats(self.events, self.batches, rate, self.lag,
+                           self.max_lag, pending)
+
+    def check(self, events):
+        """Raise NetworkXError if a list of events cannot be applied to
+        the graph as it is now, without changing it."""
+        ops = set(map(itemgetter(0), events))
+        if not ops <= _OPS:
+            op = next(op for op in ops if op not in _OPS)
+            raise NetworkXError("Unknown ingest operation %r" % (op,))
+        for op, key, attrs in events:
+            if attrs is not None and not isinstance(attrs, dict):
+                raise NetworkXError(
+                    "The attr_dict argument must be a dictionary.")
+            if op[-4:] == 'edge':
+                try:
+                    u, v = key
+                except (TypeError, ValueError):
+                    raise NetworkXError("Edge key %r is not a pair" % (key,))
+        if 'remove_edge' not in ops:
+            return
+        # replay the batch on the edges it touches: the event index of
+        # the last add or remove of each edge, and of each node removal
+        G = self.graph
+        directed = G.is_directed() if hasattr(G, 'is_directed') else \
+            G.directed
+        edges = {}
+        gone = {}
+        for i, (op, key, _) in enumerate(events):
+            if op[-4:] == 'node':
+                if op == 'remove_node':
+                    gone[key] = i
+                continue
+            u, v = key
+            k = key if directed else frozenset(key)
+            if op == 'add_edge':
+                edges[k] = i, True
+                continue
+            last = edges.get(k)
+            if last is None:
+                present = u not in gone and v not in gone and u in G.n \
+                    and (u, v) in G.e
+            else:
+                j, present = last
+                present = present and gone.get(u, -1) < j and \
+                    gone.get(v, -1) < j
+            if not present:
+                raise NetworkXError(
+                    "The edge %s-%s is not in the graph" % (u, v))
+            edges[k] = i, False
+
+    def apply(self, events):
+        """Apply a list of events to the graph under its writer lock.
+        The events are checked first (see check)."""
+        G = self.graph
+        with self._lock:
+            self.check(events)
+            for op, run in groupby(events, itemgetter(0)):
+                if op == 'add_edge':
+                    G.e.update((key[0], key[1], attrs or {})
+                               for _, key, attrs in run)
+                elif op == 'add_node':
+                    G.n.update((key, attrs or {}) for _, key, attrs in run)
+                elif op == 'remove_edge':
+                    # ABCgraph edges are a MutableSet of (u, v) keys
+                    discard = getattr(G.e, 'discard', None)
+                    for _, (u, v), _ in run:
+                        if discard is None:
+                            G.e.remove(u, v)
+                        elif not discard((u, v)):
+                            raise NetworkXError(
+                                "The edge %s-%s is not in the graph" % (u, v))
+                elif op == 'remove_node':
+                    G.n.remove_many([key for _, key, _ in run])
+                else:
+                    raise NetworkXError("Unknown ingest operation %r" % (op,))
+
+    async def run(self, events):
+        """Read `events` to the end, applying them in batches. Returns
+        stats(). An error raised by the stream or by a batch stops both
+        the reader and the writer and is raised here, once the batch
+        being applied, if any, is done; batches still queued are
+        dropped."""
+        self._queue = asyncio.Queue(self.max_pending)
+        self._start = time.monotonic()
+        self._flushes = set()
+        self._applying = None
+        tasks = [asyncio.ensure_future(self._read(events)),
+                 asyncio.ensure_future(self._write())]
+        try:
+            done, _ = await asyncio.wait(tasks,
+                                         return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks + list(self._flushes):
+                task.cancel()
+            # cancelling the writer does not stop the worker thread
+            if self._applying is not None:
+                await asyncio.wait([self._applying])
+        return self.stats()
+
+    async def _read(self, events):
+        loop = asyncio.get_event_loop()
+        self._putlock = asyncio.Lock()
+        self._batch = []
+        self._timer = None
+        batch_size = self.batch_size
+        async for event in events:
+            batch = self._batch  # a new list once the timer flushed it
+            if not batch:
+                self._arrived = time.monotonic()
+                self._timer = loop.call_later(self.max_delay, self._expire,
+                                              batch)
+            batch.append(event)
+            if len(batch) >= batch_size:
+                self._timer.cancel()
+                await self._hand_off(self._detach())
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._batch:
+            await self._hand_off(self._detach())
+        await self._hand_off(None)
+
+    def _detach(self):
+        item = self._arrived, self._batch
+        self._batch = []
+        return item
+
+    def _expire(self, batch):
+        # the first event of batch has waited max_delay
+        if batch is self._batch and batch:
+            task = asyncio.ensure_future(self._hand_off(self._detach()))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _hand_off(self, item):
+        # the lock is fair, so batches are queued in the order detached
+        async with self._putlock:
+            await self._queue.put(item)
+
+    async def _write(self):
+        loop = asyncio.get_event_loop()
+        queue = self._queue
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            arrived, batch = item
+            self._applying = loop.run_in_executor(self.executor, self.apply,
+                                                  batch)
+            await asyncio.shield(self._applying)
+            self._applying = None
+            self.events += len(batch)
+            self.batches += 1
+            self.lag = time.monotonic() - arrived
+            if self.lag > self.max_lag:
+                self.max_lag = self.lag
+
+
+async def ingest(graph, events, batch_size=1000, max_delay=0.05,
+                 max_pending=4, executor=None):
+    """Apply the async event stream `events` to graph in batches and
+    return the final IngestStats (see Ingest)."""
+    return await Ingest(graph, batch_size, max_delay, max_pending,
+                        executor).run(events)
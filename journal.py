@@ -0,0 +1,105 @@
+"""Opt-in change journal for Graph mutations.
+
+J = G.start_journal(maxlen=100000) records every change made through
+G.n and G.e of a graph.Graph as a JournalEntry(seq, op, key, attrs):
+
+    ('add_node', n, attrs)        node added or its attributes updated
+    ('remove_node', n, None)      node and its edges removed
+    ('add_edge', (u, v), attrs)   edge added or its attributes updated
+    ('replace_edge', (u, v), attrs)  edge attributes replaced by attrs
+    ('remove_edge', (u, v), None)
+    ('clear', None, None)         all nodes and edges removed
+    ('clear_edges', None, None)   all edges removed
+    ('set_schema', None, attrs)   G.set_schema(**attrs) converted values
+
+attrs is the attribute delta passed to the call, not the full datadict,
+except for replace_edge: writes through the G.e[(u, v)] proxy of
+intern_attrs (see flyweight.py) record the edge's new attribute dict.
+Writes made directly into a datadict are not journaled, nor are storage
+changes that keep every value (intern_keys, intern_attrs, add_index).
+
+ABCgraph and ABCmultigraph graphs have no journal: they keep no
+Versions object or writer lock for it to hang off.
+
+Consumers drain() batches and ship them; replay(entries, H) applies them
+to another graph. With maxlen set the oldest undrained entries are
+dropped once the journal is full; replay detects the resulting gap in
+sequence numbers so a replica knows to resynchronize.
+"""
+from collections import deque, namedtuple
+
+from exception import NetworkXError
+
+__all__ = ['JournalEntry', 'MutationJournal', 'replay']
+
+JournalEntry = namedtuple('JournalEntry', ['seq', 'op', 'key', 'attrs'])
+
+
+class MutationJournal(object):
+    __slots__ = ('_entries', 'seq', 'dropped')
+    def __init__(self, maxlen=None):
+        self._entries = deque(maxlen=maxlen)
+        self.seq = 0        # sequence number of the last recorded entry
+        self.dropped = 0    # entries lost to maxlen before being drained
+    def __repr__(self):
+        return '{0.__class__.__name__}(seq={0.seq}, pending={1}, ' \
+               'dropped={0.dropped})'.format(self, len(self))
+    def __len__(self):
+        return len(self._entries)
+    def __iter__(self):
+        return iter(list(self._entries))
+    @property
+    def maxlen(self):
+        return self._entries.maxlen
+    def record(self, op, key=None, attrs=None):
+        entries = self._entries
+        if entries.maxlen is not None and len(entries) == entries.maxlen:
+            self.dropped += 1
+        self.seq += 1
+        entries.append(JournalEntry(self.seq, op, key,
+                                    dict(attrs) if attrs else None))
+    def drain(self, limit=None):
+        """Remove and return up to `limit` of the oldest entries (all
+        entries if limit is None) as a list."""
+        entries = self._entries
+        n = len(entries) if limit is None else min(limit, len(entries))
+        popleft = entries.popleft
+        return [popleft() for _ in range(n)]
+
+
+def replay(entries, graph, after=None):
+    """Apply journal entries to `graph` and return the last seq applied.
+
+    Pass the value returned by the previous call as `after` to skip
+    entries already applied and to check that none are missing;
+    NetworkXError is raised on a gap.
+    """
+    last = after
+    for seq, op, key, attrs in entries:
+        if last is not None:
+            if seq <= last:
+                continue
+            if seq != last + 1:
+                raise NetworkXError("Journal entries %d to %d are missing; "
+                                    "resynchronize the graph" % (last + 1, seq - 1))
+        if op == 'add_edge':
+            graph.e.add(key[0], key[1], dict(attrs or ()))
+        elif op == 'add_node':
+            graph.n.add(key, dict(attrs or ()))
+        elif op == 'replace_edge':
+            graph.e.remove(key[0], key[1])
+            graph.e.add(key[0], key[1], dict(attrs or ()))
+        elif op == 'remove_edge':
+            graph.e.remove(key[0], key[1])
+        elif op == 'remove_node':
+            graph.n.discard(key)
+        elif op == 'clear':
+            graph.n.clear()
+        elif op == 'clear_edges':
+            graph.e.clear()
+        elif op == 'set_schema':
+            graph.set_schema(**attrs)
+        else:
+            raise NetworkXError("Unknown journal operation %r" % (op,))
+        last = seq
+    return last
@@ -0,0 +1,126 @@
+"""Sparse exports and scipy LinearOperators of a graph's adjacency.
+
+G.a.csr(weight) exports an adjacency view as a scipy.sparse csr_array:
+
+- the rows and columns follow G.a.csr().nodes (graph.Graph uses its
+  node index, see Graph.node_index)
+- the entries are the `weight` attribute of each edge, 1 when an edge
+  lacks it or when weight is None
+- multigraphs reduce the parallel edges of a pair with
+  multigraph_weight (sum by default)
+- G.su and G.pr of directed graphs export the out- and in-edges, and
+  G.a exports both
+
+graph.Graph keeps the export in G.cached, so it is reused until the
+graph changes. Other graphs export on each call.
+
+    G.a.as_linear_operator(weight)              A
+    G.a.laplacian_operator(weight)              L = D - A
+    G.a.normalized_laplacian_operator(weight)   D^-1/2 L D^-1/2
+
+These are scipy.sparse.linalg.LinearOperators over that export, with D
+the row sums (out-degrees). Their matvec never forms L, so eigsh, cg or
+lobpcg run on graphs whose dense matrix would not fit in memory.
+Isolated nodes get zero rows in the normalized Laplacian.
+
+Requires numpy and scipy, which are imported when these are called.
+"""
+from collections import namedtuple
+from operator import methodcaller
+
+__all__ = ['CSRAdjacency', 'LinearOperators']
+
+CSRAdjacency = namedtuple('CSRAdjacency', ['nodes', 'matrix', 'degrees'])
+
+
+def _export(view, weight, multigraph_weight):
+    import numpy as np
+    from scipy.sparse import csr_array
+    nodes, index, parts, multigraph = view._csr_source()
+    if nodes == list(range(len(nodes))) and set(map(type, nodes)) <= {int}:
+        index = None  # the nodes are their own rows
+    if weight is None:
+        getw = lambda dd: 1
+    else:
+        getw = methodcaller('get', weight, 1)
+    indptr = [0]
+    indices = []
+    data = []
+    for n in nodes:
+        for i, part in enumerate(parts):
+            nbrs = part[n]
+            keys, values = nbrs.keys(), nbrs.values()
+            if i and n in nbrs:
+                # a self-loop is stored in each part but counted once
+                keys = [nbr for nbr in nbrs if nbr != n]
+                values = [nbrs[nbr] for nbr in keys]
+            if index is not None:
+                keys = map(index.__getitem__, keys)
+            indices.extend(keys)
+            if multigraph:
+                data.extend(multigraph_weight([getw(dd) for dd in kd.values()])
+                            for kd in values)
+            else:
+                data.extend(map(getw, values))
+        indptr.append(len(indices))
+    size = len(nodes)
+    A = csr_array((np.array(data, dtype=float), np.array(indices, dtype=np.intp),
+                   np.array(indptr, dtype=np.intp)), shape=(size, size))
+    A.sum_duplicates()
+    return CSRAdjacency(nodes, A, np.asarray(A.sum(axis=1)).ravel())
+
+def _scale(d, x):
+    # diag(d) @ x for x of shape (n,) or (n, k)
+    return d * x if x.ndim == 1 else d[:, None] * x
+
+def _laplacian(A, d):
+    from scipy.sparse.linalg import LinearOperator
+    AT = A.T
+    return LinearOperator(A.shape, dtype=A.dtype,
+                          matvec=lambda x: _scale(d, x) - A @ x,
+                          matmat=lambda x: _scale(d, x) - A @ x,
+                          rmatvec=lambda x: _scale(d, x) - AT @ x,
+                          rmatmat=lambda x: _scale(d, x) - AT @ x)
+
+def _normalized_laplacian(A, d):
+    import numpy as np
+    from scipy.sparse.linalg import LinearOperator
+    AT = A.T
+    s = np.zeros_like(d)
+    np.divide(1.0, np.sqrt(d), out=s, where=d > 0)
+    # s * (d * (s * x)) is x on nodes with edges and 0 on isolated ones
+    keep = (d > 0).astype(d.dtype)
+    def matvec(x):
+        return _scale(keep, x) - _scale(s, A @ _scale(s, x))
+    def rmatvec(x):
+        return _scale(keep, x) - _scale(s, AT @ _scale(s, x))
+    return LinearOperator(A.shape, dtype=A.dtype, matvec=matvec,
+                          matmat=matvec, rmatvec=rmatvec, rmatmat=rmatvec)
+
+
+class LinearOperators(object):
+    # Mixin for adjacency views. Subclasses give _csr_source(), which
+    # returns (nodes, index, parts, multigraph): the row order, node ->
+    # row, the node -> neighbors mappings whose entries sum to the view
+    # and whether their values are edge key dicts. _memo is the graph's
+    # EpochCache, or None to export on each call.
+    __slots__ = ()
+    _memo = None
+    def csr(self, weight='weight', multigraph_weight=sum):
+        """Return a CSRAdjacency(nodes, matrix, degrees) of this view."""
+        if self._memo is None:
+            return _export(self, weight, multigraph_weight)
+        return self._memo.get(self, _export, (weight, multigraph_weight), {})
+    def as_linear_operator(self, weight='weight', multigraph_weight=sum):
+        """Return the adjacency matrix as a LinearOperator."""
+        from scipy.sparse.linalg import aslinearoperator
+        return aslinearoperator(self.csr(weight, multigraph_weight).matrix)
+    def laplacian_operator(self, weight='weight', multigraph_weight=sum):
+        """Return the Laplacian D - A as a LinearOperator."""
+        nodes, A, d = self.csr(weight, multigraph_weight)
+        return _laplacian(A, d)
+    def normalized_laplacian_operator(self, weight='weight',
+                                      multigraph_weight=sum):
+        """Return the normalized Laplacian as a LinearOperator."""
+        nodes, A, d = self.csr(weight, multigraph_weight)
+        return _normalized_laplacian(A, d)
@@ -0,0 +1,66 @@
+"""Memoization of values derived from a graph, keyed on its version.
+
+Every change made through G.n and G.e bumps the graph's version
+(G.epoch); calls that change nothing, such as discarding a missing node
+or a remove that raises, leave it as it is. G.cached(fn, *args) returns fn(G, *args), reusing the result
+of an earlier call with the same arguments as long as the graph has not
+changed since. At most maxsize results are kept, least recently used
+first out.
+
+Writes made directly into a datadict do not bump the version; call
+G.cache_clear() after such writes.
+"""
+from collections import OrderedDict, namedtuple
+import threading
+
+__all__ = ['CacheInfo', 'EpochCache']
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'stale',
+                                     'maxsize', 'currsize'])
+
+
+class EpochCache(object):
+    def __init__(self, versions, maxsize=32):
+        self._versions = versions
+        self._results = OrderedDict()  # key -> (version, value)
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.stale = 0
+    def __reduce__(self):
+        # copies of a graph start with an empty cache
+        return (self.__class__, (self._versions, self.maxsize))
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, graph, fn, args, kwds):
+        key = (fn, args, tuple(sorted(kwds.items()))) if kwds else (fn, args)
+        version = self._versions.version
+        results = self._results
+        with self._lock:
+            try:
+                cached_version, value = results[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                if cached_version == version:
+                    results.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self.stale += 1
+        # computed outside the lock; if the graph changes meanwhile the
+        # result is stored under the older version and recomputed later
+        value = fn(graph, *args, **kwds)
+        with self._lock:
+            results[key] = (version, value)
+            results.move_to_end(key)
+            while len(results) > max(self.maxsize, 0):
+                results.popitem(last=False)
+        return value
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.stale,
+                         self.maxsize, len(self._results))
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = self.stale = 0
@@ -1,5 +1,8 @@
 from collections import MappingView, Set
-from networkx.exception import NetworkXError
+from exception import NetworkXError
+
+from attrindex import (make_index, parse_conditions, select, check_item,
+                       index_item, unindex_item)
 
 # =================
 #  EdgeView Classes
@@ -73,12 +76,17 @@ class Edges(Set):
         Behavior of methods is affected by the directed property in
         __contains__, __getitem__, add, update, remove, discard
     """
-    __slots__ = ('_node', '_succ', '_pred', '_directed')
+    __slots__ = ('_node', '_succ', '_pred', '_directed', '_eindex')
+    # storage factories; override in a subclass to use other mappings
+    node_attr_dict_factory = dict
+    adjlist_inner_dict_factory = dict
+    edge_attr_dict_factory = dict
     def __init__(self, node, succ, pred, directed):
         self._node = node
         self._succ = succ
         self._pred = pred
         self._directed = directed
+        self._eindex = {}
 
     @property
     def directed(self):
@@ -145,34 +153,36 @@ class Edges(Set):
             except AttributeError:
                 raise NetworkXError(
                     "The attr_dict argument must be a dictionary.")
+        if self._eindex:
+            check_item(self._eindex, attr_dict)
         # add nodes
         u_new = u not in self._succ
         v_new = v not in self._succ
         if u_new:
-            self._succ[u] = {} # fixme factory
-            self._pred[u] = {} # fixme factory
-            self._node[u] = {}
+            self._succ[u] = self.adjlist_inner_dict_factory()
+            self._pred[u] = self.adjlist_inner_dict_factory()
+            self._node[u] = self.node_attr_dict_factory()
         if v_new:
-            self._succ[v] = {} # fixme factory
-            self._pred[v] = {} # fixme factory
-            self._node[v] = {}
+            self._succ[v] = self.adjlist_inner_dict_factory()
+            self._pred[v] = self.adjlist_inner_dict_factory()
+            self._node[v] = self.node_attr_dict_factory()
         # find the edge
         if not (u_new or v_new):
             if v in self._succ[u]:
-                datadict = self._succ[u][v]
-                datadict.update(attr_dict)
+                self._update_data((u, v), self._succ[u][v], attr_dict)
                 return
             # if not directed check other direction
             if (not self.directed) and v in self._pred[u]:
-                datadict = self._pred[u][v]
-                datadict.update(attr_dict)
+                self._update_data((v, u), self._pred[u][v], attr_dict)
                 return
             # else new edge-- drop out of if
         # add new edge
-        datadict = {}
+        datadict = self.edge_attr_dict_factory()
         datadict.update(attr_dict)
         self._succ[u][v] = datadict
         self._pred[v][u] = datadict
+        if self._eindex:
+            index_item(self._eindex, (u, v), datadict)
 
     def update(self, ebunch, attr_dict=None, **attr):
         # set up attribute dict
@@ -184,6 +194,8 @@ class Edges(Set):
             except AttributeError:
                 raise NetworkXError(
                     "The attr_dict argument must be a dictionary.")
+        if self._eindex:
+            check_item(self._eindex, attr_dict)
         # process ebunch
         for e in ebunch:
             ne = len(e)
@@ -195,45 +207,51 @@ class Edges(Set):
             else:
                 msg = "Edge tuple %s must be a 2-tuple or 3-tuple." % (e,)
                 raise NetworkXError(msg)
+            if self._eindex and dd:
+                check_item(self._eindex, dd)
             # add nodes
             u_new = u not in self._succ
             v_new = v not in self._succ
             if u_new:
-                self._succ[u] = {} # fixme factory
-                self._pred[u] = {} # fixme factory
-                self._node[u] = {}
+                self._succ[u] = self.adjlist_inner_dict_factory()
+                self._pred[u] = self.adjlist_inner_dict_factory()
+                self._node[u] = self.node_attr_dict_factory()
             if v_new:
-                self._succ[v] = {} # fixme factory
-                self._pred[v] = {} # fixme factory
-                self._node[v] = {}
+                self._succ[v] = self.adjlist_inner_dict_factory()
+                self._pred[v] = self.adjlist_inner_dict_factory()
+                self._node[v] = self.node_attr_dict_factory()
             # find the edge
             if not (u_new or v_new):
                 if v in self._succ[u]:
-                    datadict = self._succ[u][v]
-                    datadict.update(attr_dict)
-                    datadict.update(dd)
+                    self._update_data((u, v), self._succ[u][v],
+                                      attr_dict, dd)
                     continue
                 # if not directed check other direction
                 if (not self.directed) and v in self._pred[u]:
-                    datadict = self._pred[u][v]
-                    datadict.update(attr_dict)
-                    datadict.update(dd)
+                    self._update_data((v, u), self._pred[u][v],
+                                      attr_dict, dd)
                     continue
                 # else new edge-- drop out of if
             # add new edge
-            datadict = {}
+            datadict = self.edge_attr_dict_factory()
             datadict.update(attr_dict)
             datadict.update(dd)
             self._succ[u][v] = datadict
             self._pred[v][u] = datadict
+            if self._eindex:
+                index_item(self._eindex, (u, v), datadict)
     def discard(self, u, v):
         try:
+            if self._eindex:
+                unindex_item(self._eindex, (u, v), self._succ[u][v])
             del self._succ[u][v]
             del self._pred[v][u]
         except KeyError:
             pass
     def remove(self, u, v):
         try:
+            if self._eindex:
+                unindex_item(self._eindex, (u, v), self._succ[u][v])
             del self._succ[u][v]
         except KeyError:
             raise NetworkXError("The edge %s-%s is not in the graph" % (u, v))
@@ -245,3 +263,30 @@ class Edges(Set):
         for n in self._succ:
             self._succ[n].clear()
             self._pred[n].clear()
+        for idx in self._eindex.values():
+            idx.clear()
+    def _update_data(self, ekey, datadict, *updates):
+        # ekey is the stored orientation of the edge
+        if self._eindex:
+            unindex_item(self._eindex, ekey, datadict)
+        for dd in updates:
+            datadict.update(dd)
+        if self._eindex:
+            index_item(self._eindex, ekey, datadict)
+
+    # Attribute indexes
+    def add_index(self, attr, kind='hash'):
+        """Maintain an index on edge attribute `attr` for where() queries.
+
+        kind is 'hash' (equality) or 'sorted' (equality and ranges).
+        """
+        idx = make_index(kind)
+        idx.build((e, dd[attr]) for e, dd in self._items() if attr in dd)
+        self._eindex[attr] = idx
+    def drop_index(self, attr):
+        del self._eindex[attr]
+    def where(self, **conditions):
+        """Return a list of edges whose data satisfies all conditions."""
+        succ = self._succ
+        return list(select(self._eindex, parse_conditions(conditions),
+                           lambda e: succ[e[0]][e[1]], self._items))
@@ -1,7 +1,196 @@
-from collections import KeysView,ValuesView,ItemsView,MutableMapping
-from networkx.exception import NetworkXError
+from collections import KeysView,ValuesView,ItemsView,MutableMapping,Set
+from exception import NetworkXError
 
-class NodeKeys(KeysView):
+from attrindex import (make_index, parse_conditions, select, new_attrs,
+                       index_item, unindex_item, wrap_attr_dict)
+from versions import Versions, writer
+
+
+def _as_container(obj):
+    # set algebra needs cheap membership tests on both operands.
+    # Sets, mappings and views already have them; only plain
+    # iterables (lists, generators) get materialized.
+    if hasattr(obj, '__contains__') and hasattr(obj, '__len__') \
+            and not isinstance(obj, (list, tuple, str)):
+        return obj
+    return set(obj)
+
+def _size_hint(obj):
+    # upper bound on len(obj) that never iterates a lazy expression
+    if isinstance(obj, _BinaryNodeSetExpr):
+        return obj._size_hint()
+    return len(obj)
+
+# Lazy set expressions
+# ====================
+# Set | contains, iter, len -> eq/ne/le/lt/gt/ge, and/or/sub/xor, isdisjoint
+#
+# Each expression holds references to its operands (the live node dict,
+# other expressions, sets, ...) and computes membership on demand.
+# Expressions compose without copying:  (G.n.keys() & a) - b  is O(1) to
+# build; iterating it costs O(min(len(G.n), len(a))).
+class NodeSetExpr(Set):
+    __slots__ = ()
+    def __repr__(self):
+        return '{}'.format(list(self))
+    def __and__(self, other):
+        return NodeIntersection(self, _as_container(other))
+    def __rand__(self, other):
+        return NodeIntersection(_as_container(other), self)
+    def __or__(self, other):
+        return NodeUnion(self, _as_container(other))
+    def __ror__(self, other):
+        return NodeUnion(_as_container(other), self)
+    def __sub__(self, other):
+        return NodeDifference(self, _as_container(other))
+    def __rsub__(self, other):
+        return NodeDifference(_as_container(other), self)
+    def __xor__(self, other):
+        return NodeSymmetricDifference(self, _as_container(other))
+    def __rxor__(self, other):
+        return NodeSymmetricDifference(_as_container(other), self)
+
+class _BinaryNodeSetExpr(NodeSetExpr):
+    __slots__ = ('_left', '_right')
+    def __init__(self, left, right):
+        self._left = left
+        self._right = right
+    def __len__(self):
+        return sum(1 for n in self)
+    def _size_hint(self):
+        return _size_hint(self._left) + _size_hint(self._right)
+
+class NodeIntersection(_BinaryNodeSetExpr):
+    __slots__ = ('_left', '_right')
+    def _size_hint(self):
+        return min(_size_hint(self._left), _size_hint(self._right))
+    def __contains__(self, n):
+        return n in self._left and n in self._right
+    def __iter__(self):
+        small, big = self._left, self._right
+        if _size_hint(big) < _size_hint(small):
+            small, big = big, small
+        for n in small:
+            if n in big:
+                yield n
+
+class NodeUnion(_BinaryNodeSetExpr):
+    __slots__ = ('_left', '_right')
+    def __contains__(self, n):
+        return n in self._left or n in self._right
+    def __iter__(self):
+        left = self._left
+        for n in left:
+            yield n
+        for n in self._right:
+            if n not in left:
+                yield n
+
+class NodeDifference(_BinaryNodeSetExpr):
+    __slots__ = ('_left', '_right')
+    def _size_hint(self):
+        return _size_hint(self._left)
+    def __contains__(self, n):
+        return n in self._left and n not in self._right
+    def __iter__(self):
+        right = self._right
+        for n in self._left:
+            if n not in right:
+                yield n
+
+class NodeSymmetricDifference(_BinaryNodeSetExpr):
+    __slots__ = ('_left', '_right')
+    def __contains__(self, n):
+        return (n in self._left) != (n in self._right)
+    def __iter__(self):
+        left, right = self._left, self._right
+        for n in left:
+            if n not in right:
+                yield n
+        for n in right:
+            if n not in left:
+                yield n
+
+
+_FREE = object()  # marks a released slot in NodeOrdinals.nodes
+
+class NodeOrdinals(dict):
+    """Map each node to a distinct int, assigned when the node is added.
+
+    Undirected edges are stored under both endpoints; comparing ordinals
+    picks one of the two entries without keeping a `seen` set.
+
+    The ints double as a stable node index for arrays and matrices:
+    ``nodes[i]`` is the node with id i. Ids of removed nodes are reused
+    by later additions; compact() moves the highest ids into the
+    remaining holes so that the ids are exactly range(len(self)).
+
+    ``nodes`` also serves as an intern table: with ``interning`` on,
+    Edges stores the key object already held for a node instead of the
+    equal object it was passed (see Graph.intern_keys).
+    """
+    def __init__(self):
+        dict.__init__(self)
+        self.nodes = []    # id -> node, _FREE for released ids
+        self._free = []    # released ids
+        self.interning = False
+    def intern(self, n):
+        """Return the stored key object equal to n (n if not a node)."""
+        try:
+            return self.nodes[self[n]]
+        except KeyError:
+            return n
+    def assign(self, n):
+        if self._free:
+            i = self._free.pop()
+            self.nodes[i] = n
+        else:
+            i = len(self.nodes)
+            self.nodes.append(n)
+        self[n] = i
+    def release(self, n):
+        i = self.pop(n)
+        self.nodes[i] = _FREE
+        self._free.append(i)
+    def clear(self):
+        dict.clear(self)
+        del self.nodes[:]
+        del self._free[:]
+    def restore(self, nodes, ids, free=()):
+        """Give each node in `nodes` the id at the same position in
+        `ids`; the ids in `free` are the released ones."""
+        self.clear()
+        table = self.nodes
+        table.extend([_FREE] * (len(ids) + len(free)))
+        for n, i in zip(nodes, ids):
+            table[i] = n
+        self.update(zip(nodes, ids))
+        self._free.extend(free)
+    def compact(self, save=None):
+        """Make the ids dense; return the number of nodes renumbered.
+        save(self, n) is called before node n gets its new id."""
+        nodes = self.nodes
+        holes = sorted(self._free)
+        del self._free[:]
+        moved = 0
+        for hole in holes:
+            while nodes and nodes[-1] is _FREE:
+                nodes.pop()
+            if hole >= len(nodes):
+                break
+            n = nodes.pop()
+            nodes[hole] = n
+            if save is not None:
+                save(self, n)
+            self[n] = hole
+            moved += 1
+        while nodes and nodes[-1] is _FREE:
+            nodes.pop()
+        return moved
+
+
+class NodeKeys(NodeSetExpr, KeysView):
+    __slots__ = ()
     def __repr__(self):
         # If we remove this def, the result is:
         # return '{0.__class__.__name__}({1})'.format(self,self._mapping)
@@ -16,10 +205,24 @@ class NodeItems(ItemsView):
         return '{}'.format(list(self._mapping.items()))
 
 class Nodes(MutableMapping):
-    __slots__ = ('_nodes','_adj')
-    def __init__(self, nodes, adj=None):
+    __slots__ = ('_nodes','_adj','_eindex','_nindex','_ordinals','_versions',
+                 '_nbrs_factory','_attr_factory')
+    def __init__(self, nodes, adj=None, graph=None):
         self._nodes = nodes
         self._adj = adj
+        # indexes, ordinals and versions are shared with the graph's Edges
+        if graph is None:
+            self._eindex, self._nindex = {}, {}
+            self._ordinals = None
+            self._versions = Versions()
+            self._nbrs_factory = self._attr_factory = dict
+        else:
+            self._eindex = graph._edge_indexes
+            self._nindex = graph._node_indexes
+            self._ordinals = graph._node_ordinals
+            self._versions = graph._versions
+            self._nbrs_factory = graph.adjlist_inner_dict_factory
+            self._attr_factory = graph.node_attr_dict_factory
     # both set and dict methods
     def __iter__(self):
         for n in self._nodes:
@@ -30,28 +233,50 @@ class Nodes(MutableMapping):
         return '{0.__class__.__name__}({1})'.format(self,self._nodes)
     def __len__(self):
         return len(self._nodes)
+    @writer
     def clear(self):
+        if not self._nodes:
+            self._versions.noop = True
+            return
+        save_all = self._versions.save_all
+        save_all(self._nodes)
+        save_all(self._adj)
         self._nodes.clear()
         self._adj.clear()
+        for idx in self._eindex.values():
+            idx.clear()
+        for idx in self._nindex.values():
+            idx.clear()
+        if self._ordinals is not None:
+            save_all(self._ordinals)
+            self._ordinals.clear()
+        if self._versions.components is not None:
+            self._versions.components.reset()
+        if self._versions.journal is not None:
+            self._versions.journal.record('clear')
     # set methods
+    # These return regular sets but never copy the node dict: they run
+    # on its live keys and iterate the smaller operand where possible.
+    # Use G.n.keys() & other for a lazy (uncomputed) expression instead.
     def __and__(self, other):
-        return set(self._nodes) & set(other)
+        return set(NodeIntersection(self._nodes, _as_container(other)))
     def __or__(self, other):
-        return set(self._nodes) | set(other)
+        return set(NodeUnion(self._nodes, _as_container(other)))
     def __xor__(self, other):
-        return set(self._nodes) ^ set(other)
+        return set(NodeSymmetricDifference(self._nodes, _as_container(other)))
     def __sub__(self, other):
-        return set(self._nodes) - set(other)
+        return set(NodeDifference(self._nodes, _as_container(other)))
     # reverse set methods (so set | me works same as me | set)
     def __rand__(self, other):
-        return set(self._nodes) & set(other)
+        return set(NodeIntersection(_as_container(other), self._nodes))
     def __ror__(self, other):
-        return set(self._nodes) | set(other)
+        return set(NodeUnion(_as_container(other), self._nodes))
     def __rxor__(self, other):
-        return set(self._nodes) ^ set(other)
+        return set(NodeSymmetricDifference(_as_container(other), self._nodes))
     def __rsub__(self, other):
-        return set(self._nodes) - set(other)
+        return set(NodeDifference(_as_container(other), self._nodes))
     # inplace mass adds and removes
+    @writer
     def update(self, nodes, **attr):
         for n in nodes:
             try:
@@ -61,21 +286,27 @@ class Nodes(MutableMapping):
                 self.add(nn, **newdict)
             except TypeError:
                 self.add(n, attr_dict=None, **attr)
+        # the add calls counted their own changes
+        self._versions.noop = True
         return self
+    @writer
     def intersection_update(self, nodes):
-        for n in self - set(nodes):
+        keep = _as_container(nodes)
+        for n in [n for n in self._nodes if n not in keep]:
             self.discard(n)
+        self._versions.noop = True
         return self
+    @writer
     def symmetric_difference_update(self, nodes):
         for n in nodes:
             if n in self:
                 self.discard(n)
             else:
                 self.add(n)
+        self._versions.noop = True
         return self
     def difference_update(self, nodes):
-        for n in nodes:
-            self.discard(n)
+        self.remove_many(nodes)
         return self
     __ior__ = update # |=
     __iand__ = intersection_update # &=
@@ -83,28 +314,114 @@ class Nodes(MutableMapping):
     __ixor__ = symmetric_difference_update # ^=
 
 
+    def _unindex_edges(self, n):
+        eindex = self._eindex
+        for u, dd in self._adj[n].items():
+            unindex_item(eindex, (n, u), dd, (u, n))
+
+    def _unindex_node(self, n, nodedata):
+        if self._ordinals is not None:
+            self._versions.save(self._ordinals, n)
+            self._ordinals.release(n)
+        if self._nindex:
+            unindex_item(self._nindex, n, nodedata)
+        if self._eindex:
+            self._unindex_edges(n)
+
+    @writer
     def discard(self, n):
         adj = self._adj
+        own = self._versions.own
         try:
             # list handles self-loops (allow mutation later)
             nbrs = list(adj[n].keys())
-            del self._nodes[n]
+            self._versions.save(self._nodes, n)
+            nodedata = self._nodes.pop(n)
         except KeyError:  # silently ignore if n not in self
+            self._versions.noop = True
             return
+        self._unindex_node(n, nodedata)
         for u in nbrs:
-            del adj[u][n]   # remove all edges n-u in graph
-        del adj[n]          # now remove node
+            del own(adj, u)[n]   # remove all edges n-u in graph
+        self._versions.save(adj, n)
+        del adj[n]               # now remove node
+        if self._versions.components is not None:
+            self._versions.components.remove_node(n, len(nbrs) > (n in nbrs))
+        if self._versions.journal is not None:
+            self._versions.journal.record('remove_node', n)
+    @writer
+    def remove_many(self, nbunch):
+        """Remove all nodes in nbunch, silently ignoring unknown nodes.
+
+        Neighbor-dict deletions are grouped per surviving neighbor and
+        the adjacency dicts of removed nodes are dropped whole, so
+        neighbors shared by many removed nodes are looked up only once.
+        Returns the number of edges removed.
+        """
+        nodes = self._nodes
+        adj = self._adj
+        doomed = set(n for n in nbunch if n in nodes)
+        if not doomed:
+            self._versions.noop = True
+            return 0
+        if self._eindex or self._nindex or self._ordinals is not None:
+            for n in doomed:
+                self._unindex_node(n, nodes[n])
+        survivors = {}
+        nedges = 0
+        ninternal = 0
+        for n in doomed:
+            for nbr in adj[n]:
+                if nbr in doomed:
+                    # edges among removed nodes are seen from both ends
+                    # (self-loops from one), so count halves
+                    ninternal += 2 if nbr == n else 1
+                else:
+                    try:
+                        survivors[nbr].append(n)
+                    except KeyError:
+                        survivors[nbr] = [n]
+                    nedges += 1
+        own = self._versions.own
+        for nbr, gone in survivors.items():
+            nbrs = own(adj, nbr)
+            for n in gone:
+                del nbrs[n]
+        components = self._versions.components
+        save = self._versions.save
+        for n in doomed:
+            if components is not None:
+                components.remove_node(n, len(adj[n]) > (n in adj[n]))
+            save(adj, n)
+            save(nodes, n)
+            del adj[n]
+            del nodes[n]
+        journal = self._versions.journal
+        if journal is not None:
+            for n in doomed:
+                journal.record('remove_node', n)
+        return nedges + ninternal // 2
+    @writer
     def remove(self, n):
         adj = self._adj
+        own = self._versions.own
         try:
             # keys handles self-loops (allow mutation later)
             nbrs = list(adj[n].keys())
-            del self._nodes[n]
+            self._versions.save(self._nodes, n)
+            nodedata = self._nodes.pop(n)
         except KeyError:  # NetworkXError if n not in self
+            self._versions.noop = True
             raise NetworkXError("The node %s is not in the graph." % (n,))
+        self._unindex_node(n, nodedata)
         for u in nbrs:
-            del adj[u][n]   # remove all edges n-u in graph
-        del adj[n]          # now remove node
+            del own(adj, u)[n]   # remove all edges n-u in graph
+        self._versions.save(adj, n)
+        del adj[n]               # now remove node
+        if self._versions.components is not None:
+            self._versions.components.remove_node(n, len(nbrs) > (n in nbrs))
+        if self._versions.journal is not None:
+            self._versions.journal.record('remove_node', n)
 
 
     # dictionary methods
@@ -114,7 +431,7 @@ class Nodes(MutableMapping):
 #        self.add(key, value)  # probably a bad idea
         raise NetworkXError('Use the add() method')
     def __getitem__(self, key):
-        return self._nodes[key]
+        return self._versions.own_attrs(self._nodes, key)
     def keys(self):
 #        return self._nodes.keys()
         return NodeKeys(self._nodes)
@@ -126,6 +443,7 @@ class Nodes(MutableMapping):
         return NodeData(self._nodes)
 
 
+    @writer
     def add(self, n, attr_dict=None, **attr):
         if attr_dict is None:
             attr_dict = attr
@@ -133,13 +451,40 @@ class Nodes(MutableMapping):
             try:
                 attr_dict.update(attr)
             except AttributeError:
+                self._versions.noop = True
                 raise NetworkXError(
                     "The attr_dict argument must be a dictionary.")
-        if n not in self._nodes:
-            self._adj[n] = {} # FIXME factory
-            self._nodes[n] = attr_dict
-        else:  # update attr even if node already exists
-            self._nodes[n].update(attr_dict)
+        nindex = self._nindex
+        new = n not in self._nodes
+        if new or (attr_dict and (nindex or self._attr_factory is not dict)):
+            # schema records and indexes reject bad values here
+            try:
+                newdict = new_attrs(self._attr_factory, attr_dict, nindex)
+            except NetworkXError:
+                self._versions.noop = True
+                raise
+        if new:
+            save = self._versions.save
+            save(self._adj, n)
+            save(self._nodes, n)
+            self._adj[n] = self._nbrs_factory()
+            if self._ordinals is not None:
+                save(self._ordinals, n)
+                self._ordinals.assign(n)
+            if nindex:
+                # wrapped dicts index their own writes from now on
+                newdict = wrap_attr_dict(n, nindex, newdict)
+                index_item(nindex, n, newdict)
+            self._nodes[n] = newdict
+            if self._versions.components is not None:
+                self._versions.components.add_node(n)
+        elif attr_dict:  # update attr even if node already exists
+            self._versions.own(self._nodes, n).update(attr_dict)
+        else:  # existing node, no attributes
+            self._versions.noop = True
+            return
+        if self._versions.journal is not None:
+            self._versions.journal.record('add_node', n, attr_dict)
 
 
     # extra methods: neither set or dict
@@ -162,3 +507,35 @@ class Nodes(MutableMapping):
 
     def selfloops(self):
         return (n for n, nbrs in self._adj.items() if n in nbrs)
+
+    # Attribute indexes
+    @writer
+    def add_index(self, attr, kind='hash'):
+        """Maintain an index on node attribute `attr` for where() queries.
+
+        kind is 'hash' (equality) or 'sorted' (equality and ranges).
+        Node datadicts are wrapped so that direct writes like
+        G.n[n][attr] = value keep the index current.
+        """
+        # indexes change no node or edge, so the version stays
+        self._versions.noop = True
+        idx = make_index(kind)
+        nodes = self._nodes
+        idx.build((n, dd[attr]) for n, dd in nodes.items() if attr in dd)
+        nindex = self._nindex
+        nindex[attr] = idx
+        self._versions.save_all(nodes)
+        for n, dd in list(nodes.items()):
+            nodes[n] = wrap_attr_dict(n, nindex, dd)
+    def drop_index(self, attr):
+        del self._nindex[attr]
+    def where(self, **conditions):
+        """Return a list of nodes whose data satisfies all conditions.
+
+        G.n.where(region='eu', size__gt=10) uses an index if possible,
+        otherwise scans all nodes. The result seeds subgraphs cheaply:
+        G.s(G.n.where(region='eu')).
+        """
+        nodes = self._nodes
+        return list(select(self._nindex, parse_conditions(conditions),
+                           nodes.__getitem__, nodes.items))
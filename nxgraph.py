@@ -9,8 +9,7 @@
 from __future__ import division
 from copy import deepcopy
 
-import networkx as nx
-from networkx.exception import NetworkXError
+from exception import NetworkXError
 
 from graph import Graph
 
@@ -215,12 +214,13 @@ class nxGraph(Graph):
             # copy node and attribute dictionaries
             for n,_ in s.a:
                 H._nodedata[n] = self._nodedata[n]
+                H._node_ordinals.assign(n)
             # namespace shortcuts for speed
             H_adj = H.adj
             self_adj = s.a
             # add nodes and edges (undirected method)
             for n,_ in s.a:
-                Hnbrs = {}
+                Hnbrs = H.adjlist_inner_dict_factory()
                 H_adj[n] = Hnbrs
                 for nbr, d in self_adj[n].items():
                     if nbr in H_adj:
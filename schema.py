@@ -0,0 +1,138 @@
+"""Fixed-schema attribute records.
+
+Schema({'weight': float, 'ts': int, 'kind': str}) is a factory for
+compact attribute records. Each field is a __slots__ entry, so a record
+costs one pointer per field instead of a dict hash table, and values are
+converted with the field type when assigned (None leaves them as is).
+Records are mutable mappings and stand in for the attribute dicts of
+nodes and edges: G.e[(u, v)]['weight'], dd.get('kind'), data views and
+attribute indexes work unchanged.
+
+Keys outside the schema go to a per-record overflow dict, created on
+first use, or raise NetworkXError when the schema has overflow=False.
+"""
+from collections import Mapping, MutableMapping
+
+from exception import NetworkXError
+
+__all__ = ['Schema', 'Record']
+
+
+class Record(MutableMapping):
+    """Base class of the record types built by Schema."""
+    __slots__ = ()
+    _schema = None
+    _slots = {}     # field -> slot name
+    _types = {}     # field -> converter or None
+    _extra = None   # overflow dict, a slot when the schema allows it
+
+    def __init__(self, *args, **kwds):
+        if self._schema.overflow:
+            self._extra = None
+        if args or kwds:
+            self.update(*args, **kwds)
+    def __repr__(self):
+        return repr(dict(self.items()))
+    def __reduce__(self):
+        return (self._schema, (), None, None, iter(list(self.items())))
+
+    def __getitem__(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            raise KeyError(key)
+    def __setitem__(self, key, value):
+        slot = self._slots.get(key)
+        if slot is None:
+            if not self._schema.overflow:
+                raise NetworkXError(
+                    "Attribute %r is not in the schema %r" % (key, self._schema))
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        convert = self._types[key]
+        if convert is not None:
+            try:
+                value = convert(value)
+            except (TypeError, ValueError):
+                raise NetworkXError("Attribute %r must be %s, got %r"
+                                    % (key, convert.__name__, value))
+        setattr(self, slot, value)
+    def __delitem__(self, key):
+        slot = self._slots.get(key)
+        try:
+            if slot is None:
+                if self._extra is None:
+                    raise KeyError(key)
+                del self._extra[key]
+            else:
+                delattr(self, slot)
+        except AttributeError:
+            raise KeyError(key)
+    def __iter__(self):
+        for key, slot in self._slots.items():
+            if hasattr(self, slot):
+                yield key
+        if self._extra:
+            for key in self._extra:
+                yield key
+    def __len__(self):
+        n = sum(1 for slot in self._slots.values() if hasattr(self, slot))
+        return n + len(self._extra) if self._extra else n
+    def __contains__(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            return self._extra is not None and key in self._extra
+        return hasattr(self, slot)
+    def get(self, key, default=None):
+        slot = self._slots.get(key)
+        if slot is None:
+            return default if self._extra is None else self._extra.get(key, default)
+        return getattr(self, slot, default)
+    def copy(self):
+        new = self.__class__()
+        for slot in self._slots.values():
+            if hasattr(self, slot):
+                setattr(new, slot, getattr(self, slot))
+        if self._extra:
+            new._extra = dict(self._extra)
+        return new
+
+
+class Schema(object):
+    """Factory of fixed-slot attribute records.
+
+    fields maps attribute names to converters (float, int, str...) or
+    None, in the order records report them. Calling the schema returns
+    a new record, filled like dict(*args, **kwds).
+    """
+    def __init__(self, fields, overflow=True):
+        if isinstance(fields, Mapping):
+            fields = fields.items()
+        self.fields = tuple(fields)
+        self.overflow = overflow
+        names = [name for name, _ in self.fields]
+        if len(set(names)) != len(names):
+            raise NetworkXError("Duplicate field in schema: %r" % (names,))
+        slots = tuple('_%d' % i for i in range(len(names)))
+        self.record = type('Record', (Record,), {
+            '__slots__': slots + (('_extra',) if overflow else ()),
+            '_schema': self,
+            '_slots': dict(zip(names, slots)),
+            '_types': dict(self.fields),
+        })
+    def __repr__(self):
+        fields = ', '.join('%r: %s' % (name, getattr(t, '__name__', t))
+                           for name, t in self.fields)
+        return '{0.__class__.__name__}({{{1}}}, overflow={0.overflow})'.format(
+            self, fields)
+    def __reduce__(self):
+        return (self.__class__, (self.fields, self.overflow))
+    def __call__(self, *args, **kwds):
+        return self.record(*args, **kwds)
@@ -0,0 +1,443 @@
+"""Read-only graphs in shared memory, for process pools.
+
+publish(G) copies a graph into one multiprocessing.shared_memory block:
+
+- the node table
+- a CSR adjacency: ``indptr`` gives the slice of ``indices`` and
+  ``eids`` for each node; each slice lists the neighbor rows in
+  ascending order, with the edge id of each pair.
+  - Undirected graphs store both directions.
+  - Directed graphs store a succ CSR and a pred CSR.
+- each edge once, as ``heads``/``tails`` rows
+- the node and edge attribute columns of compact.py
+
+Int and float data is laid out as typed arrays that all processes map
+directly. Other node tables and attribute columns are stored pickled,
+and each process loads them the first time they are read.
+
+Workers attach by name with attach(name), or receive the SharedGraph
+itself through pickling, which only sends the name. Attaching reads a
+small header and maps the arrays, whatever the size of the graph. The
+``n``, ``e`` and ``a`` views (plus ``su`` and ``pr``) read the shared
+arrays. They are read-only. The attribute dicts they return are
+built on each read and writing to them changes nothing.
+
+Looking up a node needs a node -> row map. For graphs on the nodes
+range(n) the node is its own row. Other tables build a dict the first
+time a node is looked up.
+
+The publisher owns the block: close() it in every process and
+unlink() it once in the publisher when the workers are done.
+"""
+from bisect import bisect_left
+from collections import Mapping, Set, Counter
+from itertools import accumulate, compress, repeat
+from operator import add, mul, ne, sub
+import pickle
+import struct
+import sys
+
+from exception import NetworkXError
+import compact
+from convert import _edge_columns, _is
+from chunks import ChunkedEdges, PartitionedAdjacency, EdgeChunk
+
+__all__ = ['SharedGraph', 'publish', 'attach']
+
+
+def _read_only(self, *args, **kwds):
+    raise NetworkXError("Shared graphs are read-only")
+
+def _csr(size, src, dst, eids):
+    # rows sorted by (src, dst); returns indptr, indices, eids
+    keys = list(map(add, map(mul, src, repeat(size)), dst))
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    counts = Counter(src)
+    indptr = [0]
+    indptr.extend(accumulate(map(counts.__getitem__, range(size))))
+    return (indptr, list(map(dst.__getitem__, order)),
+            list(map(eids.__getitem__, order)))
+
+def _blocks(G):
+    # the named blocks of G and its header entries (see _layout)
+    if _is(G, 'multigraph'):
+        raise NetworkXError("Shared graphs do not support multigraphs")
+    directed = _is(G, 'directed')
+    nodedata = getattr(G, '_nodedata', None)
+    if nodedata is None:
+        nodedata = G._nodes
+    nodes = list(nodedata)
+    sources, targets, _, datadicts = _edge_columns(G)
+    heads = compact.positions(nodes, sources)
+    tails = compact.positions(nodes, targets)
+    size = len(nodes)
+    eids = list(range(len(heads)))
+    blocks = {'nodes': nodes, 'heads': heads, 'tails': tails}
+    if directed:
+        csrs = [_csr(size, heads, tails, eids), _csr(size, tails, heads, eids)]
+    else:
+        # both directions; self-loops once
+        back = list(map(ne, heads, tails))
+        csrs = [_csr(size, heads + list(compress(tails, back)),
+                     tails + list(compress(heads, back)),
+                     eids + list(compress(eids, back)))]
+    for prefix, csr in zip(('', 'in_'), csrs):
+        for name, column in zip(('indptr', 'indices', 'eids'), csr):
+            blocks[prefix + name] = column
+    columns = {}
+    for kind, dds in (('node', list(nodedata.values())), ('edge', datadicts)):
+        columns[kind] = []
+        for i, (attr, rows, values) in enumerate(compact.attr_columns(dds)):
+            key = '%s%d' % (kind, i)
+            if rows is not None:
+                blocks[key + 'rows'] = compact.unpack_column(rows)
+            blocks[key] = compact.unpack_column(values)
+            columns[kind].append((attr, key, rows is not None))
+    header = {'directed': directed, 'data': dict(G.data),
+              'identity': (nodes == list(range(size))
+                           and set(map(type, nodes)) <= {int}),
+              'columns': columns}
+    return blocks, header
+
+def _layout(blocks):
+    # name -> (typecode or None for pickled, payload bytes)
+    payloads = {}
+    for name, values in blocks.items():
+        packed = compact.pack_column(values)
+        if isinstance(packed, list):
+            payloads[name] = (None, pickle.dumps(packed, -1))
+        else:
+            typecode, buf = packed
+            payloads[name] = (typecode, buf.tobytes())
+    return payloads
+
+
+class SharedNbrs(Mapping):
+    """The neighbors of one node: nbr -> edge attribute dict."""
+    __slots__ = ('_graph', '_parts')
+    def __init__(self, graph, parts):
+        self._graph = graph
+        self._parts = parts  # [(indices, eids, start, stop)]
+    def __repr__(self):
+        return '{0.__class__.__name__}({1})'.format(self, dict(self.items()))
+    def __iter__(self):
+        nodes = self._graph._nodes
+        for indices, eids, start, stop in self._parts:
+            for k in range(start, stop):
+                yield nodes[indices[k]]
+    def __len__(self):
+        return sum(stop - start for _, _, start, stop in self._parts)
+    def _eid(self, nbr):
+        row = self._graph._row(nbr)
+        if row is not None:
+            for indices, eids, start, stop in self._parts:
+                k = bisect_left(indices, row, start, stop)
+                if k < stop and indices[k] == row:
+                    return eids[k]
+        return None
+    def __contains__(self, nbr):
+        return self._eid(nbr) is not None
+    def __getitem__(self, nbr):
+        eid = self._eid(nbr)
+        if eid is None:
+            raise KeyError(nbr)
+        return self._graph._edge_attrs.record(eid)
+
+
+class SharedAdjacency(PartitionedAdjacency, Mapping):
+    """node -> SharedNbrs, over one or two (succ, pred) CSRs."""
+    __slots__ = ('_graph', '_csrs', '_attr')
+    _by_name = True
+    def __init__(self, graph, csrs, attr):
+        self._graph = graph
+        self._csrs = csrs  # [(indptr, indices, eids)]
+        self._attr = attr  # 'a', 'su' or 'pr'
+    def __repr__(self):
+        return '{0.__class__.__name__}({1} nodes)'.format(self, len(self))
+    def __reduce__(self):
+        return (getattr, (self._graph, self._attr))
+    def _nbrs(self, row):
+        return SharedNbrs(self._graph, [
+            (indices, eids, indptr[row], indptr[row + 1])
+            for indptr, indices, eids in self._csrs])
+    def _chunk_weights(self):
+        weights = [map(sub, indptr[1:], indptr) for indptr, _, _ in self._csrs]
+        return map(add, *weights) if len(weights) == 2 else weights[0]
+    def _chunk_order(self):
+        return None  # rows are the positions
+    def _chunk(self, start, stop, order=None):
+        nodes = self._graph._nodes
+        for row in range(start, stop):
+            yield nodes[row], self._nbrs(row)
+    def __iter__(self):
+        return iter(self._graph._nodes)
+    def __len__(self):
+        return len(self._graph._nodes)
+    def __contains__(self, n):
+        return self._graph._row(n) is not None
+    def __getitem__(self, n):
+        row = self._graph._row(n)
+        if row is None:
+            raise KeyError(n)
+        return self._nbrs(row)
+    def degree(self, n):
+        row = self._graph._row(n)
+        if row is None:
+            raise KeyError(n)
+        return sum(indptr[row + 1] - indptr[row] for indptr, _, _ in self._csrs)
+
+
+class SharedNodes(Mapping):
+    """node -> node attribute dict."""
+    __slots__ = ('_graph',)
+    def __init__(self, graph):
+        self._graph = graph
+    def __repr__(self):
+        return '{0.__class__.__name__}({1})'.format(self, list(self))
+    def __iter__(self):
+        return iter(self._graph._nodes)
+    def __len__(self):
+        return len(self._graph._nodes)
+    def __contains__(self, n):
+        return self._graph._row(n) is not None
+    def __getitem__(self, n):
+        row = self._graph._row(n)
+        if row is None:
+            raise KeyError(n)
+        return self._graph._node_attrs.record(row)
+    def data(self):
+        return self.values()
+    add = update = discard = remove = clear = _read_only
+
+
+class SharedEdges(ChunkedEdges, Set):
+    """The edges (u, v), each once; G.e[(u, v)] is the attribute dict.
+
+    G.e.chunks(k) cuts the edge table into k ranges of equal length.
+    """
+    __slots__ = ('_graph',)
+    _by_name = True
+    def __init__(self, graph):
+        self._graph = graph
+    def __repr__(self):
+        return '{0.__class__.__name__}({1})'.format(self, list(self))
+    def __reduce__(self):
+        return (getattr, (self._graph, 'e'))
+    def chunks(self, k, data=False):
+        if k < 1:
+            raise NetworkXError("The number of chunks must be positive")
+        size = len(self)
+        bounds = sorted(set(size * i // k for i in range(k + 1)))
+        return [EdgeChunk(self, start, stop, data)
+                for start, stop in zip(bounds, bounds[1:])]
+    def _chunk(self, start, stop, order=None, data=False):
+        graph = self._graph
+        nodes = graph._nodes
+        edges = zip(map(nodes.__getitem__, graph._heads[start:stop]),
+                    map(nodes.__getitem__, graph._tails[start:stop]))
+        if data:
+            return zip(edges, map(graph._edge_attrs.record, range(start, stop)))
+        return edges
+    def __iter__(self):
+        nodes = self._graph._nodes
+        return zip(map(nodes.__getitem__, self._graph._heads),
+                   map(nodes.__getitem__, self._graph._tails))
+    def __len__(self):
+        return len(self._graph._heads)
+    def __contains__(self, key):
+        try:
+            u, v = key
+        except (TypeError, ValueError):
+            return False
+        return u in self._graph.su and v in self._graph.su[u]
+    def __getitem__(self, key):
+        try:
+            u, v = key
+        except (TypeError, ValueError):
+            raise NetworkXError('bad edge key: use edge key = (u,v)')
+        return self._graph.su[u][v]
+    def keys(self):
+        return self
+    def items(self):
+        record = self._graph._edge_attrs.record
+        return zip(self, map(record, range(len(self))))
+    def data(self):
+        return map(self._graph._edge_attrs.record, range(len(self)))
+    add = update = discard = remove = clear = _read_only
+
+
+class AttrColumns(object):
+    """Attribute dicts of the rows of a table, built from columns."""
+    __slots__ = ('_graph', '_columns')
+    def __init__(self, graph, columns):
+        self._graph = graph
+        self._columns = columns  # [(attr, block, has_rows)]
+    def record(self, row):
+        block = self._graph._block
+        datadict = {}
+        for attr, key, has_rows in self._columns:
+            if not has_rows:
+                datadict[attr] = block(key)[row]
+                continue
+            rows = block(key + 'rows')
+            k = bisect_left(rows, row)
+            if k < len(rows) and rows[k] == row:
+                datadict[attr] = block(key)[k]
+        return datadict
+
+
+class SharedGraph(object):
+    """A read-only graph whose storage is a shared memory block.
+
+    Make one with publish(G) or attach(name); see the module docstring.
+    """
+    def __init__(self, shm, owner=False):
+        self._shm = shm
+        self._owner = owner
+        self._views = []    # memoryviews to release on close
+        self._loaded = {}   # unpickled blocks of this process
+        self._index = None  # node -> row, built on first lookup
+        buf = shm.buf
+        offset, size = struct.unpack_from('<QQ', buf, 0)
+        header = pickle.loads(bytes(buf[offset:offset + size]))
+        self._blocks = header['blocks']
+        self._identity = header['identity']
+        self.directed = header['directed']
+        self.data = header['data']
+        self._heads = self._block('heads')
+        self._tails = self._block('tails')
+        columns = header['columns']
+        self._node_attrs = AttrColumns(self, columns['node'])
+        self._edge_attrs = AttrColumns(self, columns['edge'])
+        succ = tuple(map(self._block, ('indptr', 'indices', 'eids')))
+        self.n = SharedNodes(self)
+        self.e = SharedEdges(self)
+        if self.directed:
+            pred = tuple(map(self._block, ('in_indptr', 'in_indices',
+                                           'in_eids')))
+            self.su = SharedAdjacency(self, [succ], 'su')
+            self.pr = SharedAdjacency(self, [pred], 'pr')
+            self.a = SharedAdjacency(self, [succ, pred], 'a')
+        else:
+            self.a = self.su = self.pr = SharedAdjacency(self, [succ], 'a')
+
+    def _block(self, name):
+        # typed blocks are views of the shared buffer, pickled ones are
+        # loaded once per process
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        typecode, offset, nbytes = self._blocks[name]
+        view = self._shm.buf[offset:offset + nbytes]
+        if typecode is None:
+            try:
+                block = pickle.loads(view)
+            finally:
+                view.release()
+        else:
+            block = view.toreadonly().cast(typecode)
+            self._views.append(block)
+        self._loaded[name] = block
+        return block
+
+    @property
+    def _nodes(self):
+        return self._block('nodes')
+
+    def _row(self, n):
+        if self._identity:
+            if type(n) is int and 0 <= n < len(self._nodes):
+                return n
+            return None
+        if self._index is None:
+            nodes = self._nodes
+            self._index = dict(zip(nodes, range(len(nodes))))
+        try:
+            return self._index.get(n)
+        except TypeError:  # unhashable
+            return None
+
+    @property
+    def name(self):
+        """Name of the shared memory block, for attach()."""
+        return self._shm.name
+
+    def __reduce__(self):
+        return (attach, (self.name,))
+    def __repr__(self):
+        return '{0.__class__.__name__}({1!r}, nodes={2}, edges={3})'.format(
+            self, self.name, len(self.n), len(self.e))
+    def __iter__(self):
+        return iter(self._nodes)
+    def __len__(self):
+        return len(self._nodes)
+    def __contains__(self, n):
+        return self._row(n) is not None
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def is_directed(self):
+        return self.directed
+    def is_multigraph(self):
+        return False
+
+    def close(self):
+        """Detach this process from the block; the views stop working."""
+        self._loaded.clear()
+        for view in self._views:
+            view.release()
+        del self._views[:]
+        self._shm.close()
+    def unlink(self):
+        """Free the block once every process has closed it."""
+        _published.discard(self.name)
+        self._shm.unlink()
+
+
+# names of the blocks this process published and still tracks
+_published = set()
+
+def publish(G, name=None):
+    """Copy G into a new shared memory block and return the SharedGraph
+    over it. The caller owns the block (see SharedGraph.unlink)."""
+    from multiprocessing import shared_memory
+    blocks, header = _blocks(G)
+    payloads = _layout(blocks)
+    # 16 bytes for the header's offset and size, the blocks 8-byte
+    # aligned, then the header with the block offsets
+    offset = 16
+    header['blocks'] = {}
+    for key, (typecode, data) in payloads.items():
+        offset += -offset % 8
+        header['blocks'][key] = (typecode, offset, len(data))
+        offset += len(data)
+    head = pickle.dumps(header, -1)
+    shm = shared_memory.SharedMemory(name=name, create=True,
+                                     size=offset + len(head))
+    buf = shm.buf
+    for key, (typecode, data) in payloads.items():
+        start = header['blocks'][key][1]
+        buf[start:start + len(data)] = data
+    buf[offset:offset + len(head)] = head
+    struct.pack_into('<QQ', buf, 0, offset, len(head))
+    _published.add(shm.name)
+    return SharedGraph(shm, owner=True)
+
+def attach(name):
+    """Return the SharedGraph published under `name`."""
+    from multiprocessing import shared_memory
+    if sys.version_info >= (3, 13):
+        return SharedGraph(shared_memory.SharedMemory(name=name, track=False))
+    shm = shared_memory.SharedMemory(name=name)
+    # Before 3.13 opening a block registers it with this process's
+    # resource tracker, which unlinks it when the process exits; the
+    # block belongs to the publisher, so take it off the tracker.
+    if shm.name not in _published:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return SharedGraph(shm)
@@ -0,0 +1,176 @@
+from collections import Mapping
+import weakref
+
+from exception import NetworkXError
+
+from nodes import Nodes
+from edges import Edges
+from adjacency import Adjacency
+from subgraph import Subgraph
+from versions import Versions, absent
+
+
+def _read_only(self, *args, **kwds):
+    raise NetworkXError("Graph snapshots are read-only")
+
+class SnapshotNodes(Nodes):
+    __slots__ = ()
+    add = update = discard = remove = remove_many = clear = _read_only
+    intersection_update = difference_update = _read_only
+    symmetric_difference_update = _read_only
+    __ior__ = __iand__ = __isub__ = __ixor__ = _read_only
+    __setitem__ = __delitem__ = pop = popitem = setdefault = _read_only
+    add_index = drop_index = _read_only
+
+class SnapshotEdges(Edges):
+    __slots__ = ()
+    add = update = remove = clear = _read_only
+    add_index = drop_index = intern_attrs = _read_only
+
+
+class PinnedDict(Mapping):
+    """One of the graph's top-level dicts as it was when a snapshot was
+    taken: the live dict, with the entries writers changed since read
+    from the overlay they saved them in (see versions.py).
+
+    Lookups read the live dict before the overlay; writers save into the
+    overlay before they change the live dict, so a lookup racing a write
+    still gets the old entry. Iterating needs a copy: the first one asks
+    the snapshot to copy all its dicts (GraphSnapshot._freeze).
+    """
+    __slots__ = ('_live', '_overlay', '_lock', '_snapshot', '_frozen')
+    def __init__(self, live, overlay, lock, snapshot):
+        self._live = live
+        self._overlay = overlay
+        self._lock = lock
+        # weak, so the snapshot is unpinned as soon as it is dropped
+        self._snapshot = weakref.ref(snapshot)
+        self._frozen = None
+    def __repr__(self):
+        return '{0.__class__.__name__}({1})'.format(self, dict(self.items()))
+    def __getitem__(self, key):
+        if self._frozen is not None:
+            return self._frozen[key]
+        value = self._live.get(key, absent)
+        value = self._overlay.get(key, value)
+        if value is absent:
+            raise KeyError(key)
+        return value
+    def __contains__(self, key):
+        if self._frozen is not None:
+            return key in self._frozen
+        present = key in self._live
+        saved = self._overlay.get(key, self)
+        return present if saved is self else saved is not absent
+    def __iter__(self):
+        return iter(self._freeze())
+    def __len__(self):
+        return len(self._freeze())
+    def keys(self):
+        return self._freeze().keys()
+    def values(self):
+        return self._freeze().values()
+    def items(self):
+        return self._freeze().items()
+    def _freeze(self):
+        if self._frozen is None:
+            snapshot = self._snapshot()
+            if snapshot is None:
+                self._copy()
+            else:
+                snapshot._freeze()
+        return self._frozen
+    def _copy(self):
+        # A dict is copied in one C call that no writer thread can
+        # interleave with; other mappings are copied under the lock.
+        # Entries changed after the copy are still pinned in the overlay.
+        live = self._live
+        if isinstance(live, dict):
+            frozen = dict.copy(live)
+            saved = self._overlay.copy()
+        else:
+            with self._lock:
+                frozen = dict(live.items())
+                saved = self._overlay.copy()
+        for key, value in saved.items():
+            if value is absent:
+                frozen.pop(key, None)
+            else:
+                frozen[key] = value
+        self._frozen = frozen
+        return frozen
+
+
+class GraphSnapshot(object):
+    """Read-only view of a Graph pinned at the version it was taken at.
+
+    Taking a snapshot copies nothing; it reads the graph's dicts through
+    PinnedDicts, and writers keep the entries and the inner dicts they
+    change for it (see versions.py). The first iteration copies the
+    top-level dicts, without the writer lock. The pinned versions are
+    released when the snapshot is garbage collected.
+
+    Changes made through G.n, G.e and G.a are isolated from the
+    snapshot, including writes into the datadicts they return
+    (G.n[n]['color'] = 'red'). A datadict fetched before the snapshot
+    was taken is still the graph's shared dict.
+    """
+    # the views are read-only, so these are never called
+    adjlist_inner_dict_factory = dict
+    node_attr_dict_factory = dict
+    edge_attr_dict_factory = dict
+
+    def __init__(self, graph):
+        versions = graph._versions
+        live = graph._nodedata, graph._adjacency, graph._node_ordinals
+        with versions.lock:
+            self.data = dict(graph.data)
+            self.version = versions.version
+            self._overlays = versions.pin(self, live)
+        self._graph_versions = versions
+        self._nodedata, self._adjacency, self._node_ordinals = [
+            PinnedDict(mapping, self._overlays[id(mapping)], versions.lock,
+                       self)
+            for mapping in live]
+        # snapshots get no attribute indexes (where() scans) and their
+        # own versions, which stay unused since nothing can be written
+        self._edge_indexes = {}
+        self._node_indexes = {}
+        self._versions = Versions()
+        self.n = SnapshotNodes(self._nodedata, self._adjacency, self)
+        self.e = SnapshotEdges(self._nodedata, self._adjacency, self)
+        self.a = Adjacency(self._adjacency)
+
+    def _freeze(self):
+        # copy the pinned dicts and read those from now on
+        pinned = self._nodedata, self._adjacency, self._node_ordinals
+        if pinned[0]._frozen is not None:
+            return
+        nodedata, adjacency, ordinals = [p._copy() for p in pinned]
+        self._graph_versions.release(self._overlays)
+        for view in (self.n, self.e):
+            view._adj = adjacency
+            view._ordinals = ordinals
+        self.n._nodes = self.e._node = nodedata
+        self.a._mapping = adjacency
+        self._nodedata, self._adjacency = nodedata, adjacency
+        self._node_ordinals = ordinals
+
+    def __repr__(self):
+        return '{0.__class__.__name__}(version={0.version}, ' \
+               'nodes={1}, edges={2})'.format(self, len(self.n), len(self.e))
+    def __iter__(self):
+        return iter(self.n)
+    def __len__(self):
+        return len(self.n)
+    def __contains__(self, n):
+        return n in self._nodedata
+
+    def s(self, nbunch):
+        return Subgraph(self, nbunch)
+
+    def is_multigraph(self):
+        return False
+
+    def is_directed(self):
+        return False
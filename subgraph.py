@@ -3,6 +3,7 @@ from collections import MappingView,KeysView,ValuesView,ItemsView
 from nodes import Nodes
 from edges import Edges
 from adjacency import Adjacency
+from chunks import PartitionedAdjacency
 
 
 class Subgraph(object):
@@ -14,8 +15,17 @@ class Subgraph(object):
         self._nodedata = SubNbrDict(self._subnodes, graph._nodedata)
         self._adjacency = SubAdjacency(self._subnodes, graph._adjacency)
         self.data = graph.data
-        self.n = Nodes(self._nodedata, self._adjacency)
-        self.e = Edges(self._nodedata, self._adjacency)
+        # subgraph views get no attribute indexes (where() scans) but
+        # share the parent's node ordinals for undirected edge iteration
+        self._edge_indexes = {}
+        self._node_indexes = {}
+        self._node_ordinals = graph._node_ordinals
+        self._versions = graph._versions
+        self.adjlist_inner_dict_factory = graph.adjlist_inner_dict_factory
+        self.node_attr_dict_factory = graph.node_attr_dict_factory
+        self.edge_attr_dict_factory = graph.edge_attr_dict_factory
+        self.n = Nodes(self._nodedata, self._adjacency, self)
+        self.e = Edges(self._nodedata, self._adjacency, self)
         self.a = self._adjacency
     def __repr__(self):
         return '{0.__class__.__name__}({1})'.format(self,list(self._subnodes))
@@ -24,11 +34,19 @@ class Subgraph(object):
     def __len__(self):
         return len(self._subnodes)
 
+    @staticmethod
+    def _is_node(graph, n):
+        # dict lookup instead of `n in graph`, which scans all nodes
+        try:
+            return n in graph._adjacency
+        except TypeError:  # unhashable, e.g. a list of nodes
+            return False
+
     @staticmethod
     def _nbunch_iter(graph, nbunch=None):
         if nbunch is None:   # include all nodes via iterator
             bunch = iter(graph._adjacency)
-        elif nbunch in graph:  # if nbunch is a single node
+        elif Subgraph._is_node(graph, nbunch):  # if nbunch is a single node
             bunch = iter([nbunch])
         else:                # if nbunch is a sequence of nodes
             def bunch_iter(nlist, adj):
@@ -57,8 +75,12 @@ class SubNbrDict(MappingView):
     # __slots__= ["_nodes","_mapping","_cache"]
     def __init__(self, nodes, mapping):
         # In nodes to be in subgraph, in mapping to be in nbrs.
-        # So need intersection of nodes with mapping...
-        self._nodes = set(nodes) & set(mapping)
+        # So need intersection of nodes with mapping; iterate the
+        # smaller one so small subgraphs of big graphs stay cheap.
+        if len(nodes) <= len(mapping):
+            self._nodes = set(n for n in nodes if n in mapping)
+        else:
+            self._nodes = set(n for n in mapping if n in nodes)
         self._mapping = mapping
         self._cache = {}
     def __repr__(self):
@@ -76,7 +98,7 @@ class SubNbrDict(MappingView):
         return len(self._nodes)
 
     def keys(self):
-        return self._nodes.keys()
+        return KeysView(self._nodes)
     def data(self):
         # Datadicts are read/write so no wrapper for mapping[n]
         for n in self._nodes - set(self._cache.keys()):
@@ -87,8 +109,10 @@ class SubNbrDict(MappingView):
         for n in self._nodes - set(self._cache.keys()):
             self._cache[n] = self._mapping[n]
         return self._cache.items()
+    def values(self):
+        return self.data()
 
-class SubAdjacency(SubNbrDict):
+class SubAdjacency(PartitionedAdjacency, SubNbrDict):
     #__slots__ = ["_nodes","_mapping","_cache"]
     def __iter__(self):
         for n in self._nodes:
@@ -116,3 +140,11 @@ class SubAdjacency(SubNbrDict):
         for n in self._nodes - set(self._cache.keys()):
             self._cache[n] = SubNbrDict(self._nodes, self._mapping[n])
         return self._cache.items()
+    # Edge chunks and partitions (see chunks.py) take the subgraph's
+    # nodes in items() order, which is fixed once the cache is full.
+    def _chunk_weights(self):
+        return (len(nbrs) for n, nbrs in self.items())
+    def _chunk_order(self):
+        return list(self.items())
+    def _chunk(self, start, stop, order):
+        return iter(order[start:stop])
@@ -10,7 +10,7 @@
 
 from nose.tools import (assert_equal, assert_raises, assert_true, raises,
                         assert_not_equal)
-import networkx
+from exception import NetworkXError
 from ABCnxgraph import nxGraph
 from ABCgraph import Nodes
 from ABCgraph import Edges
@@ -53,14 +53,14 @@ class BaseGraphTester(object):
     def test_neighbors(self):
         G=self.K3
         assert_equal(sorted(G.neighbors(0)),[1,2])
-        assert_raises((KeyError,networkx.NetworkXError), G.neighbors,-1)
+        assert_raises((KeyError,NetworkXError), G.neighbors,-1)
 
     def test_edges(self):
         G=self.K3
         assert_equal(sorted(G.edges()),[(0,1),(0,2),(1,2)])
         assert_equal(sorted(G.edges(0)),[(0,1),(0,2)])
         f=lambda x:list(G.edges(x))
-        assert_raises((KeyError,networkx.NetworkXError), f, -1)
+        assert_raises((KeyError,NetworkXError), f, -1)
 
     def test_weighted_degree(self):
         G=self.Graph()
@@ -140,17 +140,17 @@ class BaseGraphTester(object):
         # node not in graph doesn't get caught upon creation of iterator
         bunch=G.nbunch_iter(-1)
         # but gets caught when iterator used
-        assert_raises(networkx.NetworkXError,list,bunch)
+        assert_raises(NetworkXError,list,bunch)
         # unhashable doesn't get caught upon creation of iterator
         bunch=G.nbunch_iter([0,1,2,{}])
         # but gets caught when iterator hits the unhashable
-        assert_raises(networkx.NetworkXError,list,bunch)
+        assert_raises(NetworkXError,list,bunch)
 
-    @raises(networkx.NetworkXError)
+    @raises(NetworkXError)
     def test_nbunch_iter_node_fails_format(self):
         """Tests that a node that would have failed string formatting
         doesn't cause an error when attempting to raise a
-        :exc:`networkx.NetworkXError`.
+        :exc:`NetworkXError`.
 
         For more information, see pull request #1813.
 
@@ -208,7 +208,7 @@ class BaseAttrGraphTester(BaseGraphTester):
         G.add_edge(1,2,foo=ll)
         G.add_edge(2,1,foo=ll)
         # attr_dict must be dict
-        assert_raises(networkx.NetworkXError,G.add_edge,0,1,attr_dict=[])
+        assert_raises(NetworkXError,G.add_edge,0,1,attr_dict=[])
 
     def test_name(self):
         G=self.Graph(name='')
@@ -431,7 +431,7 @@ class BaseAttrGraphTester(BaseGraphTester):
         # attr_dict must be dict
         G=self.Graph()
         edges=[(1,2)]
-        assert_raises(networkx.NetworkXError,G.add_edges_from,edges,
+        assert_raises(NetworkXError,G.add_edges_from,edges,
                       attr_dict=[])
 
     def test_to_undirected(self):
@@ -523,7 +523,7 @@ class TestGraph(BaseAttrGraphTester):
         G=self.K3
         assert_equal(G[0],{1: {}, 2: {}})
         assert_raises(KeyError, G.__getitem__, 'j')
-        assert_raises((TypeError,networkx.NetworkXError), G.__getitem__, ['A'])
+        assert_raises((TypeError,NetworkXError), G.__getitem__, ['A'])
 
     def test_add_node(self):
         G=self.Graph()
@@ -533,8 +533,8 @@ class TestGraph(BaseAttrGraphTester):
         G.add_node(1,c='red')
         G.add_node(2,{'c':'blue'})
         G.add_node(3,{'c':'blue'},c='red')
-        assert_raises(networkx.NetworkXError, G.add_node, 4, [])
-        assert_raises(networkx.NetworkXError, G.add_node, 4, 4)
+        assert_raises(NetworkXError, G.add_node, 4, [])
+        assert_raises(NetworkXError, G.add_node, 4, 4)
         assert_equal(G.node[1]['c'],'red')
         assert_equal(G.node[2]['c'],'blue')
         assert_equal(G.node[3]['c'],'red')
@@ -578,7 +578,7 @@ class TestGraph(BaseAttrGraphTester):
         G=self.K3
         G.remove_node(0)
         assert_equal(G._succ,{1:{2:{}},2:{}})
-        assert_raises((KeyError,networkx.NetworkXError), G.remove_node,-1)
+        assert_raises((KeyError,NetworkXError), G.remove_node,-1)
 
         # generator here to implement list,set,string...
     def test_remove_nodes_from(self):
@@ -587,6 +587,56 @@ class TestGraph(BaseAttrGraphTester):
         assert_equal(G._succ,{2:{}})
         G.remove_nodes_from([-1]) # silent fail
 
+    def test_node_where(self):
+        G=self.Graph()
+        G.n.update([(1,{'region':'eu'}), (2,{'region':'us'})])
+        G.e.add(1,3)
+        G.n.add_index('region')
+        G.n[3]['region'] = 'eu'
+        assert_equal(sorted(G.n.where(region='eu')), [1,3])
+        G.n.discard(1)
+        assert_equal(G.n.where(region='eu'), [3])
+        assert_equal(sorted(G.s(G.n.where(region='eu')).n), [3])
+
+    def test_remove_many(self):
+        G=self.Graph(directed=True)
+        G.e.update([(0,1),(1,2),(2,0),(2,3),(3,3),(4,2)])
+        assert_equal(G.n.remove_many([2,3,7]), 5)
+        assert_equal(sorted(G.e), [(0,1)])
+        assert_equal(G._succ, {0:{1:{}}, 1:{}, 4:{}})
+        assert_equal(G._pred, {0:{}, 1:{0:{}}, 4:{}})
+
+    def test_factories(self):
+        from collections import OrderedDict
+        class OrderedGraph(self.Graph):
+            node_dict_factory = OrderedDict
+            adjlist_outer_dict_factory = OrderedDict
+            adjlist_inner_dict_factory = OrderedDict
+            node_attr_dict_factory = OrderedDict
+            edge_attr_dict_factory = OrderedDict
+        G = OrderedGraph()
+        G.n.add(5, color='red')
+        G.e.update([(0,1), (1,2,{'weight':3})])
+        assert_true(type(G._nodes) is OrderedDict)
+        assert_true(type(G._succ) is OrderedDict)
+        assert_true(all(type(G._succ[n]) is OrderedDict for n in G.n))
+        assert_true(all(type(G._pred[n]) is OrderedDict for n in G.n))
+        assert_true(all(type(G._nodes[n]) is OrderedDict for n in G.n))
+        assert_true(type(G._succ[1][2]) is OrderedDict)
+        assert_equal(G._succ[1][2], {'weight': 3})
+
+    def test_intern_attrs(self):
+        G=self.Graph()
+        G.e.update([(0,1),(1,2),(2,3,{'w':2})], kind='a')
+        G.e.intern_attrs()
+        assert_true(G._succ[0][1] is G._succ[1][2])
+        G.e[(2,1)]['kind'] = 'b'
+        assert_equal(G.e[(1,2)], {'kind': 'b'})
+        assert_equal(G._succ[0][1], {'kind': 'a'})
+        G.e.add(0,1,kind='b')
+        assert_true(G._succ[0][1] is G._succ[1][2])
+        assert_true(G._pred[1][0] is G._succ[0][1])
+
     def test_add_edge(self):
         G=self.Graph()
         G.add_edge(0,1)
@@ -609,9 +659,9 @@ class TestGraph(BaseAttrGraphTester):
                 1: {2:{'data':4}}, \
                 2: {}})
 
-        assert_raises(networkx.NetworkXError,
+        assert_raises(NetworkXError,
                       G.add_edges_from,[(0,)])  # too few in tuple
-        assert_raises(networkx.NetworkXError,
+        assert_raises(NetworkXError,
                       G.add_edges_from,[(0,1,2,3)])  # too many in tuple
         assert_raises(TypeError, G.add_edges_from,[0])  # not a tuple
 
@@ -620,7 +670,7 @@ class TestGraph(BaseAttrGraphTester):
         G=self.K3
         G.remove_edge(0,1)
         assert_equal(G._succ,{0:{2:{}},1:{2:{}},2:{}})
-        assert_raises((KeyError,networkx.NetworkXError), G.remove_edge,-1,0)
+        assert_raises((KeyError,NetworkXError), G.remove_edge,-1,0)
 
     def test_remove_edges_from(self):
         G=self.K3
@@ -638,7 +688,7 @@ class TestGraph(BaseAttrGraphTester):
         assert_equal(sorted(G.edges(data=True)),[(0,1,{}),(0,2,{}),(1,2,{})])
         assert_equal(sorted(G.edges(0,data=True)),[(0,1,{}),(0,2,{})])
         f = lambda x: list(G.edges(x))
-        assert_raises((KeyError,networkx.NetworkXError), f,-1)
+        assert_raises((KeyError,NetworkXError), f,-1)
 
 
     def test_get_edge_data(self):
@@ -0,0 +1,54 @@
+#
+#   TESTS
+#
+import os
+import shutil
+import tempfile
+
+from nose import SkipTest
+from nose.tools import assert_equal
+
+from graph import Graph
+import ABCmultigraph
+from convert import to_networkx_graph
+
+
+class TestArrowIO(object):
+    def setUp(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SkipTest('pyarrow not available.')
+        import arrowio
+        self.io = arrowio
+        self.G = Graph()
+        self.G.e.update([(1, 2, {'w': 1.0, 'kind': 'a'}), (2, 3, {'w': 2.0}),
+                         (3, 3, {'kind': 'c'})])
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_table_round_trip(self):
+        table = self.io.to_arrow(self.G)
+        assert_equal(table.column_names, ['source', 'target', 'w', 'kind'])
+        assert_equal(table.num_rows, 3)
+        H = self.io.from_arrow(table, edge_attr=True)
+        assert_equal(dict(H.e.items()), dict(self.G.e.items()))
+        H = to_networkx_graph(table.to_batches()[0], Graph())
+        assert_equal(H.e[(3, 2)], {'w': 2.0})
+
+    def test_parquet(self):
+        path = os.path.join(self.dir, 'edges.parquet')
+        self.io.write_parquet(self.G, path)
+        H = self.io.read_parquet(path, edge_attr='kind', batch_size=1)
+        assert_equal(dict(H.e.items()),
+                     {(1, 2): {'kind': 'a'}, (2, 3): {}, (3, 3): {'kind': 'c'}})
+        M = ABCmultigraph.Graph(multigraph=True)
+        M.e.update([(1, 2, 'x', {'w': 1}), (1, 2, 'y', {'w': 2})])
+        self.io.write_parquet(M, path)
+        N = self.io.read_parquet(path, edge_attr=True, edge_key='key',
+                                 create_using=ABCmultigraph.Graph(multigraph=True))
+        assert_equal(sorted(N.e), [(1, 2, 'x'), (1, 2, 'y')])
+        assert_equal(N.e[(1, 2, 'y')], {'w': 2})
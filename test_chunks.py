@@ -0,0 +1,147 @@
+#
+#   TESTS
+#
+import pickle
+
+from nose.tools import assert_true, assert_equal, assert_raises
+from exception import NetworkXError
+
+import ABCgraph
+import ABCmultigraph
+from chunks import balanced_ranges, EdgeChunk, AdjacencyChunk
+from graph import Graph
+import sharedgraph
+
+
+def joined(chunks):
+    return [item for chunk in chunks for item in chunk]
+
+
+class TestBalancedRanges(object):
+    def test_ranges(self):
+        assert_equal(balanced_ranges([1] * 8, 4), [(0, 2), (2, 4), (4, 6), (6, 8)])
+        assert_equal(balanced_ranges([6, 1, 1, 1, 1], 2), [(0, 1), (1, 5)])
+        assert_equal(balanced_ranges([1, 1], 5), [(0, 1), (1, 2)])
+        assert_equal(balanced_ranges([0, 0, 0], 2), [(0, 1), (1, 3)])
+        assert_equal(balanced_ranges([], 3), [])
+        assert_raises(NetworkXError, balanced_ranges, [1], 0)
+
+
+class TestGraphChunks(object):
+    def setUp(self):
+        G = self.G = Graph()
+        G.e.update([(i, j, {'w': i + j}) for i in range(20)
+                    for j in range(i, 20, 3)])
+        G.n.add('x')
+
+    def test_edges(self):
+        G = self.G
+        for k in (1, 3, 7, 50):
+            chunks = G.e.chunks(k)
+            assert_true(len(chunks) <= k)
+            assert_equal(joined(chunks), list(G.e))
+            assert_equal(joined(G.e.chunks(k, data=True)), list(G.e.items()))
+
+    def test_balanced(self):
+        G = Graph((range(100), [(0, i) for i in range(1, 100)] +
+                   [(i, i + 1) for i in range(1, 99)]))
+        sizes = [len(list(chunk)) for chunk in G.e.chunks(4)]
+        # the hub 0 cannot be split; the path is cut evenly
+        assert_equal(sizes[0], 99)
+        assert_true(max(sizes[1:]) - min(sizes[1:]) <= 1)
+
+    def test_partition(self):
+        G = self.G
+        parts = G.a.partition(4)
+        assert_equal([n for n, nbrs in joined(parts)], list(G.n))
+        assert_equal([dict(nbrs) for n, nbrs in joined(parts)],
+                     [dict(G.a[n]) for n in G.n])
+
+    def test_pickle(self):
+        G = self.G
+        chunks = G.e.chunks(3, data=True)
+        loaded = pickle.loads(pickle.dumps(chunks))
+        assert_equal(joined(loaded), list(G.e.items()))
+        for chunk, orig in zip(loaded, chunks):
+            assert_true(type(chunk) is EdgeChunk)
+            assert_equal((chunk.start, chunk.stop, chunk.data),
+                         (orig.start, orig.stop, True))
+            assert_equal(list(chunk), list(orig))
+        parts = G.a.partition(2)
+        loaded = pickle.loads(pickle.dumps(parts))
+        assert_true(type(loaded[1]) is AdjacencyChunk)
+        assert_equal(repr(loaded[1]), repr(parts[1]))
+        assert_equal([n for n, nbrs in joined(loaded)], list(G.n))
+
+    def test_scaling(self):
+        # every chunk slices the order taken at the split, so many
+        # chunks cost about as much as one
+        from time import perf_counter
+        G = Graph()
+        G.e.update((i, i + 1) for i in range(40000))
+        def scan(k):
+            start = perf_counter()
+            for chunk in G.e.chunks(k):
+                for e in chunk:
+                    pass
+            for part in G.a.partition(k):
+                for n, nbrs in part:
+                    pass
+            return perf_counter() - start
+        one = min(scan(1) for _ in range(2))
+        many = min(scan(4000) for _ in range(2))
+        assert_true(many < 3 * one + 0.05)
+
+    def test_subgraph(self):
+        G = self.G
+        H = G.s(range(0, 20, 2))
+        for k in (1, 2, 7):
+            assert_equal(sorted(joined(H.e.chunks(k))), sorted(H.e))
+            assert_equal(sorted(joined(H.e.chunks(k, data=True))),
+                         sorted(H.e.items(), key=lambda item: item[0]))
+            parts = H.a.partition(k)
+            assert_true(len(parts) <= k)
+            nodes = [n for n, nbrs in joined(parts)]
+            assert_equal(sorted(nodes), sorted(H))
+            for n, nbrs in joined(parts):
+                assert_equal(sorted(nbrs), [m for m in sorted(G.a[n]) if m % 2 == 0])
+        assert_equal(G.s([]).e.chunks(2), [])
+        assert_equal(G.s([]).a.partition(2), [])
+
+    def test_dense(self):
+        D = Graph.from_adjacency_list([[1, 2], [2], [0]], dense=True)
+        assert_equal(joined(D.e.chunks(2)), list(D.e))
+
+
+class TestABCChunks(object):
+    def test_directed(self):
+        G = ABCgraph.Graph(directed=True)
+        G.e.update([(1, 2), (2, 1), (2, 3), (3, 3), (4, 1)])
+        assert_equal(joined(G.e.chunks(2)), list(G.e))
+        assert_equal([n for n, nbrs in joined(G.su.partition(2))], list(G.n))
+        assert_equal(sorted(joined(G.s([1, 2]).e.chunks(2))), [(1, 2), (2, 1)])
+
+    def test_multigraph(self):
+        G = ABCmultigraph.Graph(multigraph=True)
+        G.e.update([(1, 2), (1, 2), (2, 3, 'k', {'w': 1})])
+        assert_equal(joined(G.e.chunks(3)), list(G.e))
+        assert_equal(len(joined(G.e.chunks(2, data=True))), 3)
+
+
+class TestSharedChunks(object):
+    def test_by_name(self):
+        G = Graph((range(10), [(i, (i * 3) % 10, {'w': float(i)}) for i in range(10)]))
+        with sharedgraph.publish(G) as S:
+            chunks = S.e.chunks(3, data=True)
+            assert_equal([len(list(c)) for c in chunks], [3, 3, 4])
+            data = pickle.dumps(chunks)
+            assert_true(len(data) < 600)
+            loaded = pickle.loads(data)
+            assert_equal(joined(loaded), list(S.e.items()))
+            for chunk in loaded:
+                chunk._view._graph.close()
+            parts = pickle.loads(pickle.dumps(S.a.partition(2)))
+            assert_equal([(n, dict(nbrs)) for n, nbrs in joined(parts)],
+                         [(n, dict(S.a[n])) for n in S])
+            parts[0]._view._graph.close()
+            parts[1]._view._graph.close()
@@ -0,0 +1,64 @@
+#
+#   TESTS
+#
+from nose.tools import assert_true, assert_false, assert_equal, assert_raises
+from exception import NetworkXError
+
+from graph import Graph
+
+
+class TestComponents(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.e.update([(0,1), (1,2), (3,4)])
+        self.G.n.add(5)
+
+    def check(self, G):
+        # the index agrees with a fresh traversal of every node
+        index = G._versions.components
+        G.track_components(False)
+        expected = dict((n, G.component_of(n)) for n in G.n)
+        G._versions.components = index
+        for n in G.n:
+            assert_equal(G.component_of(n), expected[n])
+
+    def test_fallback(self):
+        G = self.G
+        assert_equal(G.component_of(1), {0, 1, 2})
+        assert_true(G.same_component(0, 2))
+        assert_false(G.same_component(0, 3))
+        assert_raises(NetworkXError, G.component_of, 9)
+
+    def test_insertions(self):
+        G = self.G
+        G.track_components()
+        assert_equal(G.component_of(0), {0, 1, 2})
+        assert_equal(G.component_of(5), {5})
+        G.e.add(2, 3)
+        G.e.update([(5, 6), (7, 8)])
+        G.n.add(9)
+        assert_true(G.same_component(0, 4))
+        assert_equal(G.component_of(6), {5, 6})
+        assert_equal(G.component_of(9), {9})
+        self.check(G)
+
+    def test_deletions(self):
+        G = self.G
+        G.track_components()
+        G.e.update([(2, 3), (4, 0)])
+        G.e.remove(1, 2)
+        assert_true(G.same_component(1, 2))   # still joined via 0-4-3-2
+        G.e.remove(4, 0)
+        assert_false(G.same_component(1, 2))
+        assert_equal(G.component_of(0), {0, 1})
+        G.e.add(1, 5)
+        G.n.discard(3)
+        G.n.remove_many([0])
+        assert_equal(G.component_of(2), {2})
+        assert_equal(G.component_of(4), {4})
+        assert_equal(G.component_of(5), {1, 5})
+        self.check(G)
+        G.e.clear()
+        assert_equal(G.component_of(5), {5})
+        G.n.clear()
+        assert_raises(NetworkXError, G.component_of, 5)
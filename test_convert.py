@@ -0,0 +1,164 @@
+#
+#   TESTS
+#
+import sys
+
+from nose import SkipTest
+from nose.tools import assert_false, assert_equal, assert_raises
+from exception import NetworkXError
+
+import convert
+from convert import (to_networkx_graph, register_converter,
+                     from_pandas_edgelist, to_pandas_edgelist)
+from graph import Graph
+import ABCgraph
+import ABCmultigraph
+
+
+class TestConverters(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.e.update([(1, 2, {'w': 1}), (2, 3)])
+        self.G.n.add(1, color='red')
+        self.G.data['name'] = 'g'
+
+    def test_graph_copies(self):
+        G = self.G
+        for H in (Graph(), ABCgraph.Graph(),
+                  ABCmultigraph.Graph(multigraph=True)):
+            to_networkx_graph(G, create_using=H)
+            assert_equal(sorted(H.n), [1, 2, 3])
+            assert_equal(H.n[1], {'color': 'red'})
+            assert_equal(H.e[(1, 2)], {'w': 1})
+            assert_equal(len(H.e), 2)
+            assert_equal(H.data, {'name': 'g'})
+        D = to_networkx_graph(G, create_using=ABCgraph.Graph(directed=True))
+        assert_equal(sorted(D.e), [(1, 2), (2, 1), (2, 3), (3, 2)])
+        M = ABCmultigraph.Graph(multigraph=True)
+        M.e.update([(1, 2, 'a', {'w': 1}), (1, 2, 'b', {'w': 2})])
+        H = to_networkx_graph(M, create_using=ABCmultigraph.Graph(multigraph=True))
+        assert_equal(sorted(H.e), [(1, 2, 'a'), (1, 2, 'b')])
+        H = to_networkx_graph(M, create_using=Graph())
+        assert_equal(dict(H.e.items()), {(1, 2): {'w': 2}})
+
+    def test_views_and_constructors(self):
+        G = self.G
+        H = to_networkx_graph(G.s([1, 2]), Graph())
+        assert_equal(sorted(H.n), [1, 2])
+        assert_equal(dict(H.e.items()), {(1, 2): {'w': 1}})
+        S = G.snapshot()
+        G.e.add(3, 4)
+        H = to_networkx_graph(S, Graph())
+        assert_equal(sorted(H.e), [(1, 2), (2, 3)])
+        assert_equal(H.n[1], {'color': 'red'})
+        for H in (Graph(G), ABCgraph.Graph(G),
+                  ABCmultigraph.Graph(G, multigraph=True)):
+            assert_equal(sorted(H.n), [1, 2, 3, 4])
+            assert_equal(H.e[(1, 2)], {'w': 1})
+            assert_equal(len(H.e), 3)
+            assert_equal(H.data, {'name': 'g'})
+        H = ABCgraph.Graph(G, name='h')
+        assert_equal(H.data, {'name': 'h'})
+        A = ABCgraph.Graph(G)
+        H = Graph(A)
+        assert_equal(sorted(H.e), [(1, 2), (2, 3), (3, 4)])
+        assert_equal(H.n[1], {'color': 'red'})
+        H.n[1]['color'] = 'blue'
+        assert_equal(A.n[1], {'color': 'red'})
+
+    def test_nx_target(self):
+        class NxLike(object):
+            # the networkx methods _copy_graph relies on
+            def __init__(self):
+                self.graph, self.nodes, self.edges = {}, {}, []
+            def is_directed(self):
+                return False
+            def is_multigraph(self):
+                return False
+            def clear(self):
+                self.__init__()
+            def add_nodes_from(self, nodes):
+                self.nodes.update(nodes)
+            def add_edges_from(self, edges):
+                self.edges.extend(edges)
+        H = to_networkx_graph(self.G, create_using=NxLike())
+        assert_equal(H.nodes, {1: {'color': 'red'}, 2: {}, 3: {}})
+        assert_equal(sorted(H.edges), [(1, 2, {'w': 1}), (2, 3, {})])
+        assert_equal(H.graph, {'name': 'g'})
+
+    def test_builtin_types(self):
+        assert_equal(sorted(to_networkx_graph({1: [2, 3]}, Graph()).e),
+                     [(1, 2), (1, 3)])
+        assert_equal(list(to_networkx_graph({1: {2: {}}, 2: {}}, Graph()).e),
+                     [(1, 2)])
+        assert_equal(list(to_networkx_graph(iter([(1, 2)]), Graph()).e),
+                     [(1, 2)])
+        # mixed values are rejected before anything is added
+        H = Graph()
+        assert_raises(TypeError, to_networkx_graph, {1: {2: {}}, 2: 3}, H)
+        assert_equal(len(H), 0)
+        assert_raises(NetworkXError, to_networkx_graph, 3.5, Graph())
+
+    def test_register(self):
+        class Pairs(object):
+            def __init__(self, pairs):
+                self.pairs = pairs
+        register_converter(Pairs, lambda data, create_using, multi:
+                           convert.from_edgelist(data.pairs, create_using))
+        try:
+            H = to_networkx_graph(Pairs([(1, 2)]), Graph())
+            assert_equal(list(H.e), [(1, 2)])
+        finally:
+            del convert._converters[Pairs]
+        # optional packages are never imported by dispatch
+        modules = set(sys.modules)
+        to_networkx_graph([(1, 2)], Graph())
+        assert_false(set(['numpy', 'pandas', 'scipy']) & (set(sys.modules) - modules))
+
+
+class TestPandas(object):
+    def setUp(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise SkipTest('pandas not available.')
+        self.df = pd.DataFrame({'source': [1, 2, 3], 'target': [2, 3, 1],
+                                'weight': [1.0, 2.0, 3.0],
+                                'kind': ['a', 'b', 'a']})
+
+    def test_from_edgelist(self):
+        G = from_pandas_edgelist(self.df, edge_attr=True)
+        assert_equal(G.e[(1, 2)], {'weight': 1.0, 'kind': 'a'})
+        assert_equal(len(G.e), 3)
+        G = from_pandas_edgelist(self.df, 'target', 'source', 'kind',
+                                 create_using=ABCgraph.Graph(directed=True))
+        assert_equal(sorted(G.e), [(1, 3), (2, 1), (3, 2)])
+        assert_equal(G.e[(1, 3)], {'kind': 'a'})
+        H = to_networkx_graph(self.df, Graph())
+        assert_equal(H.e[(3, 1)], {'weight': 3.0, 'kind': 'a'})
+        M = from_pandas_edgelist(self.df, edge_key='kind',
+                                 create_using=ABCmultigraph.Graph(multigraph=True))
+        assert_equal(sorted(M.e), [(1, 2, 'a'), (2, 3, 'b'), (3, 1, 'a')])
+
+    def test_unranked_nodes(self):
+        from nxgraph import nxGraph
+        G = nxGraph()
+        G.add_edge(1, 2)
+        G.node[3] = {}
+        G.adj[3] = {2: {'weight': 1.0}}
+        G.adj[2][3] = G.adj[3][2]
+        df = to_pandas_edgelist(G)
+        assert_equal(sorted(zip(df.source, df.target)), [(1, 2), (2, 3)])
+
+    def test_to_edgelist(self):
+        G = from_pandas_edgelist(self.df, edge_attr='weight')
+        G.e.add(4, 4)
+        df = to_pandas_edgelist(G)
+        assert_equal(list(df.columns), ['source', 'target', 'weight'])
+        rows = sorted(zip(df.source, df.target, df.weight.fillna(0)))
+        assert_equal(rows, [(1, 2, 1.0), (1, 3, 3.0), (2, 3, 2.0), (4, 4, 0)])
+        M = ABCmultigraph.Graph(multigraph=True)
+        M.e.update([(1, 2, 'a', {'w': 1}), (1, 2, 'b', {})])
+        df = to_pandas_edgelist(M)
+        assert_equal(list(df.key), ['a', 'b'])
+        assert_equal(len(to_pandas_edgelist(Graph()).columns), 2)
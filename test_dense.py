@@ -0,0 +1,89 @@
+#
+#   TESTS
+#
+from copy import deepcopy
+import pickle
+
+from nose.tools import assert_true, assert_false, assert_equal, assert_raises
+from exception import NetworkXError
+
+from dense import DenseDict
+from graph import Graph
+
+
+class TestDenseDict(object):
+    def setUp(self):
+        self.d = DenseDict({0: 'a', 3: 'b'})
+
+    def test_mapping(self):
+        d = self.d
+        assert_equal(len(d), 2)
+        assert_equal(list(d), [0, 3])
+        assert_equal(list(d.items()), [(0, 'a'), (3, 'b')])
+        assert_equal(d, {0: 'a', 3: 'b'})
+        assert_true(3 in d)
+        for key in (1, 4, -1, 'a', 1.5):
+            assert_false(key in d)
+            assert_raises(KeyError, d.__getitem__, key)
+        assert_equal(d.get(2, 'x'), 'x')
+        del d[3]
+        assert_equal(d._slots, ['a'])
+        assert_raises(KeyError, d.__delitem__, 3)
+        assert_raises(NetworkXError, d.__setitem__, -1, 'c')
+        assert_raises(NetworkXError, d.__setitem__, 'n', 'c')
+
+    def test_copy(self):
+        d = self.d
+        for c in (d.copy(), deepcopy(d), pickle.loads(pickle.dumps(d))):
+            c[1] = 'c'
+            assert_equal(dict(c.items()), {0: 'a', 1: 'c', 3: 'b'})
+        assert_equal(len(d), 2)
+
+
+class TestDenseGraph(object):
+    def setUp(self):
+        self.G = Graph.from_adjacency_list([[1, 2], [2], [3], [], [0]],
+                                          dense=True)
+
+    def test_constructors(self):
+        G = self.G
+        assert_true(G.dense)
+        assert_true(isinstance(G._nodedata, DenseDict))
+        H = Graph.from_adjacency_list([[1]])
+        assert_false(H.dense)
+        H.e.add('a', 0)   # dense storage is opt-in
+        assert_equal(set(H.a[0]), {1, 'a'})
+        assert_false(Graph().dense)
+        assert_true(Graph(dense=True).dense)
+        assert_true(G.copy(with_data=False).dense)
+        assert_equal(G.data, {})
+
+    def test_edges(self):
+        G = self.G
+        expected = [(0, 1), (0, 2), (0, 4), (1, 2), (2, 3)]
+        assert_equal(sorted(G.e), expected)
+        assert_equal(len(G.e), 5)
+        G.e.add(3, 3, w=1)
+        G.n.discard(0)
+        assert_equal(sorted(G.e), [(1, 2), (2, 3), (3, 3)])
+        assert_equal(dict(G.e.items())[(3, 3)], {'w': 1})
+        assert_equal(sorted(G.a[2]), [1, 3])
+        assert_raises(NetworkXError, G.n.add, 'x')
+        H = deepcopy(G)
+        assert_true(H.dense)
+        assert_equal(sorted(H.e), sorted(G.e))
+
+    def test_no_ordinals(self):
+        G = self.G
+        G.n.discard(1)
+        G.e.add(7, 0)
+        assert_equal(len(G._node_ordinals), 0)
+        index = G.node_index()
+        assert_equal(index.nodes, [0, 2, 3, 4, 7])
+        assert_equal(index[7], 4)
+        assert_equal(len(G._node_ordinals), 0)
+        assert_equal(sorted(G.s([0, 2, 4, 7]).e), [(0, 2), (0, 4), (0, 7)])
+        S = G.snapshot()
+        G.e.add(8, 8)
+        assert_equal(sorted(S.e), [(0, 2), (0, 4), (0, 7), (2, 3)])
+        assert_equal(sorted(pickle.loads(pickle.dumps(G)).e), sorted(G.e))
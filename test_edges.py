@@ -105,6 +105,25 @@ class BaseEdgeTests(object):
         assert_equal(Ge - extras, set(edgs) - set(extras) )
         assert_equal(extras - Ge, set(extras) - set(edgs) )
 
+    def test_where(self):
+        Ge = self.Ge
+        Ge.update([(4,5,{'type':'a','w':3}), (5,6,{'type':'b','w':1}),
+                   (6,7,{'type':'a','w':2})])
+        scanned = sorted(Ge.where(type='a'))
+        Ge.add_index('type')
+        Ge.add_index('w', 'sorted')
+        assert_equal(sorted(Ge.where(type='a')), scanned)
+        assert_equal(sorted(Ge.where(type='a')), [(4,5), (6,7)])
+        assert_equal(Ge.where(w__gt=1, w__le=3), [(6,7), (4,5)])
+        assert_equal(Ge.where(type='a', w__lt=3), [(6,7)])
+        # indexes follow mutation
+        Ge.add(5,6,type='a')
+        Ge.remove(4,5)
+        assert_equal(sorted(Ge.where(type='a')), [(5,6), (6,7)])
+        assert_equal(Ge.where(w__ge=3), [])
+        Ge.clear()
+        assert_equal(Ge.where(type='a'), [])
+
 class TestDiEdges(BaseEdgeTests):
     def setUp(self):
         node ={4:{}}
@@ -122,3 +141,100 @@ class TestUndiEdges(BaseEdgeTests):
         self.setup_edges()
 
 
+
+
+class TestGraphEdgeIndexes(object):
+    def setUp(self):
+        from graph import Graph
+        self.G = Graph()
+        self.G.e.update([(1,2,{'type':'t','w':5}), (2,3,{'type':'u','w':1}),
+                         (3,4,{'type':'t','w':2})])
+        self.G.e.add_index('type')
+        self.G.e.add_index('w', 'sorted')
+
+    def test_where(self):
+        G = self.G
+        assert_equal(sorted(G.e.where(type='t')), [(1,2), (3,4)])
+        assert_equal(G.e.where(w__gt=1), [(3,4), (1,2)])
+        G.e.add(3,2,type='t')
+        assert_equal(sorted(G.e.where(type='t')), [(1,2), (3,2), (3,4)])
+        G.e.remove(2,3)
+        assert_equal(sorted(G.e.where(type='t')), [(1,2), (3,4)])
+
+    def test_node_removal(self):
+        G = self.G
+        G.n.remove(4)
+        assert_equal(G.e.where(type='t'), [(1,2)])
+        G.n.remove_many([1])
+        assert_equal(G.e.where(type='t'), [])
+        assert_equal(G.e.where(w__ge=0), [(2,3)])
+        # subgraph views scan
+        G.e.add(5,6,type='t')
+        assert_equal(G.s([5,6]).e.where(type='t'), [(5,6)])
+
+    def test_rejected_values(self):
+        from exception import NetworkXError
+        G = self.G
+        # checked before anything is stored
+        assert_raises(NetworkXError, G.e.add, 5, 6, w='high')
+        assert_true(5 not in G.n)
+        assert_raises(NetworkXError, G.e.add, 1, 2, type=['t'])
+        assert_equal(G.e[(1,2)]['type'], 't')
+        assert_raises(NetworkXError, G.e.update, [(7,8,{'w':None})])
+        assert_equal(G.e.where(w__lt=100), [(2,3), (3,4), (1,2)])
+
+    def test_update_scaling(self):
+        # updating an indexed edge costs O(log E), not a rebuild
+        from graph import Graph
+        from time import perf_counter
+        def updates(size):
+            G = Graph()
+            G.e.update((i, i + 1, {'w': float(i)}) for i in range(size))
+            G.e.add_index('w', 'sorted')
+            start = perf_counter()
+            for i in range(0, 2000):
+                G.e.add(i, i + 1, w=-float(i))
+            took = perf_counter() - start
+            assert_equal(len(G.e.where(w__lt=0)), 1999)
+            return took
+        small = min(updates(2000) for _ in range(2))
+        large = min(updates(32000) for _ in range(2))
+        assert_true(large < 8 * small + 0.05)
+
+
+class TestInternAttrs(object):
+    def setUp(self):
+        from graph import Graph
+        self.G = Graph()
+        self.G.e.update([(1,2), (2,3), (3,4)], type='follows')
+        self.G.e.add(4,5, type='follows', tags=['x'])
+
+    def test_shared_records(self):
+        from exception import NetworkXError
+        G = self.G
+        G.e.intern_attrs()
+        G.e.add(5,6, type='follows')
+        assert_true(G.a[1][2] is G.a[3][4])
+        assert_true(G.a[5][6] is G.a[2][3])
+        assert_true(G.a[4][5] is not G.a[1][2])   # unhashable value
+        assert_raises(NetworkXError, G.a[1][2].__setitem__, 'w', 1)
+        # writes through G.e[(u, v)] clone the record for that edge
+        G.e[(2,1)]['type'] = 'blocks'
+        assert_equal(G.e[(1,2)], {'type': 'blocks'})
+        assert_equal(G.a[2][3], {'type': 'follows'})
+        G.e.add(3,4, type='blocks')
+        assert_true(G.a[3][4] is G.a[1][2])
+        del G.e[(3,4)]['type']
+        assert_equal(G.a[4][3], {})
+        G.e.intern_attrs(False)
+        G.a[1][2]['w'] = 1
+        assert_equal(G.e[(1,2)], {'type': 'blocks', 'w': 1})
+        assert_equal(G.a[2][3], {'type': 'follows'})
+
+    def test_indexes(self):
+        G = self.G
+        G.e.intern_attrs()
+        G.e.add_index('type')
+        G.e[(2,3)]['type'] = 'blocks'
+        assert_equal(sorted(G.e.where(type='follows')), [(1,2), (3,4), (4,5)])
+        assert_equal(G.e.where(type='blocks'), [(2,3)])
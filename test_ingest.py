@@ -0,0 +1,128 @@
+#
+#   TESTS
+#
+import asyncio
+import time
+
+from nose.tools import assert_true, assert_equal, assert_raises
+from exception import NetworkXError
+
+import ABCgraph
+from graph import Graph
+from ingest import Ingest, ingest
+
+
+async def stream(events, delay=None):
+    for event in events:
+        if delay is not None:
+            await asyncio.sleep(delay)
+        yield event
+
+
+class TestIngest(object):
+    def setUp(self):
+        self.G = Graph()
+        self.events = [('add_edge', (1, 2), {'w': 1}), ('add_edge', (2, 3), None),
+                       ('add_node', 9, {'color': 'red'}), ('add_node', 3, None),
+                       ('remove_edge', (1, 2), None), ('add_edge', (3, 4), None),
+                       ('remove_node', 4, None)]
+
+    def test_apply_events(self):
+        G = self.G
+        stats = asyncio.run(ingest(G, stream(self.events), batch_size=3))
+        assert_equal(sorted(G.e), [(2, 3)])
+        assert_equal(G.n[9], {'color': 'red'})
+        assert_equal(sorted(G.n), [1, 2, 3, 9])
+        assert_equal(stats.events, 7)
+        assert_equal(stats.batches, 3)
+        assert_equal(stats.pending, 0)
+        assert_true(stats.max_lag >= stats.lag > 0)
+
+    def test_time_flush(self):
+        G = self.G
+        seen = []
+        class Slow(Ingest):
+            def apply(self, events):
+                seen.append(len(events))
+                Ingest.apply(self, events)
+        stats = asyncio.run(Slow(G, batch_size=100, max_delay=0.02).run(
+            stream(self.events[:3], delay=0.05)))
+        assert_equal(seen, [1, 1, 1])
+        assert_equal(sorted(G.e), [(1, 2), (2, 3)])
+
+    def test_backpressure(self):
+        G = self.G
+        read = []
+        async def produce():
+            for i in range(100):
+                read.append(i)
+                yield ('add_edge', (i, i + 1), None)
+        async def main():
+            I = Ingest(G, batch_size=5, max_pending=2)
+            G._versions.lock.acquire()   # stall the writer
+            task = asyncio.ensure_future(I.run(produce()))
+            await asyncio.sleep(0.1)
+            stalled = len(read)
+            G._versions.lock.release()
+            stats = await task
+            return stalled, stats
+        stalled, stats = asyncio.run(main())
+        # one batch being applied, two queued, one waiting to be queued
+        assert_true(stalled <= 5 * 5)
+        assert_equal(stats.events, 100)
+        assert_equal(len(G.e), 100)
+
+    def test_errors(self):
+        bad = [('add_edge', (1, 2), None), ('remove_edge', (5, 6), None)]
+        assert_raises(NetworkXError, asyncio.run, ingest(self.G, stream(bad)))
+        bad = [('frobnicate', 1, None)]
+        assert_raises(NetworkXError, asyncio.run, ingest(self.G, stream(bad)))
+        assert_raises(NetworkXError, Ingest, self.G, batch_size=0)
+
+    def test_atomic_batches(self):
+        G = self.G
+        G.e.add(1, 2)
+        I = Ingest(G)
+        for bad in ([('add_edge', (3, 4), None), ('remove_edge', (5, 6), None)],
+                    [('add_node', 7, None), ('remove_node', 1, None),
+                     ('remove_edge', (2, 1), None)],
+                    [('remove_edge', (1, 2), None), ('remove_edge', (2, 1), None)],
+                    [('add_node', 7, None), ('add_node', 8, ['color'])],
+                    [('add_node', 7, None), ('add_edge', 7, None)],
+                    [('add_node', 7, None), ('frobnicate', 1, None)]):
+            assert_raises(NetworkXError, I.apply, bad)
+            assert_equal(sorted(G.n), [1, 2])
+            assert_equal(list(G.e), [(1, 2)])
+        I.apply([('remove_edge', (2, 1), None), ('add_edge', (1, 2), None),
+                 ('remove_node', 2, None), ('add_edge', (2, 1), None),
+                 ('remove_edge', (1, 2), None), ('remove_node', 5, None)])
+        assert_equal(sorted(G.n), [1, 2])
+        assert_equal(list(G.e), [])
+
+    def test_error_waits_for_writer(self):
+        applied = []
+        class Slow(Ingest):
+            def apply(self, events):
+                time.sleep(0.1)
+                Ingest.apply(self, events)
+                applied.append(len(events))
+        async def events():
+            yield ('add_edge', (1, 2), None)
+            await asyncio.sleep(0.02)
+            raise ValueError('stream broke')
+        async def main():
+            try:
+                await Slow(self.G, max_delay=0.01).run(events())
+            except ValueError:
+                return list(applied)
+        assert_equal(asyncio.run(main()), [1])
+        assert_equal(list(self.G.e), [(1, 2)])
+
+    def test_abcgraph(self):
+        G = ABCgraph.Graph(directed=True)
+        asyncio.run(ingest(G, stream(self.events)))
+        assert_equal(sorted(G.e), [(2, 3)])
+        bad = [('add_edge', (7, 8), None), ('remove_edge', (3, 2), None)]
+        assert_raises(NetworkXError, Ingest(G).apply, bad)
+        assert_equal(sorted(G.e), [(2, 3)])
+        assert_equal(G.n[9], {'color': 'red'})
@@ -0,0 +1,81 @@
+#
+#   TESTS
+#
+from nose.tools import assert_true, assert_equal, assert_raises
+from exception import NetworkXError
+
+from graph import Graph
+from journal import replay
+
+
+class TestJournal(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.e.add(0, 1)
+
+    def test_entries(self):
+        G = self.G
+        J = G.start_journal()
+        G.n.add(5, color='red')
+        G.e.update([(1, 2), (2, 3, {'w': 2})], kind='x')
+        G.e.remove(1, 2)
+        G.n.remove_many([0, 9])
+        ops = [(e.op, e.key, e.attrs) for e in J.drain()]
+        assert_equal(ops, [('add_node', 5, {'color': 'red'}),
+                           ('add_edge', (1, 2), {'kind': 'x'}),
+                           ('add_edge', (2, 3), {'kind': 'x', 'w': 2}),
+                           ('remove_edge', (1, 2), None),
+                           ('remove_node', 0, None)])
+        assert_equal(len(J), 0)
+        assert_equal(J.seq, 5)
+        assert_true(G.stop_journal() is J)
+        G.e.add(7, 8)
+        assert_equal(J.seq, 5)
+
+    def test_replay(self):
+        G = self.G
+        R = Graph()
+        R.e.add(0, 1)
+        J = G.start_journal()
+        G.e.add(1, 2, weight=3)
+        G.n.add(4, color='red')
+        last = replay(J.drain(limit=1), R)
+        assert_equal(sorted(R.n), [0, 1, 2])
+        G.e.add(1, 2, weight=4)
+        G.n.discard(0)
+        last = replay(J.drain(), R, last)
+        assert_equal(sorted(R.n), [1, 2, 4])
+        assert_equal(R.e[(1, 2)], {'weight': 4})
+        assert_equal(R.n[4], {'color': 'red'})
+        G.e.clear()
+        replay(J.drain(), R, last)
+        assert_equal(len(R.e), 0)
+        assert_equal(sorted(R.n), sorted(G.n))
+
+    def test_proxy_and_schema(self):
+        G = self.G
+        R = Graph()
+        R.e.add(0, 1)
+        J = G.start_journal()
+        G.e.intern_attrs()
+        G.e.add(1, 2, w=1, kind='x')
+        G.e[(1, 2)]['w'] = 5
+        del G.e[(1, 2)]['kind']
+        G.set_schema(node={'size': int})
+        G.n.add(1, size='3')
+        ops = [(e.op, e.key, e.attrs) for e in J]
+        assert_equal(ops[1:3], [('replace_edge', (1, 2), {'w': 5, 'kind': 'x'}),
+                                ('replace_edge', (1, 2), {'w': 5})])
+        replay(J.drain(), R)
+        assert_equal(dict(R.e[(1, 2)]), {'w': 5})
+        assert_equal(R.n[1]['size'], 3)
+
+    def test_bounded(self):
+        G = self.G
+        J = G.start_journal(maxlen=2)
+        G.e.update([(1, 2), (2, 3), (3, 4)])
+        assert_equal(len(J), 2)
+        assert_equal(J.dropped, 1)
+        assert_equal([e.seq for e in J], [2, 3])
+        # a replica that applied up to seq 0 notices the lost entry
+        assert_raises(NetworkXError, replay, J.drain(), Graph(), 0)
@@ -0,0 +1,109 @@
+#
+#   TESTS
+#
+from nose import SkipTest
+from nose.tools import assert_true, assert_equal
+
+import ABCgraph
+import ABCmultigraph
+from graph import Graph
+
+
+class TestLinearOperators(object):
+    def setUp(self):
+        try:
+            import numpy
+            import scipy.sparse.linalg
+        except ImportError:
+            raise SkipTest('numpy and scipy not available.')
+        self.np = numpy
+        self.G = Graph()
+        self.G.e.update([(0, 1, {'weight': 2.0}), (1, 2), (2, 0, {'weight': 3.0}),
+                         (2, 2, {'weight': 5.0})])
+        self.G.n.add(3)
+
+    def dense(self, view, weight='weight'):
+        # reference adjacency built from the view
+        nodes = view.csr(weight).nodes
+        index = dict((n, i) for i, n in enumerate(nodes))
+        A = self.np.zeros((len(nodes), len(nodes)))
+        for u in nodes:
+            for v in set(view[u]):
+                dd = view[u][v]
+                A[index[u], index[v]] = 1 if weight is None else dd.get(weight, 1)
+        return A
+
+    def check_operators(self, view, A):
+        np = self.np
+        x = np.arange(1.0, len(A) + 1)
+        X = np.vstack([x, x[::-1]]).T
+        d = A.sum(axis=1)
+        L = np.diag(d) - A
+        s = np.array([1 / np.sqrt(v) if v else 0 for v in d])
+        N = s[:, None] * L * s
+        for op, M in ((view.as_linear_operator(), A),
+                      (view.laplacian_operator(), L),
+                      (view.normalized_laplacian_operator(), N)):
+            assert_true(np.allclose(op.matvec(x), M @ x))
+            assert_true(np.allclose(op.matmat(X), M @ X))
+            assert_true(np.allclose(op.rmatvec(x), M.T @ x))
+
+    def test_graph(self):
+        G = self.G
+        A = self.dense(G.a)
+        assert_equal(A[2, 2], 5.0)
+        assert_true((A == A.T).all())
+        assert_true((G.a.csr().matrix.toarray() == A).all())
+        self.check_operators(G.a, A)
+        assert_true((G.a.csr(None).matrix.toarray() == self.dense(G.a, None)).all())
+        H = Graph()
+        H.e.update([('a', 'b', {'weight': 2.0}), ('b', 'c'), ('c', 'c')])
+        assert_equal(H.a.csr().nodes, ['a', 'b', 'c'])
+        self.check_operators(H.a, self.dense(H.a))
+
+    def test_cached(self):
+        G = self.G
+        first = G.a.csr()
+        assert_true(G.a.csr() is first)
+        G.e.add(1, 3)
+        second = G.a.csr()
+        assert_true(second is not first)
+        assert_equal(second.matrix[second.nodes.index(1), second.nodes.index(3)], 1)
+
+    def test_eigsh(self):
+        from scipy.sparse.linalg import eigsh
+        np = self.np
+        n = 50
+        G = Graph((range(n), [(i, (i + 1) % n) for i in range(n)]))
+        vals = eigsh(G.a.laplacian_operator(), k=3, which='LA',
+                     return_eigenvectors=False)
+        # the cycle's Laplacian spectrum tops out at 4
+        assert_true(np.allclose(max(vals), 4.0))
+
+    def test_directed(self):
+        np = self.np
+        G = ABCgraph.Graph(directed=True)
+        G.e.update([(0, 1, {'weight': 2.0}), (1, 2), (2, 2)])
+        S = G.su.csr().matrix.toarray()
+        P = G.pr.csr().matrix.toarray()
+        assert_true((S == P.T).all())
+        assert_equal(S[0, 1], 2.0)
+        A = G.a.csr().matrix.toarray()
+        assert_true((A == S + S.T - np.diag(np.diag(S))).all())
+        self.check_operators(G.su, S)
+
+    def test_undirected_abc(self):
+        G = ABCgraph.Graph()
+        G.e.update([(0, 1, {'weight': 2.0}), (1, 2), (2, 2, {'weight': 4.0})])
+        A = G.a.csr().matrix.toarray()
+        assert_true((A == self.np.array([[0, 2, 0], [2, 0, 1], [0, 1, 4]])).all())
+        self.check_operators(G.a, A)
+
+    def test_multigraph(self):
+        G = ABCmultigraph.Graph(multigraph=True)
+        G.e.update([(0, 1, {'weight': 2.0}), (0, 1, {'weight': 3.0}), (1, 2)])
+        A = G.a.csr().matrix.toarray()
+        assert_equal(A[0, 1], 5.0)
+        assert_equal(A[1, 0], 5.0)
+        assert_equal(G.a.csr(multigraph_weight=max).matrix[0, 1], 3.0)
+        assert_equal(G.a.csr(None).matrix[1, 0], 2.0)
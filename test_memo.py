@@ -0,0 +1,77 @@
+#
+#   TESTS
+#
+from copy import deepcopy
+
+from nose.tools import assert_true, assert_equal, assert_raises
+
+from graph import Graph
+
+
+class TestCached(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.e.update([(0,1), (1,2)])
+        self.calls = []
+
+    def degrees(self, G, weight=None):
+        self.calls.append(weight)
+        return dict(G.n.degree(weight))
+
+    def test_epoch(self):
+        G = self.G
+        epoch = G.epoch
+        G.e.add(2, 3)
+        assert_true(G.epoch > epoch)
+        epoch = G.epoch
+        G.n.discard(0)
+        G.n.add(1, color='red')
+        assert_equal(G.epoch, epoch + 2)
+        assert_equal(len(list(G.e)), 2)
+        assert_equal(G.epoch, epoch + 2)
+
+    def test_noop_keeps_epoch(self):
+        from exception import NetworkXError
+        G = self.G
+        epoch = G.epoch
+        G.n.discard(99)
+        G.n.remove_many([98, 99])
+        G.n.add(1)
+        G.n.update([0, 1])
+        G.e.add(0, 1)
+        G.e.update([])
+        G.e.add_index('w')
+        assert_equal(G.epoch, epoch)
+        assert_raises(NetworkXError, G.n.remove, 99)
+        assert_raises(NetworkXError, G.e.remove, 0, 2)
+        assert_raises(NetworkXError, G.e.add, 0, 2, [])
+        assert_equal(G.epoch, epoch)
+        G.n.update([0, 5])
+        assert_equal(G.epoch, epoch + 1)
+
+    def test_reuse_and_invalidate(self):
+        G = self.G
+        d = G.cached(self.degrees)
+        assert_true(G.cached(self.degrees) is d)
+        G.cached(self.degrees, weight='w')
+        assert_equal(self.calls, [None, 'w'])
+        G.e.add(2, 3)
+        assert_equal(G.cached(self.degrees)[3], 1)
+        assert_equal(self.calls, [None, 'w', None])
+        info = G.cache_info()
+        assert_equal((info.hits, info.misses, info.stale, info.currsize),
+                     (1, 2, 1, 2))
+
+    def test_lru(self):
+        G = self.G
+        G.cache_clear(maxsize=2)
+        for w in ['a', 'b', 'a', 'c', 'b']:
+            G.cached(self.degrees, weight=w)
+        # 'b' was evicted by 'c' since 'a' was used more recently
+        assert_equal(self.calls, ['a', 'b', 'c', 'b'])
+        assert_equal(G.cache_info().currsize, 2)
+        H = deepcopy(G)
+        assert_equal(H.cache_info().currsize, 0)
+        H.cached(self.degrees)
+        H.e.add(5, 6)
+        assert_equal(H.cached(self.degrees)[5], 1)
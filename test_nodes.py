@@ -0,0 +1,190 @@
+#
+#   TESTS
+#
+from nose.tools import assert_true, assert_equal
+
+from graph import Graph
+from nodes import NodeSetExpr
+
+
+class TestNodeSetOps(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.e.update([(0,1), (1,2), (2,3), (3,4)])
+        self.nodes = {0, 1, 2, 3, 4}
+
+    def test_set_ops(self):
+        G = self.G
+        extras = [3, 4, 5, 6]
+        assert_equal(G.n & extras, self.nodes & set(extras))
+        assert_equal(G.n | extras, self.nodes | set(extras))
+        assert_equal(G.n ^ extras, self.nodes ^ set(extras))
+        assert_equal(G.n - extras, self.nodes - set(extras))
+        assert_equal(set(extras) - G.n, set(extras) - self.nodes)
+        assert_equal(set(extras) & G.n, set(extras) & self.nodes)
+        # generators are materialized once
+        assert_equal(G.n & (n for n in extras), {3, 4})
+
+    def test_intersection_iterates_smaller(self):
+        G = self.G
+        class Probe(set):
+            def __iter__(probe):
+                probe.iterated = True
+                return set.__iter__(probe)
+        small = Probe([1, 7])
+        assert_equal(G.n & small, {1})
+        assert_true(small.iterated)
+
+    def test_lazy_views(self):
+        G = self.G
+        expr = (G.n.keys() & {1, 2, 3, 9}) - {2}
+        assert_true(isinstance(expr, NodeSetExpr))
+        assert_equal(expr, {1, 3})
+        assert_true(1 in expr)
+        assert_true(2 not in expr)
+        assert_equal(len(expr), 2)
+        # views are live: they see later mutation of the graph
+        G.n.add(9)
+        assert_equal(expr, {1, 3, 9})
+        G.n.discard(1)
+        assert_equal(sorted(expr), [3, 9])
+        assert_equal(G.n.keys() | {10}, self.nodes - {1} | {9, 10})
+        assert_equal(G.n.keys() ^ {0, 10}, {2, 3, 4, 9, 10})
+
+    def test_intersection_update(self):
+        G = self.G
+        G.n &= [1, 2, 7]
+        assert_equal(set(G.n), {1, 2})
+        assert_equal(list(G.e), [(1, 2)])
+
+    def test_remove_many(self):
+        G = self.G
+        G.e.update([(0,2), (4,4), (5,6)])
+        # edges 0-1, 1-2, 2-3, 3-4, 0-2, 4-4 touch {1, 2, 4, 9}
+        assert_equal(G.n.remove_many([1, 2, 4, 9]), 6)
+        assert_equal(sorted(G.n), [0, 3, 5, 6])
+        assert_equal(sorted(G.e), [(5, 6)])
+        assert_equal(G._adjacency, {0: {}, 3: {}, 5: {6: {}}, 6: {5: {}}})
+        G.n -= [5]
+        assert_equal(G._adjacency, {0: {}, 3: {}, 6: {}})
+
+
+class TestNodeIndexes(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.n.update([(1, {'region': 'eu', 'size': 5}),
+                         (2, {'region': 'us', 'size': 1}),
+                         (3, {'region': 'eu', 'size': 9})])
+        self.G.e.update([(1, 2), (2, 3)])
+
+    def test_where(self):
+        G = self.G
+        scanned = sorted(G.n.where(region='eu'))
+        G.n.add_index('region')
+        G.n.add_index('size', 'sorted')
+        assert_equal(sorted(G.n.where(region='eu')), scanned)
+        assert_equal(G.n.where(size__gt=1), [1, 3])
+        assert_equal(G.n.where(region='eu', size__lt=9), [1])
+        assert_equal(sorted(G.s(G.n.where(region='eu')).n), [1, 3])
+
+    def test_consistency(self):
+        G = self.G
+        G.n.add_index('region')
+        G.n.add_index('size', 'sorted')
+        G.n[2]['region'] = 'eu'            # direct writes are tracked
+        del G.n[1]['region']
+        G.n.add(4, region='eu', size=2)
+        G.n.update([(5, {'region': 'eu'})])
+        G.e.add(6, 7)
+        G.n[6].update(region='eu')
+        assert_equal(sorted(G.n.where(region='eu')), [2, 3, 4, 5, 6])
+        G.n.discard(3)
+        G.n.remove_many([5, 6])
+        assert_equal(sorted(G.n.where(region='eu')), [2, 4])
+        assert_equal(G.n.where(size__ge=2), [4, 1])
+        assert_equal(G.n[4], {'region': 'eu', 'size': 2})
+        G.n.clear()
+        assert_equal(G.n.where(region='eu'), [])
+
+
+class TestNodeOrdinals(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.e.update([(0,1), (1,2), (2,2), (2,0)])
+
+    def test_edges_once(self):
+        G = self.G
+        assert_equal(len(G.e), 4)
+        assert_equal(len(list(G.e)), 4)
+        G.n.discard(0)
+        G.e.add(0, 1)
+        G.e.add(3, 1)
+        edges = list(G.e)
+        assert_equal(len(edges), len(G.e))
+        assert_equal({frozenset(e) for e in edges},
+                     {frozenset(e) for e in [(0,1), (1,2), (2,2), (1,3)]})
+        assert_equal(len(G._node_ordinals), len(G.n))
+
+    def test_node_index(self):
+        G = self.G
+        G.e.update([(3, 4), (4, 5)])
+        index = G.node_index()
+        assert_equal(index.nodes, [0, 1, 2, 3, 4, 5])
+        G.n.remove_many([1, 3])
+        G.n.add(9)        # reuses a released id
+        assert_true(index[9] in (1, 3))
+        index = G.node_index()
+        assert_equal(sorted(index.values()), list(range(len(G.n))))
+        assert_equal([index[n] for n in index.nodes], list(range(len(G.n))))
+        assert_equal(G.node_index(), index)
+        assert_equal(G.a.list(), [[index[nbr] for nbr in G.a[n]]
+                                  for n in index.nodes])
+
+    def test_intern_keys(self):
+        G = Graph()
+        a, b = 'urn:node:' + 'a', 'urn:node:' + 'b'
+        G.e.add(a, b)
+        G.intern_keys()
+        a2, b2 = ''.join(['urn:node:', 'a']), ''.join(['urn:node:', 'b'])
+        assert_true(a2 is not a)
+        G.e.update([(a2, 'c'), ('c', b2)])
+        assert_true(next(k for k in G.a['c'] if k == a2) is a)
+        assert_true(next(k for k in G.a['c'] if k == b2) is b)
+        assert_equal(sorted(G.a['c']), [a, b])
+
+
+class TestFactories(object):
+    def setUp(self):
+        class Tagged(dict):
+            def copy(self):
+                return self.__class__(self)
+        class NbrDict(Tagged): pass
+        class NodeAttr(Tagged): pass
+        class EdgeAttr(Tagged): pass
+        class OuterDict(Tagged): pass
+        class TaggedGraph(Graph):
+            node_dict_factory = OuterDict
+            adjlist_outer_dict_factory = OuterDict
+            adjlist_inner_dict_factory = NbrDict
+            node_attr_dict_factory = NodeAttr
+            edge_attr_dict_factory = EdgeAttr
+        self.types = OuterDict, NbrDict, NodeAttr, EdgeAttr
+        self.G = TaggedGraph()
+
+    def test_insertion_paths(self):
+        G = self.G
+        OuterDict, NbrDict, NodeAttr, EdgeAttr = self.types
+        G.n.add(0, color='red')
+        G.e.add(1, 2, weight=3)
+        G.e.update([(2, 3), (3, 4, {'weight': 1})])
+        S = G.snapshot()
+        G.e.add(2, 3, weight=2)   # copies shared dicts, keeping their type
+        assert_true(type(G._nodedata) is OuterDict)
+        assert_true(type(G._adjacency) is OuterDict)
+        assert_true(all(type(nbrs) is NbrDict for nbrs in G._adjacency.values()))
+        assert_true(all(type(G.n[n]) is NodeAttr for n in G.n))
+        assert_true(all(type(d) is EdgeAttr for e, d in G.e.items()))
+        assert_equal(G.n[0], {'color': 'red'})
+        assert_equal(G.e[(3, 2)], {'weight': 2})
+        G.e.clear()
+        assert_true(all(type(nbrs) is NbrDict for nbrs in G._adjacency.values()))
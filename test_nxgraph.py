@@ -11,6 +11,7 @@
 from nose.tools import (assert_equal, assert_raises, assert_true, raises,
                         assert_not_equal)
 import networkx
+from exception import NetworkXError
 from nxgraph import nxGraph
 from nodes import Nodes
 from edges import Edges
@@ -53,14 +54,14 @@ class BaseGraphTester(object):
     def test_neighbors(self):
         G=self.K3
         assert_equal(sorted(G.neighbors(0)),[1,2])
-        assert_raises((KeyError,networkx.NetworkXError), G.neighbors,-1)
+        assert_raises((KeyError,NetworkXError), G.neighbors,-1)
 
     def test_edges(self):
         G=self.K3
         assert_equal(sorted(G.edges()),[(0,1),(0,2),(1,2)])
         assert_equal(sorted(G.edges(0)),[(0,1),(0,2)])
         f=lambda x:list(G.edges(x))
-        assert_raises((KeyError,networkx.NetworkXError), f, -1)
+        assert_raises((KeyError,NetworkXError), f, -1)
 
     def test_weighted_degree(self):
         G=self.Graph()
@@ -140,17 +141,17 @@ class BaseGraphTester(object):
         # node not in graph doesn't get caught upon creation of iterator
         bunch=G.nbunch_iter(-1)
         # but gets caught when iterator used
-        assert_raises(networkx.NetworkXError,list,bunch)
+        assert_raises(NetworkXError,list,bunch)
         # unhashable doesn't get caught upon creation of iterator
         bunch=G.nbunch_iter([0,1,2,{}])
         # but gets caught when iterator hits the unhashable
-        assert_raises(networkx.NetworkXError,list,bunch)
+        assert_raises(NetworkXError,list,bunch)
 
-    @raises(networkx.NetworkXError)
+    @raises(NetworkXError)
     def test_nbunch_iter_node_fails_format(self):
         """Tests that a node that would have failed string formatting
         doesn't cause an error when attempting to raise a
-        :exc:`networkx.NetworkXError`.
+        :exc:`NetworkXError`.
 
         For more information, see pull request #1813.
 
@@ -208,7 +209,7 @@ class BaseAttrGraphTester(BaseGraphTester):
         G.add_edge(1,2,foo=ll)
         G.add_edge(2,1,foo=ll)
         # attr_dict must be dict
-        assert_raises(networkx.NetworkXError,G.add_edge,0,1,attr_dict=[])
+        assert_raises(NetworkXError,G.add_edge,0,1,attr_dict=[])
 
     def test_name(self):
         G=self.Graph(name='')
@@ -420,7 +421,7 @@ class BaseAttrGraphTester(BaseGraphTester):
         # attr_dict must be dict
         G=self.Graph()
         edges=[(1,2)]
-        assert_raises(networkx.NetworkXError,G.add_edges_from,edges,
+        assert_raises(NetworkXError,G.add_edges_from,edges,
                       attr_dict=[])
 
     def test_to_undirected(self):
@@ -504,7 +505,7 @@ class TestGraph(BaseAttrGraphTester):
         G=self.K3
         assert_equal(G[0],{1: {}, 2: {}})
         assert_raises(KeyError, G.__getitem__, 'j')
-        assert_raises((TypeError,networkx.NetworkXError), G.__getitem__, ['A'])
+        assert_raises((TypeError,NetworkXError), G.__getitem__, ['A'])
 
     def test_add_node(self):
         G=self.Graph()
@@ -514,8 +515,8 @@ class TestGraph(BaseAttrGraphTester):
         G.add_node(1,c='red')
         G.add_node(2,{'c':'blue'})
         G.add_node(3,{'c':'blue'},c='red')
-        assert_raises(networkx.NetworkXError, G.add_node, 4, [])
-        assert_raises(networkx.NetworkXError, G.add_node, 4, 4)
+        assert_raises(NetworkXError, G.add_node, 4, [])
+        assert_raises(NetworkXError, G.add_node, 4, 4)
         assert_equal(G.node[1]['c'],'red')
         assert_equal(G.node[2]['c'],'blue')
         assert_equal(G.node[3]['c'],'red')
@@ -559,7 +560,7 @@ class TestGraph(BaseAttrGraphTester):
         G=self.K3
         G.remove_node(0)
         assert_equal(G.adj,{1:{2:{}},2:{1:{}}})
-        assert_raises((KeyError,networkx.NetworkXError), G.remove_node,-1)
+        assert_raises((KeyError,NetworkXError), G.remove_node,-1)
 
         # generator here to implement list,set,string...
     def test_remove_nodes_from(self):
@@ -589,9 +590,9 @@ class TestGraph(BaseAttrGraphTester):
                 2: {0:{'weight':3,'data':2}, 1:{'data':4}} \
                 })
 
-        assert_raises(networkx.NetworkXError,
+        assert_raises(NetworkXError,
                       G.add_edges_from,[(0,)])  # too few in tuple
-        assert_raises(networkx.NetworkXError,
+        assert_raises(NetworkXError,
                       G.add_edges_from,[(0,1,2,3)])  # too many in tuple
         assert_raises(TypeError, G.add_edges_from,[0])  # not a tuple
 
@@ -600,7 +601,7 @@ class TestGraph(BaseAttrGraphTester):
         G=self.K3
         G.remove_edge(0,1)
         assert_equal(G.adj,{0:{2:{}},1:{2:{}},2:{0:{},1:{}}})
-        assert_raises((KeyError,networkx.NetworkXError), G.remove_edge,-1,0)
+        assert_raises((KeyError,NetworkXError), G.remove_edge,-1,0)
 
     def test_remove_edges_from(self):
         G=self.K3
@@ -618,9 +619,22 @@ class TestGraph(BaseAttrGraphTester):
         assert_equal(sorted(G.edges(data=True)),[(0,1,{}),(0,2,{}),(1,2,{})])
         assert_equal(sorted(G.edges(0,data=True)),[(0,1,{}),(0,2,{})])
         f = lambda x: list(G.edges(x))
-        assert_raises((KeyError,networkx.NetworkXError), f,-1)
+        assert_raises((KeyError,NetworkXError), f,-1)
 
 
+    def test_direct_writes(self):
+        # nodes written straight into G.node and G.adj get no ordinal
+        G=self.Graph()
+        G.add_edge(0,1)
+        G.node[2]={}
+        G.adj[2]={1:{}}
+        G.adj[1][2]=G.adj[2][1]
+        assert_equal(sorted(G.e),[(0,1),(1,2)])
+        assert_equal(sorted(e for e,d in G.e.items()),[(0,1),(1,2)])
+        assert_equal(sorted(e for c in G.e.chunks(2) for e in c),
+                     [(0,1),(1,2)])
+        assert_equal(len(G.e),2)
+
     def test_get_edge_data(self):
         G=self.K3
         assert_equal(G.get_edge_data(0,1),{})
@@ -0,0 +1,168 @@
+#
+#   TESTS
+#
+from copy import deepcopy
+import pickle
+
+from nose.tools import assert_true, assert_false, assert_equal
+
+import compact
+import ABCgraph
+from graph import Graph
+from nxgraph import nxGraph
+
+
+def roundtrip(G, protocol=pickle.HIGHEST_PROTOCOL):
+    return pickle.loads(pickle.dumps(G, protocol))
+
+
+class TestCompact(object):
+    def test_pack_column(self):
+        for values in ([1, 2, -3], [0.5, float('inf')], ['a', 1], [True], [],
+                       [2**70, 1]):
+            packed = compact.pack_column(values, 5)
+            assert_equal(compact.unpack_column(packed), values)
+        assert_equal(compact.pack_column([1, 200])[0], 'h')
+        assert_equal(compact.pack_column([1.0])[0], 'd')
+        assert_true(type(compact.pack_column([1, 'a'])) is list)
+
+    def test_attr_columns(self):
+        dds = [{'w': 1.0}, {'w': 2.0, 'c': 'x'}, {}]
+        columns = compact.attr_columns(dds)
+        assert_equal([attr for attr, rows, values in columns], ['w', 'c'])
+        assert_equal(columns[1][2], ['x'])
+        assert_equal(compact.attr_dicts(3, columns), dds)
+
+
+class TestGraphPickle(object):
+    def setUp(self):
+        G = self.G = Graph(name='g')
+        G.e.update([(1, 2, {'weight': 1.5}), (2, 3, {'weight': 2.0}),
+                    ('a', 'b', {'kind': 'x'}), (4, 4)])
+        G.n.add(9, color='red')
+        G.n.remove(3)
+        G.e.add(5, 6)
+
+    def check(self, H):
+        G = self.G
+        assert_equal(list(H.n.items()), list(G.n.items()))
+        assert_equal(list(H.e.items()), list(G.e.items()))
+        assert_equal(dict(H._node_ordinals), dict(G._node_ordinals))
+        assert_equal(H.data, G.data)
+        assert_equal(sorted(H.a[4]), [4])
+
+    def test_protocols(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            self.check(roundtrip(self.G, protocol))
+        self.check(deepcopy(self.G))
+        self.check(self.G.copy())
+
+    def test_out_of_band(self):
+        G = Graph((range(100), [(i, i + 1, {'w': i / 2.}) for i in range(99)]))
+        buffers = []
+        data = pickle.dumps(G, 5, buffer_callback=buffers.append)
+        assert_true(len(buffers) >= 4)  # nodes, heads, tails, weights
+        H = pickle.loads(data, buffers=buffers)
+        assert_equal(list(H.e.items()), list(G.e.items()))
+
+    def test_smaller_than_dicts(self):
+        G = Graph((range(1000), [(i, (i * 7) % 1000, {'weight': 1.0})
+                                 for i in range(1000)]))
+        old = pickle.dumps((G._nodedata, G._adjacency), 5)
+        assert_true(len(pickle.dumps(G, 5)) < len(old) / 2)
+
+    def test_fresh_state(self):
+        G = self.G
+        G.start_journal()
+        G.cached(len)
+        H = roundtrip(G)
+        assert_true(H._versions.journal is None)
+        assert_equal(H.epoch, 0)
+        assert_equal(H.cache_info().currsize, 0)
+        H.e.add(1, 9)
+        assert_false((1, 9) in G.e)
+
+    def test_indexes_and_records(self):
+        G = self.G
+        G.n.add_index('color')
+        G.e.add_index('weight', 'sorted')
+        G.e.intern_attrs()
+        G.intern_keys()
+        H = roundtrip(G)
+        assert_equal(H.n.where(color='red'), [9])
+        assert_equal(H.e.where(weight__gt=1), [(1, 2)])
+        assert_true(H.e._records is not None)
+        assert_true(H._node_ordinals.interning)
+        H.n[9]['color'] = 'blue'
+        assert_equal(H.n.where(color='blue'), [9])
+
+    def test_schema_and_dense(self):
+        G = self.G
+        G.set_schema(edge={'weight': float}, node={'color': str})
+        H = roundtrip(G)
+        assert_equal(H.edge_attr_dict_factory.fields, (('weight', float),))
+        assert_equal(H.e[(1, 2)]['weight'], 1.5)
+        H.e.add(7, 8, weight='3')
+        assert_equal(H.e[(7, 8)]['weight'], 3.0)
+        D = Graph.from_adjacency_list([[1, 2], [2], []], dense=True)
+        E = roundtrip(D)
+        assert_true(E.dense)
+        assert_equal(list(E.e), list(D.e))
+
+    def test_subclass_aliases(self):
+        G = nxGraph(name='nx')
+        G.e.add(1, 2, w=3)
+        H = roundtrip(G)
+        assert_true(H.node is H._nodedata)
+        assert_true(H.graph is H.data)
+        assert_equal(H.name, 'nx')
+        assert_equal(H.e[(1, 2)], {'w': 3})
+
+
+class TestABCGraphPickle(object):
+    def setUp(self):
+        G = self.G = ABCgraph.Graph(directed=True, name='abc')
+        G.e.update([(1, 2, {'w': 1}), (2, 1, {'w': 2}), (3, 3)])
+        G.n.add(4, color='red')
+
+    def test_roundtrip(self):
+        G = self.G
+        for H in (roundtrip(G), roundtrip(G, 2), deepcopy(G)):
+            assert_true(H.directed)
+            assert_equal(list(H.e), list(G.e))
+            assert_equal(H.e[(2, 1)], {'w': 2})
+            assert_equal(dict(H.pr[1]), {2: {'w': 2}})
+            assert_equal(H.n[4], {'color': 'red'})
+            assert_equal(H.data, {'name': 'abc'})
+
+    def test_undirected_edge_stored_once(self):
+        G = ABCgraph.Graph([(1, 2, 3), [(1, 2), (3, 2)]])
+        H = roundtrip(G)
+        assert_equal(list(H.e), [(1, 2), (3, 2)])
+        assert_equal(sorted(H.a[2]), [1, 3])
+
+    def test_subgraph_becomes_graph(self):
+        S = roundtrip(self.G.s([1, 2]))
+        assert_true(type(S) is ABCgraph.Graph)
+        assert_equal(sorted(S.e), [(1, 2), (2, 1)])
+
+
+class TestEdgeObjPickle(object):
+    def setUp(self):
+        import edgeobj
+        G = self.G = edgeobj.Graph(name='obj')
+        G.edges.add((1, 2), w=3)
+        G.edges.add((2, 3))
+        G.nodes.add(4, color='red')
+
+    def test_roundtrip(self):
+        G = self.G
+        for H in (roundtrip(G), roundtrip(G, 2), G.copy()):
+            assert_equal(list(H.edges), list(G.edges))
+            assert_equal(H.edges[(1, 2)], {'w': 3})
+            assert_equal(H.nodes[4], {'color': 'red'})
+            assert_equal(sorted(H.adj[2]), [1, 3])
+            assert_equal(H.graph, {'name': 'obj'})
+        H = roundtrip(G)
+        H.edges[(1, 2)]['w'] = 4
+        assert_equal(G.edges[(1, 2)], {'w': 3})
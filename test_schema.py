@@ -0,0 +1,126 @@
+#
+#   TESTS
+#
+from copy import deepcopy
+import pickle
+
+from nose.tools import assert_true, assert_false, assert_equal, assert_raises
+from exception import NetworkXError
+
+from schema import Schema
+from graph import Graph
+import ABCgraph
+
+EDGE = {'weight': float, 'ts': int, 'kind': str}
+
+
+class TestRecord(object):
+    def setUp(self):
+        self.schema = Schema(EDGE)
+
+    def test_mapping(self):
+        r = self.schema(weight=2, kind='a')
+        assert_equal(r, {'weight': 2.0, 'kind': 'a'})
+        assert_true(isinstance(r['weight'], float))
+        assert_equal(list(r), ['weight', 'kind'])
+        assert_false('ts' in r)
+        assert_equal(r.get('ts', 0), 0)
+        assert_raises(KeyError, r.__getitem__, 'ts')
+        r['ts'] = '7'
+        assert_equal(r['ts'], 7)
+        del r['kind']
+        assert_equal(len(r), 2)
+        assert_raises(KeyError, r.__delitem__, 'kind')
+        assert_raises(NetworkXError, r.__setitem__, 'ts', 'soon')
+
+    def test_overflow(self):
+        r = self.schema(weight=1, color='red')
+        assert_equal(r, {'weight': 1.0, 'color': 'red'})
+        c = r.copy()
+        c['color'] = 'blue'
+        assert_equal(r['color'], 'red')
+        strict = Schema(EDGE, overflow=False)()
+        assert_raises(NetworkXError, strict.__setitem__, 'color', 'red')
+        assert_raises(NetworkXError, Schema, [('w', float), ('w', int)])
+
+    def test_pickle(self):
+        r = self.schema(weight=1, ts=3, note='x')
+        for s in (pickle.loads(pickle.dumps(r)), deepcopy(r)):
+            assert_equal(s, r)
+            s['ts'] = '4'
+            assert_equal(s['ts'], 4)
+
+
+class TestGraphSchema(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.e.update([(1, 2, {'weight': 1}), (2, 3)], kind='road')
+        self.G.n.add(1, size=3)
+
+    def test_convert_and_add(self):
+        G = self.G
+        G.set_schema(edge=EDGE, node={'size': int})
+        schema = G.edge_attr_dict_factory
+        assert_true(isinstance(G.a[1][2], schema.record))
+        assert_true(G.a[1][2] is G.a[2][1])
+        assert_equal(G.e[(1, 2)], {'weight': 1.0, 'kind': 'road'})
+        G.e.add(3, 4, weight='2.5', ts=10)
+        assert_equal(G.e[(4, 3)], {'weight': 2.5, 'ts': 10})
+        G.e[(1, 2)]['weight'] = 4
+        assert_equal(dict(G.e.items())[(1, 2)]['weight'], 4.0)
+        assert_true(isinstance(G.n[4], G.node_attr_dict_factory.record))
+        assert_equal(G.n[1], {'size': 3})
+        assert_equal(sorted(G.e.where(kind='road')), [(1, 2), (2, 3)])
+        H = deepcopy(G)
+        H.e.add(5, 6, weight=1)
+        assert_true(isinstance(H.a[5][6], schema.record.__base__))
+        assert_equal(H.e[(3, 4)], G.e[(3, 4)])
+
+    def test_strict(self):
+        G = self.G
+        assert_raises(NetworkXError, G.set_schema, {'weight': float},
+                      None, False)
+        assert_true(type(G.a[1][2]) is dict)   # unchanged
+        G.set_schema(edge=EDGE, overflow=False)
+        assert_raises(NetworkXError, G.e.add, 1, 2, color='red')
+        # existing edges are checked before any value is written
+        G.e.add(1, 2, {'weight': 1.0})
+        assert_raises(NetworkXError, G.e.add, 1, 2, {'weight': 5.0, 'zz': 1})
+        assert_equal(G.e[(1, 2)]['weight'], 1.0)
+        assert_raises(NetworkXError, G.e.update, [(1, 2)], weight=5.0, zz=1)
+        assert_raises(NetworkXError, G.e.update,
+                      [(1, 2, {'weight': 5.0, 'zz': 1})])
+        assert_equal(G.e[(1, 2)]['weight'], 1.0)
+        H = Graph()
+        H.e.intern_attrs()
+        assert_raises(NetworkXError, H.set_schema, EDGE)
+
+    def test_indexed_nodes(self):
+        G = self.G
+        G.n.add(2, size=5.5)
+        G.n.add_index('size', 'sorted')
+        G.set_schema(node={'size': int}, overflow=False)
+        record = G.node_attr_dict_factory.record
+        assert_true(isinstance(G.n[2], record))
+        assert_equal(G.n.where(size__gt=4), [2])
+        # writes keep converting, rejecting and indexing
+        G.n[1]['size'] = '9'
+        assert_equal(G.n.where(size__gt=4), [2, 1])
+        assert_raises(NetworkXError, G.n[2].__setitem__, 'zz', 3)
+        assert_raises(NetworkXError, G.n.add, 5, size=9, bogus=1)
+        assert_true(5 not in G.n)
+        G.n.add(6, size='1')
+        assert_true(isinstance(G.n[6], record))
+        assert_equal(G.n.where(size__lt=4), [6])
+        assert_raises(NetworkXError, G.n[6].__setitem__, 'size', 'big')
+        assert_equal(G.n.where(size=1), [6])
+
+    def test_abcgraph(self):
+        G = ABCgraph.Graph()
+        G.e.update([(1, 2), (2, 3, {'weight': 3})])
+        G.set_schema(edge=EDGE)
+        G.e.add(3, 1, ts=5)
+        assert_equal(G.e[(2, 3)], {'weight': 3.0})
+        assert_equal(G.e[(1, 3)], {'ts': 5})
+        assert_true(G._succ[3][1] is G._pred[1][3])
+        assert_equal([w for e, w in G.e.data('weight') if w], [3.0])
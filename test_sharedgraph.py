@@ -0,0 +1,105 @@
+#
+#   TESTS
+#
+import os
+import pickle
+import subprocess
+import sys
+
+from nose.tools import assert_true, assert_false, assert_equal, assert_raises
+from exception import NetworkXError
+
+import ABCgraph
+from graph import Graph
+import sharedgraph
+
+
+class TestSharedGraph(object):
+    def setUp(self):
+        G = self.G = Graph(name='g')
+        G.e.update([(1, 2, {'weight': 1.5}), (2, 3, {'weight': 2.0, 'kind': 'x'}),
+                    ('a', 'b'), (4, 4)])
+        G.n.add(9, color='red')
+
+    def test_views(self):
+        G = self.G
+        with sharedgraph.publish(G) as S:
+            assert_equal(list(S.n), list(G.n))
+            assert_equal(len(S), len(G))
+            assert_equal(list(S.e), list(G.e))
+            assert_equal(list(S.e.items()), list(G.e.items()))
+            assert_equal(S.n[9], {'color': 'red'})
+            assert_equal(dict(S.a[2]), dict(G.a[2]))
+            assert_equal(list(S.a[4]), [4])
+            assert_true((3, 2) in S.e)
+            assert_false((1, 3) in S.e)
+            assert_false('z' in S)
+            assert_equal(S.e[(3, 2)], {'weight': 2.0, 'kind': 'x'})
+            assert_equal(S.data, {'name': 'g'})
+            assert_raises(KeyError, S.a.__getitem__, 'z')
+
+    def test_read_only(self):
+        with sharedgraph.publish(self.G) as S:
+            assert_raises(NetworkXError, S.n.add, 10)
+            assert_raises(NetworkXError, S.e.add, 1, 10)
+            S.n[9]['color'] = 'blue'
+            assert_equal(S.n[9], {'color': 'red'})
+
+    def test_attach(self):
+        with sharedgraph.publish(self.G) as S:
+            W = sharedgraph.attach(S.name)
+            assert_equal(list(W.e.items()), list(S.e.items()))
+            W.close()
+            P = pickle.loads(pickle.dumps(S))
+            assert_equal(P.name, S.name)
+            assert_equal(P.n[9], {'color': 'red'})
+            P.close()
+
+    def test_attach_from_process(self):
+        # a worker exiting must leave the block to the publisher
+        here = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [here] + [p for p in [env.get('PYTHONPATH')] if p])
+        code = ('import sharedgraph, sys\n'
+                'W = sharedgraph.attach(sys.argv[1])\n'
+                'print(len(W.e))\n'
+                'W.close()\n')
+        S = sharedgraph.publish(self.G)
+        try:
+            for worker in range(2):
+                out = subprocess.check_output(
+                    [sys.executable, '-c', code, S.name], env=env)
+                assert_equal(int(out), 4)
+            W = sharedgraph.attach(S.name)
+            assert_equal(len(W.e), 4)
+            W.close()
+        finally:
+            S.close()
+            S.unlink()
+
+    def test_int_nodes(self):
+        G = Graph((range(5), [(i, i + 1, {'w': float(i)}) for i in range(4)]))
+        with sharedgraph.publish(G) as S:
+            assert_true(S._identity)
+            assert_equal(S._blocks['nodes'][0], 'b')  # an array, not a pickle
+            assert_equal(dict(S.a[2]), {1: {'w': 1.0}, 3: {'w': 2.0}})
+            assert_false(True in S)
+            assert_false(5 in S)
+
+    def test_directed(self):
+        G = ABCgraph.Graph(directed=True)
+        G.e.update([(0, 1, {'w': 1}), (1, 0, {'w': 2}), (1, 2)])
+        with sharedgraph.publish(G) as S:
+            assert_true(S.is_directed())
+            assert_equal(dict(S.su[1]), {0: {'w': 2}, 2: {}})
+            assert_equal(dict(S.pr[1]), {0: {'w': 1}})
+            assert_equal(len(S.a[1]), 3)
+            assert_equal(S.a.degree(1), 3)
+            assert_true((1, 2) in S.e)
+            assert_false((2, 1) in S.e)
+
+    def test_empty(self):
+        with sharedgraph.publish(Graph()) as S:
+            assert_equal(len(S), 0)
+            assert_equal(list(S.e), [])
@@ -0,0 +1,131 @@
+#
+#   TESTS
+#
+import gc
+import threading
+
+from nose.tools import assert_true, assert_equal, assert_raises
+from exception import NetworkXError
+
+from graph import Graph
+
+
+class TestSnapshot(object):
+    def setUp(self):
+        self.G = Graph()
+        self.G.n.add(0, color='red')
+        self.G.e.update([(0,1), (1,2), (2,3)], weight=1)
+
+    def test_isolation(self):
+        G = self.G
+        S = G.snapshot()
+        G.e.add(3, 4)
+        G.e.add(0, 1, weight=5)
+        G.e.remove(1, 2)
+        G.n.add(0, color='blue')
+        G.n.discard(3)
+        assert_equal(sorted(S.n), [0, 1, 2, 3])
+        assert_equal(sorted(tuple(sorted(e)) for e in S.e),
+                     [(0, 1), (1, 2), (2, 3)])
+        assert_equal(S.e[(0, 1)], {'weight': 1})
+        assert_equal(S.n[0], {'color': 'red'})
+        assert_equal(sorted(S.a[2]), [1, 3])
+        assert_equal(sorted(G.a[2]), [])
+        assert_equal(G.e[(1, 0)], {'weight': 5})
+        assert_equal(sorted(G.n), [0, 1, 2, 4])
+        assert_equal(sorted(S.s([1, 2]).e), [(1, 2)])
+
+    def test_datadict_writes(self):
+        G = self.G
+        S = G.snapshot()
+        G.n[0]['color'] = 'blue'
+        G.e[(0, 1)]['weight'] = 2
+        G.a[1][2]['weight'] = 3
+        G.s([2, 3]).n[3]['color'] = 'green'
+        G.s([2, 3]).e[(2, 3)]['weight'] = 4
+        assert_equal(S.n[0], {'color': 'red'})
+        assert_equal(S.n[3], {})
+        assert_equal([S.e[e]['weight'] for e in [(0, 1), (1, 2), (2, 3)]],
+                     [1, 1, 1])
+        assert_equal(G.n[0], {'color': 'blue'})
+        assert_equal(G.n[3], {'color': 'green'})
+        assert_equal([G.e[e]['weight'] for e in [(0, 1), (1, 2), (2, 3)]],
+                     [2, 3, 4])
+        assert_true(G.a[2][1] is G.a[1][2])
+
+    def test_no_copy(self):
+        G = self.G
+        S = G.snapshot()
+        G.n.add(5)
+        G.n.discard(0)
+        G.node_index()   # renumbers node 5 into the hole of node 0
+        # point lookups read the graph's dicts and what writers saved
+        assert_true(S._nodedata._frozen is None)
+        assert_true(0 in S and 5 not in S)
+        assert_equal(S.n[0], {'color': 'red'})
+        assert_equal(S.a[0], {1: {'weight': 1}})
+        assert_raises(KeyError, S.n.__getitem__, 5)
+        assert_true(S._nodedata._frozen is None)
+        # iterating copies the top-level dicts once
+        assert_equal(sorted(S.n), [0, 1, 2, 3])
+        assert_equal(sorted(S._node_ordinals.items()),
+                     [(0, 0), (1, 1), (2, 2), (3, 3)])
+        assert_equal(G._versions._overlays, [])
+        G.n.add(6)
+        assert_equal(len(S), 4)
+        assert_equal(len(S.e), 3)
+
+    def test_versions(self):
+        G = self.G
+        S1 = G.snapshot()
+        G.e.add(5, 6)
+        S2 = G.snapshot()
+        G.n.clear()
+        assert_true(S1.version < S2.version)
+        assert_equal(len(S1.e), 3)
+        assert_equal(len(S2.e), 4)
+        assert_equal(len(G.e), 0)
+
+    def test_read_only(self):
+        S = self.G.snapshot()
+        assert_raises(NetworkXError, S.e.add, 7, 8)
+        assert_raises(NetworkXError, S.n.discard, 0)
+        assert_raises(NetworkXError, S.n.remove_many, [0])
+        assert_equal(len(self.G.n), 4)
+
+    def test_reclaim(self):
+        G = self.G
+        S = G.snapshot()
+        assert_equal(G._versions.snapshots, 1)
+        del S
+        gc.collect()
+        assert_equal(G._versions.snapshots, 0)
+        # without snapshots, writes change the dicts in place
+        nbrs = G._adjacency[0]
+        G.e.add(0, 2)
+        assert_true(G._adjacency[0] is nbrs)
+
+    def test_concurrent_reader(self):
+        G = self.G
+        errors = []
+        def ingest():
+            for i in range(10, 3000):
+                G.e.add(i, i + 1)
+                G.n.discard(i - 5)
+        def query():
+            try:
+                for _ in range(50):
+                    S = G.snapshot()
+                    assert_equal(len(list(S.e)), len(S.e))
+                    for n, nbrs in S.a:
+                        for nbr in nbrs:
+                            assert_true(n in S.a[nbr])
+            except Exception as err:
+                errors.append(err)
+        threads = [threading.Thread(target=ingest),
+                   threading.Thread(target=query)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert_equal(errors, [])
@@ -0,0 +1,87 @@
+#
+#   TESTS
+#
+from nose.tools import assert_equal, assert_raises
+from exception import NetworkXError
+
+import ABCgraph
+from graph import Graph
+from traversal import bfs_layers, dfs_preorder, k_hop
+
+
+def layers(*args, **kwds):
+    return [sorted(layer) for layer in bfs_layers(*args, **kwds)]
+
+def preorder(*args, **kwds):
+    return [n for batch in dfs_preorder(*args, **kwds) for n in batch]
+
+
+class TestGraphTraversal(object):
+    def setUp(self):
+        # 0 - 1 - 2 - 3 - 4 and 1 - 5 - 3, plus 6 - 7 apart
+        self.G = Graph()
+        self.G.e.update([(0, 1), (1, 2), (2, 3), (3, 4), (1, 5), (5, 3),
+                         (6, 7), (4, 4)])
+
+    def test_bfs_layers(self):
+        G = self.G
+        assert_equal(layers(G, 0), [[0], [1], [2, 5], [3], [4]])
+        assert_equal(layers(G, [0, 4]), [[0, 4], [1, 3], [2, 5]])
+        assert_equal(layers(G, 0, depth=2), [[0], [1], [2, 5]])
+        assert_equal(layers(G, 6), [[6], [7]])
+        assert_raises(NetworkXError, list, bfs_layers(G, 9))
+        assert_raises(NetworkXError, list, bfs_layers(G, 0, 'x'))
+
+    def test_dfs_preorder(self):
+        G = self.G
+        order = preorder(G, 0)
+        assert_equal(order[:2], [0, 1])
+        assert_equal(sorted(order), [0, 1, 2, 3, 4, 5])
+        # each node after the first is adjacent to one visited earlier
+        for i, n in enumerate(order[1:], 1):
+            assert_equal(bool(set(G.a[n]) & set(order[:i])), True)
+        batches = list(dfs_preorder(G, 0, batch_size=4))
+        assert_equal([len(b) for b in batches], [4, 2])
+
+    def test_k_hop(self):
+        G = self.G
+        assert_equal(k_hop(G, 0, 0), {0})
+        assert_equal(k_hop(G, 0, 2), {0, 1, 2, 5})
+        assert_equal(k_hop(G, [0, 6], 1), {0, 1, 6, 7})
+
+    def test_subgraph(self):
+        S = self.G.s([0, 1, 2, 3, 4])
+        assert_equal(layers(S, 0), [[0], [1], [2], [3], [4]])
+        assert_equal(preorder(S, 0), [0, 1, 2, 3, 4])
+        assert_raises(NetworkXError, list, bfs_layers(S, 5))
+
+    def test_dense_and_snapshot(self):
+        D = Graph.from_adjacency_list([[1], [0, 2], [1]], dense=True)
+        assert_equal(layers(D, 0), [[0], [1], [2]])
+        assert_equal(layers(self.G.snapshot(), 6), [[6], [7]])
+
+
+class TestABCTraversal(object):
+    def setUp(self):
+        self.G = ABCgraph.Graph(directed=True)
+        self.G.e.update([(0, 1), (1, 2), (3, 1), (2, 0)])
+
+    def test_directions(self):
+        G = self.G
+        assert_equal(layers(G, 1, 'su'), [[1], [2], [0]])
+        assert_equal(layers(G, 1, 'pr'), [[1], [0, 3], [2]])
+        assert_equal(layers(G, 1), [[1], [0, 2, 3]])
+        assert_equal(preorder(G, 0, 'su'), [0, 1, 2])
+        assert_equal(k_hop(G, 3, 1, 'su'), {1, 3})
+
+    def test_undirected(self):
+        U = ABCgraph.Graph()
+        U.e.update([(0, 1), (2, 1), (3, 2)])
+        assert_equal(layers(U, 3), [[3], [2], [1], [0]])
+        assert_equal(preorder(U, 0), [0, 1, 2, 3])
+
+    def test_subgraph(self):
+        S = self.G.s([0, 1, 2])
+        assert_equal(layers(S, 1, 'pr'), [[1], [0], [2]])
+        assert_equal(preorder(S, 1, 'pr'), [1, 0, 2])
+        assert_equal(k_hop(S.s([0, 1]), 0, 5, 'su'), {0, 1})
@@ -0,0 +1,127 @@
+"""Breadth- and depth-first traversal over a graph's storage.
+
+    for layer in bfs_layers(G, source): ...     one list per BFS layer
+    for batch in dfs_preorder(G, source): ...   DFS preorder, in lists
+    nodes = k_hop(G, sources, k)                all nodes within k hops
+
+Walking G.a[n] builds or looks up a neighbor view for every node
+visited. These functions read the neighbor dicts underneath instead:
+graph.Graph's adjacency, ABCgraph's succ and pred dicts, and for
+subgraph views the parent's dicts restricted to the subgraph nodes.
+`view` picks the neighbors followed: 'a' (all), or 'su' / 'pr' for
+the successors / predecessors of a directed ABCgraph.
+
+A BFS layer is found with set operations on whole neighbor dicts
+(update, difference, intersection), so the per-node work runs in C.
+The nodes within a layer come in no particular order.
+"""
+from itertools import chain
+
+from exception import NetworkXError
+from subgraph import SubAdjacency
+from ABCgraph import SubDict
+
+__all__ = ['bfs_layers', 'dfs_preorder', 'k_hop']
+
+
+def _storage(G, view):
+    # the node -> neighbors dicts whose keys together are G.<view>[n],
+    # and the node set of a subgraph view (else None)
+    if view not in ('a', 'su', 'pr'):
+        raise NetworkXError("Unknown adjacency view %r" % (view,))
+    if hasattr(G, '_adjacency'):
+        # graph.Graph, its snapshots and subgraphs: undirected
+        parts = [G._adjacency]
+    elif G._directed and view != 'a':
+        parts = [G._succ if view == 'su' else G._pred]
+    else:
+        # undirected ABCgraph edges are stored once, succ or pred
+        parts = [G._succ, G._pred]
+    subnodes = getattr(G, '_subnodes', None)
+    for i, part in enumerate(parts):
+        # read the parent's dicts under (nested) subgraph views
+        while isinstance(part, (SubAdjacency, SubDict)):
+            part = part._mapping
+        parts[i] = part
+    return parts, subnodes
+
+def _sources(parts, subnodes, sources):
+    nodes = parts[0] if subnodes is None else subnodes
+    try:
+        if sources in nodes:
+            return [sources]
+    except TypeError:
+        pass
+    try:
+        sources = list(sources)
+    except TypeError:
+        raise NetworkXError("The node %s is not in the graph." % (sources,))
+    for n in sources:
+        if n not in nodes:
+            raise NetworkXError("The node %s is not in the graph." % (n,))
+    return sources
+
+def bfs_layers(G, sources, view='a', depth=None):
+    """Yield the nodes reached from `sources` (a node or a list of
+    nodes) one BFS layer at a time, as lists, starting with the
+    sources. Stop after `depth` layers past the sources if given."""
+    parts, subnodes = _storage(G, view)
+    layer = list(dict.fromkeys(_sources(parts, subnodes, sources)))
+    seen = set(layer)
+    hops = 0
+    while layer:
+        yield layer
+        if depth is not None and hops >= depth:
+            return
+        hops += 1
+        found = set()
+        update = found.update
+        for part in parts:
+            for n in layer:
+                update(part[n])
+        found -= seen
+        if subnodes is not None:
+            found &= subnodes
+        seen |= found
+        layer = list(found)
+
+def dfs_preorder(G, source, view='a', batch_size=1024):
+    """Yield the nodes reached from `source` in depth-first preorder, in
+    lists of at most batch_size nodes."""
+    parts, subnodes = _storage(G, view)
+    source, = _sources(parts, subnodes, [source])
+    if len(parts) == 1:
+        part = parts[0]
+        nbrs = part.__getitem__
+    else:
+        nbrs = lambda n: chain.from_iterable(part[n] for part in parts)
+    if subnodes is None:
+        children = lambda n: iter(nbrs(n))
+    else:
+        children = lambda n: filter(subnodes.__contains__, nbrs(n))
+    seen = {source}
+    add = seen.add
+    batch = [source]
+    stack = [children(source)]
+    while stack:
+        for nbr in stack[-1]:
+            if nbr not in seen:
+                add(nbr)
+                batch.append(nbr)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+                stack.append(children(nbr))
+                break
+        else:
+            stack.pop()
+    if batch:
+        yield batch
+
+def k_hop(G, sources, k, view='a'):
+    """Return the set of nodes at most k hops from `sources`, the sources
+    included."""
+    nodes = set()
+    for layer in bfs_layers(G, sources, view, k):
+        nodes.update(layer)
+    return nodes
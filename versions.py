@@ -0,0 +1,142 @@
+"""Copy-on-write versioning behind Graph.snapshot().
+
+A snapshot copies nothing when it is taken. It reads the graph's
+top-level node, adjacency and ordinal dicts through an overlay: before
+a writer changes an entry of one of those dicts while snapshots are
+alive, it saves the old entry (``save``) in the overlay of each
+snapshot that has not saved that key yet. The inner dicts (neighbor
+dicts, node and edge datadicts) are shared too, and writers replace a
+shared one with a copy before changing it (``own``), so the snapshot
+keeps seeing the version it was taken at. Old versions are plain dicts
+only referenced by snapshots; they are reclaimed with them.
+
+Writers run under the graph lock (``writer``), so a snapshot is never
+taken halfway through a mutation.
+"""
+from functools import wraps
+import threading
+import weakref
+
+absent = object()  # saved for a key the mapping did not have
+
+
+class Versions(object):
+    """Per-graph version counter, writer lock and copy-on-write state."""
+    __slots__ = ('version', 'lock', 'journal', 'components', 'noop',
+                 '_pinned', '_owned', '_overlays')
+    def __init__(self):
+        self.version = 0
+        self.noop = False  # set by a writer call that changed nothing
+        self.journal = None  # MutationJournal while journaling is on
+        self.components = None  # ComponentIndex while tracking is on
+        self.lock = threading.RLock()
+        self._pinned = 0     # number of live snapshots
+        self._owned = set()  # ids of inner dicts copied since the last pin
+        self._overlays = []  # per snapshot: id(top-level dict) -> overlay
+    def __repr__(self):
+        return '{0.__class__.__name__}(version={0.version}, ' \
+               'snapshots={0._pinned})'.format(self)
+    def __reduce__(self):
+        # copies and pickles of a graph start with fresh, unshared state
+        return (self.__class__, ())
+    @property
+    def snapshots(self):
+        return self._pinned
+    def pin(self, snapshot, mappings):
+        """Share `mappings` with snapshot. Returns a dict of id(mapping)
+        -> overlay, where writers keep the entries they change from now
+        on (``absent`` for keys that were missing)."""
+        # call with self.lock held: every inner dict is now shared
+        overlays = {id(mapping): {} for mapping in mappings}
+        self._pinned += 1
+        self._owned = set()
+        self._overlays.append(overlays)
+        weakref.finalize(snapshot, self._unpin, overlays)
+        return overlays
+    def release(self, overlays):
+        """Stop saving into overlays, once their snapshot copied them."""
+        with self.lock:
+            self._overlays = [o for o in self._overlays if o is not overlays]
+    def _unpin(self, overlays):
+        with self.lock:
+            self._pinned -= 1
+            self._overlays = [o for o in self._overlays if o is not overlays]
+            if not self._pinned:
+                self._owned = set()
+    def save(self, mapping, key):
+        """Keep mapping[key] for the snapshots before it is changed."""
+        for overlays in self._overlays:
+            overlay = overlays.get(id(mapping))
+            if overlay is not None and key not in overlay:
+                overlay[key] = mapping.get(key, absent)
+    def save_all(self, mapping):
+        """Keep every entry of mapping before a bulk change."""
+        for overlays in self._overlays:
+            overlay = overlays.get(id(mapping))
+            if overlay is not None:
+                for key, value in mapping.items():
+                    overlay.setdefault(key, value)
+    def own(self, mapping, key):
+        """Return mapping[key], first replacing it by a private copy if a
+        snapshot may share it."""
+        obj = mapping[key]
+        if self._pinned and id(obj) not in self._owned:
+            self.save(mapping, key)
+            obj = mapping[key] = obj.copy()
+            self._owned.add(id(obj))
+        return obj
+    def own_edge(self, adj, u, v):
+        """Return the datadict of edge u-v, stored under both endpoints,
+        copied first if a snapshot may share it."""
+        dd = adj[u][v]
+        if self._pinned and id(dd) not in self._owned:
+            dd = dd.copy()
+            self.own(adj, u)[v] = dd
+            self.own(adj, v)[u] = dd
+            self._owned.add(id(dd))
+        return dd
+    # Readers of the graph's views get datadicts they may write into
+    # (G.n[n]['color'] = 'red'), so those are owned on the way out too.
+    # The dicts may be read through subgraph views, which keep the
+    # graph's dict as _mapping.
+    def own_attrs(self, mapping, key):
+        """Return the datadict mapping[key] for writing, copied first if
+        a snapshot may share it."""
+        dd = mapping[key]
+        if self._pinned and id(dd) not in self._owned:
+            while hasattr(mapping, '_mapping'):
+                mapping = mapping._mapping
+            with self.lock:
+                dd = self.own(mapping, key)
+        return dd
+    def own_edge_attrs(self, adj, u, v):
+        """Return the datadict of edge u-v for writing (see own_attrs)."""
+        dd = adj[u][v]
+        if self._pinned and id(dd) not in self._owned:
+            while hasattr(adj, '_mapping'):
+                adj = adj._mapping
+            with self.lock:
+                dd = self.own_edge(adj, u, v)
+        return dd
+
+
+def writer(method):
+    """Run a mutating view method under the graph lock and count it as
+    a new version.
+
+    A call that leaves the graph as it was (discarding a missing node,
+    a remove that raises before changing anything) sets versions.noop
+    and keeps the version. Calls that fail partway still count.
+    """
+    @wraps(method)
+    def locked(self, *args, **kwds):
+        versions = self._versions
+        with versions.lock:
+            versions.noop = False
+            try:
+                return method(self, *args, **kwds)
+            finally:
+                if not versions.noop:
+                    versions.version += 1
+                versions.noop = False
+    return locked